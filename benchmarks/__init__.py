@@ -0,0 +1,4 @@
+'''
+Benchmarks of the validator. Run every benchmark with `python -m benchmarks` or a single one with
+`python -m benchmarks <name>` (for example `python -m benchmarks metrics`) from the root of the repository.
+'''
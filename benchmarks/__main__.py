@@ -0,0 +1,19 @@
+import importlib
+import pkgutil
+import sys
+import os
+
+
+def main(names):
+    path = os.path.dirname(os.path.abspath(__file__))
+    available = sorted(module.name[len("bench_"):] for module in pkgutil.iter_modules([path])
+                       if module.name.startswith("bench_"))
+    for name in names or available:
+        if name not in available:
+            print("Unknown benchmark:", name, "(available: " + ", ".join(available) + ")")
+            sys.exit(1)
+        print("==== " + name)
+        importlib.import_module("benchmarks.bench_" + name).run()
+
+
+main(sys.argv[1:])
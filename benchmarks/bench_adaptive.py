@@ -0,0 +1,40 @@
+'''
+Validation with and without the adaptive ordering: invalid documents that fail a cheap keyword that's declared after an
+expensive one, and valid documents that match the last branch of an anyOf.
+'''
+from validator import get_schema
+from validator.adaptive import AdaptiveOrdering
+from benchmarks.common import measure, report
+
+EVENT_SCHEMA = {
+    "type": "object",
+    "properties": {"p{}".format(i): {"type": "string", "maxLength": 20} for i in range(30)},
+    "maxProperties": 30,
+}
+
+UNION_SCHEMA = {
+    "type": "array",
+    "items": {"anyOf": [{"type": "object", "required": ["kind{}".format(i)]} for i in range(8)]},
+}
+
+
+def run():
+    cases = [
+        ("too many properties", get_schema(EVENT_SCHEMA),
+         dict({"p{}".format(i): "value" for i in range(30)}, extra=1)),
+        ("anyOf matching its last branch", get_schema(UNION_SCHEMA), [{"kind7": 1}] * 50),
+    ]
+    for name, schema, document in cases:
+        expected = schema.validate(document).is_valid
+        before = measure(lambda: schema.validate(document), number=2000)
+        with AdaptiveOrdering(schema, interval=100) as ordering:
+            for _ in range(200):
+                schema.validate(document)
+            after = measure(lambda: schema.validate(document), number=2000)
+            assert schema.validate(document).is_valid == expected
+            exported = ordering.export()
+        with AdaptiveOrdering(schema, interval=10 ** 9, ordering=exported):
+            reloaded = measure(lambda: schema.validate(document), number=2000)
+        report("{}, declared order".format(name), before)
+        report("{}, learned order ({:.1f}x)".format(name, before / after), after)
+        report("{}, reloaded order ({:.1f}x)".format(name, before / reloaded), reloaded)
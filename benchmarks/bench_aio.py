@@ -0,0 +1,106 @@
+'''
+Measures the asyncio API: loading a schema whose references are served by a slow local server, and how long other
+tasks of the event loop wait while a stream of documents is validated.
+'''
+import asyncio
+import json
+import threading
+import time
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+from validator import get_schema_from_url
+from validator.aio import aget_schema_from_url, avalidate_stream
+from validator.registry import SchemaRegistry
+from benchmarks.common import report
+
+DELAY = 0.05
+"""Seconds the server waits before answering."""
+
+REFERENCES = 10
+
+
+def serve():
+    """
+    Starts a server whose root schema references `REFERENCES` schemas.
+    :return: Tuple (server, url of the root schema).
+    """
+
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            time.sleep(DELAY)
+            name = self.path.strip("/")
+            if name == "root.json":
+                base = "http://127.0.0.1:{}/".format(self.server.server_port)
+                body = {"type": "object",
+                        "properties": {"p" + str(i): {"$ref": base + "s" + str(i) + ".json"} for i in range(REFERENCES)}}
+            else:
+                body = {"type": "array", "items": {"type": "string", "maxLength": 10}}
+            data = json.dumps(body).encode("utf-8")
+            self.send_response(200)
+            self.send_header("Content-Length", str(len(data)))
+            self.end_headers()
+            self.wfile.write(data)
+
+        def log_message(self, *args):
+            pass
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, "http://127.0.0.1:{}/root.json".format(server.server_port)
+
+
+async def loop_delays(coroutine):
+    """
+    Runs a coroutine while another task sleeps 1 ms in a loop.
+    :return: Tuple (result of the coroutine, sorted list of the extra seconds each sleep took).
+    """
+
+    delays = []
+    running = True
+
+    async def ticker():
+        while running:
+            start = time.perf_counter()
+            await asyncio.sleep(0.001)
+            delays.append(time.perf_counter() - start - 0.001)
+
+    task = asyncio.create_task(ticker())
+    # Lets the ticker start its first sleep.
+    await asyncio.sleep(0)
+    result = await coroutine
+    running = False
+    await task
+    return result, sorted(delays)
+
+
+async def collect(schema, documents):
+    return [response async for response in avalidate_stream(schema, documents)]
+
+
+async def validate_on_the_loop(schema, documents):
+    return [schema.validate(document) for document in documents]
+
+
+def run():
+    server, url = serve()
+    try:
+        start = time.perf_counter()
+        # A new registry each time, so every reference is fetched.
+        get_schema_from_url(url, registry=SchemaRegistry())
+        report("get_schema_from_url, {} references, {} ms server".format(REFERENCES, int(DELAY * 1e3)),
+               time.perf_counter() - start)
+        start = time.perf_counter()
+        schema = asyncio.run(aget_schema_from_url(url, registry=SchemaRegistry()))
+        report("aget_schema_from_url, {} references, {} ms server".format(REFERENCES, int(DELAY * 1e3)),
+               time.perf_counter() - start)
+    finally:
+        server.shutdown()
+
+    documents = [{"p0": ["x"] * 20000}] * 5 + [{"p1": ["a", "b"]}] * 5000
+    for name, coroutine in [("schema.validate on the event loop", validate_on_the_loop),
+                            ("avalidate_stream", collect)]:
+        start = time.perf_counter()
+        _, delays = asyncio.run(loop_delays(coroutine(schema, documents)))
+        elapsed = time.perf_counter() - start
+        print("{:<36} total {:>8.1f} ms   other tasks delayed p50 {:>6.2f} ms  p99 {:>6.2f} ms  max {:>6.2f} ms".format(
+            name, elapsed * 1e3, delays[len(delays) // 2] * 1e3, delays[int(len(delays) * 0.99)] * 1e3,
+            delays[-1] * 1e3))
@@ -0,0 +1,45 @@
+'''
+Validation of a list of flat records one by one and as a batch (column by column), with a few invalid records.
+'''
+import random
+from validator import get_schema
+from benchmarks.common import measure, report
+
+RECORD_SCHEMA = {
+    "type": "object",
+    "required": ["id", "name", "temperature"],
+    "properties": {
+        "id": {"type": "integer", "minimum": 0},
+        "name": {"type": "string", "minLength": 1, "maxLength": 32},
+        "status": {"type": "string", "enum": ["ok", "warning", "error"]},
+        "temperature": {"type": "number", "minimum": -100, "maximum": 100},
+        "humidity": {"type": "number", "minimum": 0, "maximum": 1},
+        "count": {"type": "integer", "multipleOf": 1},
+    },
+    "additionalProperties": False,
+}
+
+
+def get_records(size):
+    random.seed(size)
+    records = [{"id": i, "name": "sensor-{}".format(i % 100), "status": random.choice(["ok", "warning", "error"]),
+                "temperature": random.uniform(-20, 40), "humidity": random.random(), "count": random.randrange(100)}
+               for i in range(size)]
+    for i in range(0, size, 1000):
+        records[i]["temperature"] = 500.0
+    return records
+
+
+def run():
+    schema = get_schema(RECORD_SCHEMA)
+    for size in [100, 10000]:
+        records = get_records(size)
+        batch = schema.validate_batch(records)
+        one_by_one = [schema.validate(record) for record in records]
+        assert batch.valid == [response.is_valid for response in one_by_one]
+        assert all(batch.errors[i].schema_pointer.nodes == one_by_one[i].schema_pointer.nodes for i in batch.errors)
+        number = max(1, 10000 // size)
+        single = measure(lambda: [schema.validate(record) for record in records], number=number)
+        columns = measure(lambda: schema.validate_batch(records), number=number)
+        report("{} records one by one".format(size), single)
+        report("{} records as a batch ({:.1f}x)".format(size, single / columns), columns)
@@ -0,0 +1,32 @@
+'''
+Validation of hostile documents with and without a budget, and the overhead of a budget on an ordinary document.
+'''
+from validator import get_schema
+from validator.budget import Budget, BudgetExceededResponse
+from benchmarks.common import measure, report, PERSON_SCHEMA, PERSON
+
+BUDGET = Budget(seconds=0.01, nodes=10000, depth=32, string_bytes=100000)
+
+WIDE_SCHEMA = {"type": "array", "items": {"oneOf": [{"type": "object", "required": ["kind" + str(i)],
+                                                     "properties": {"value": {"type": "array",
+                                                                              "items": {"type": "integer"}}}}
+                                                    for i in range(50)]}}
+
+
+def run():
+    cases = [
+        ("uniqueItems, 20000 objects", get_schema({"type": "array", "uniqueItems": True}),
+         [{"id": i, "tags": [i, i + 1]} for i in range(20000)]),
+        ("wide oneOf, 200 objects", get_schema(WIDE_SCHEMA),
+         [{"kind49": 1, "value": list(range(100))} for _ in range(200)]),
+        ("pattern, 1 MB string", get_schema({"type": "string", "pattern": "^(a|b)*c$"}), "ab" * 500000),
+    ]
+    for name, schema, document in cases:
+        report("{}: no budget".format(name), measure(lambda: schema.validate(document), 1, 3))
+        assert isinstance(schema.validate(document, budget=BUDGET), BudgetExceededResponse)
+        report("{}: with a budget".format(name), measure(lambda: schema.validate(document, budget=BUDGET), 1, 3))
+    schema = get_schema(PERSON_SCHEMA)
+    assert schema.validate(PERSON, budget=BUDGET).is_valid
+    report("person: recursive", measure(lambda: schema.validate(PERSON), 10000))
+    report("person: iterative", measure(lambda: schema.validate(PERSON, iterative=True), 10000))
+    report("person: budget", measure(lambda: schema.validate(PERSON, budget=BUDGET), 10000))
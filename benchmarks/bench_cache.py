@@ -0,0 +1,39 @@
+'''
+Compares building a schema with loading it from the on-disk cache.
+'''
+import json
+import os
+import tempfile
+from validator import get_schema, get_schema_from_file
+from validator.cache import SchemaCache
+from benchmarks.common import measure, report
+from benchmarks.schemas import many_definitions_schema, many_definitions_document
+
+META_SCHEMA_FILE = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "validator",
+                                "meta_schema.json")
+
+
+def run():
+    with tempfile.TemporaryDirectory() as directory:
+        for size in [50, 300]:
+            json_schema = many_definitions_schema(size)
+            path = os.path.join(directory, "schema{}.json".format(size))
+            with open(path, "w") as f:
+                json.dump(json_schema, f)
+            # A new cache object for every load, like a new process would do.
+            SchemaCache(directory).get_schema_from_file(path)
+            SchemaCache(directory).get_schema(json_schema)
+            report("{} definitions: get_schema_from_file".format(size),
+                   measure(lambda: get_schema_from_file(path), 5, 3))
+            report("{} definitions: SchemaCache.get_schema_from_file (warm)".format(size),
+                   measure(lambda: SchemaCache(directory).get_schema_from_file(path), 5, 3))
+            report("{} definitions: get_schema".format(size), measure(lambda: get_schema(json_schema), 5, 3))
+            report("{} definitions: SchemaCache.get_schema (warm)".format(size),
+                   measure(lambda: SchemaCache(directory).get_schema(json_schema), 5, 3))
+            document = many_definitions_document(10)
+            assert SchemaCache(directory).get_schema(json_schema).validate(document).is_valid
+
+        SchemaCache(directory).get_schema_from_file(META_SCHEMA_FILE)
+        report("meta schema: get_schema_from_file", measure(lambda: get_schema_from_file(META_SCHEMA_FILE), 20, 3))
+        report("meta schema: SchemaCache.get_schema_from_file (warm)",
+               measure(lambda: SchemaCache(directory).get_schema_from_file(META_SCHEMA_FILE), 20, 3))
@@ -0,0 +1,71 @@
+'''
+Compares the recursive validation with the iterative one (`schema.validate(document, iterative=True)`) on deeply nested
+documents. The recursive one needs a higher recursion limit for them.
+'''
+import sys
+from validator import get_schema
+from benchmarks.common import measure, report
+
+TREE_SCHEMA = {
+    "definitions": {
+        "node": {
+            "type": "object",
+            "required": ["name"],
+            "properties": {
+                "name": {"type": "string", "maxLength": 20},
+                "size": {"type": "integer", "minimum": 0},
+                "child": {"$ref": "#/definitions/node"},
+                "items": {"type": "array", "items": {"$ref": "#/definitions/node"}}
+            },
+            "additionalProperties": False
+        }
+    },
+    "$ref": "#/definitions/node"
+}
+
+NESTED_ARRAY_SCHEMA = {"type": "array", "items": {"anyOf": [{"type": "integer"}, {"$ref": "#"}]}}
+
+
+def tree(depth):
+    document = {"name": "leaf", "size": 0}
+    for i in range(depth):
+        document = {"name": "n" + str(i), "size": i, "child": document}
+    return document
+
+
+def nested_array(depth):
+    document = [1, 2]
+    for _ in range(depth):
+        document = [1, document]
+    return document
+
+
+def run():
+    limit = sys.getrecursionlimit()
+    sys.setrecursionlimit(1000000)
+    try:
+        for name, json_schema, build in [("nested objects", TREE_SCHEMA, tree),
+                                         ("nested arrays", NESTED_ARRAY_SCHEMA, nested_array)]:
+            schema = get_schema(json_schema)
+            for depth in [100, 1000, 5000]:
+                document = build(depth)
+                assert schema.validate(document).is_valid and schema.validate(document, iterative=True).is_valid
+                number = max(1, 20000 // depth)
+                recursive = measure(lambda: schema.validate(document), number)
+                iterative = measure(lambda: schema.validate(document, iterative=True), number)
+                report("{}, depth {}: recursive".format(name, depth), recursive)
+                report("{}, depth {}: iterative ({:.1f}x)".format(name, depth, recursive / iterative), iterative)
+    finally:
+        sys.setrecursionlimit(limit)
+    schema = get_schema(TREE_SCHEMA)
+    document = tree(100000)
+    report("nested objects, depth 100000: iterative", measure(lambda: schema.validate(document, iterative=True), 1, 1))
+    document["child"] = tree(99999)
+    last = document
+    while "child" in last:
+        last = last["child"]
+    last["size"] = -1
+    response = schema.validate(document, iterative=True)
+    assert len(response.document_pointer.nodes) == 100001
+    report("nested objects, depth 100000, invalid: iterative",
+           measure(lambda: schema.validate(document, iterative=True), 1, 1))
@@ -0,0 +1,44 @@
+'''
+Format checkers of `validator.formats` compared with regular expressions that check the same formats.
+'''
+import re
+from validator import get_schema
+from validator.formats import FORMATS
+from benchmarks.common import measure, report
+
+REGULAR_EXPRESSIONS = {
+    "date-time": "^\\d{4}-\\d{2}-\\d{2}[Tt]\\d{2}:\\d{2}:\\d{2}(\\.\\d+)?([Zz]|[+-]\\d{2}:\\d{2})$",
+    "email": "^[A-Za-z0-9!#$%&'*+/=?^_`{|}~-]+(\\.[A-Za-z0-9!#$%&'*+/=?^_`{|}~-]+)*@"
+             "[A-Za-z0-9]([A-Za-z0-9-]{0,61}[A-Za-z0-9])?(\\.[A-Za-z0-9]([A-Za-z0-9-]{0,61}[A-Za-z0-9])?)*$",
+    "hostname": "^(?=.{1,253}$)[A-Za-z0-9]([A-Za-z0-9-]{0,61}[A-Za-z0-9])?(\\.[A-Za-z0-9]([A-Za-z0-9-]{0,61}"
+                "[A-Za-z0-9])?)*$",
+    "ipv4": "^((25[0-5]|2[0-4]\\d|1\\d\\d|[1-9]?\\d)\\.){3}(25[0-5]|2[0-4]\\d|1\\d\\d|[1-9]?\\d)$",
+    "ipv6": "^(([0-9A-Fa-f]{1,4}:){7}[0-9A-Fa-f]{1,4}|(([0-9A-Fa-f]{1,4}:){0,6}[0-9A-Fa-f]{1,4})?::"
+            "(([0-9A-Fa-f]{1,4}:){0,6}[0-9A-Fa-f]{1,4})?)$",
+    "uri": "^[A-Za-z][A-Za-z0-9+.-]*:([A-Za-z0-9._~:/?#\\[\\]@!$&'()*+,;=-]|%[0-9A-Fa-f]{2})*$",
+}
+"""Regular expressions like the ones of other validators (they check the syntax, not the ranges of the dates)."""
+
+STRINGS = {
+    "date-time": ["2020-02-29T23:59:59.123+01:00", "2020-02-29 23:59:59"],
+    "email": ["someone.else@mail.example.com", "someone.else@@example.com"],
+    "hostname": ["www.mail.example.com", "www.-example.com"],
+    "ipv4": ["192.168.100.254", "192.168.100.256"],
+    "ipv6": ["2001:db8:85a3::8a2e:370:7334", "2001:db8:85a3::8a2e::7334"],
+    "uri": ["https://example.com/a/b?c=d&e=f#g", "https://example.com/a b"],
+}
+"""Valid and invalid strings of each format."""
+
+
+def run():
+    for name, strings in STRINGS.items():
+        checker = FORMATS[name]
+        match = re.compile(REGULAR_EXPRESSIONS[name]).match
+        for string, kind in zip(strings, ["valid", "invalid"]):
+            assert checker(string) == (kind == "valid")
+            report("{} {}: checker".format(name, kind), measure(lambda: checker(string), 100000))
+            report("{} {}: regular expression".format(name, kind), measure(lambda: match(string), 100000))
+    schema = get_schema({"type": "string", "format": "email"})
+    plain = get_schema({"type": "string"})
+    report("email: schema without format", measure(lambda: plain.validate(STRINGS["email"][0]), 10000))
+    report("email: schema with format", measure(lambda: schema.validate(STRINGS["email"][0]), 10000))
@@ -0,0 +1,63 @@
+'''
+Measures how long `import validator` takes with `python -X importtime`, and the time to the first validation of a
+fresh process (import, meta schema load and schema build).
+'''
+import os
+import statistics
+import subprocess
+import sys
+
+NETWORK_MODULES = ["urllib.request", "http.client", "ssl", "email"]
+
+FIRST_VALIDATION = """
+import time
+start = time.perf_counter()
+from validator import get_schema
+get_schema({"type": "object", "properties": {"a": {"type": "integer"}}}).validate({"a": 1})
+print(time.perf_counter() - start)
+"""
+
+
+def import_time():
+    """
+    :return: Tuple (microseconds of `import validator`, dict of module to its cumulative microseconds).
+    """
+
+    output = subprocess.run([sys.executable, "-X", "importtime", "-c", "import validator"], cwd=root(),
+                            stderr=subprocess.PIPE, universal_newlines=True, check=True).stderr
+    modules = {}
+    for line in output.splitlines():
+        if not line.startswith("import time:") or "|" not in line:
+            continue
+        _, cumulative, name = line[len("import time:"):].split("|")
+        if cumulative.strip().isdigit():
+            modules[name.strip()] = int(cumulative)
+    return modules["validator"], modules
+
+
+def first_validation_time():
+    output = subprocess.run([sys.executable, "-c", FIRST_VALIDATION], cwd=root(), stdout=subprocess.PIPE,
+                            universal_newlines=True, check=True).stdout
+    return float(output)
+
+
+def root():
+    return os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def run(repeat=7):
+    times = []
+    modules = {}
+    for _ in range(repeat):
+        microseconds, modules = import_time()
+        times.append(microseconds)
+    print("import validator (median of {}): {:.1f} ms".format(repeat, statistics.median(times) / 1e3))
+    if os.environ.get("PYTHONDONTWRITEBYTECODE"):
+        print("  (PYTHONDONTWRITEBYTECODE is set, so this includes compiling the modules)")
+    for name in sorted(modules, key=modules.get, reverse=True):
+        if name.startswith("validator"):
+            print("  {:<30} {:>8.1f} ms".format(name, modules[name] / 1e3))
+    loaded = [name for name in NETWORK_MODULES if name in modules]
+    print("network modules loaded at import:", ", ".join(loaded) if loaded else "none")
+    first = [first_validation_time() for _ in range(repeat)]
+    print("import + first get_schema + validate (median): {:.1f} ms".format(statistics.median(first) * 1e3))
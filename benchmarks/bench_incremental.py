@@ -0,0 +1,33 @@
+'''
+Compares building an edited schema with 5,000 definitions again with `get_schema` and updating the previous version
+with `validator.incremental.update_schema`, for edits of definitions that are referenced by more or less others.
+'''
+import json
+from validator import get_schema
+from validator.incremental import update_schema
+from benchmarks.common import measure, report
+from benchmarks.schemas import many_definitions_schema
+
+SIZE = 5000
+
+EDITED = ["d4999", "d100", "d1"]
+"""Edited definitions. In `many_definitions_schema` the definition i is referenced by 2i and 2i + 1, so an edit of d4999
+builds one definition again, one of d100 about 60 and one of d1 all of them but d0."""
+
+
+def run():
+    json_schema = many_definitions_schema(SIZE)
+    schema = get_schema(json_schema)
+    text = json.dumps(json_schema)
+    report("{} definitions: get_schema".format(SIZE), measure(lambda: get_schema(json_schema), 1, 3))
+    for name in EDITED:
+        patch = [{"op": "replace", "path": "/definitions/{}/properties/name/maxLength".format(name), "value": 30}]
+        edited = json.loads(text)
+        edited["definitions"][name]["properties"]["name"]["maxLength"] = 30
+        assert update_schema(schema, patch=patch).validate({"p1": {"id": 1, "name": "n" * 25}}).is_valid == \
+            (name == "d1")
+        report("{} edited: get_schema of the new dict".format(name), measure(lambda: get_schema(edited), 1, 3))
+        report("{} edited: update_schema with the new dict".format(name),
+               measure(lambda: update_schema(schema, edited), 1, 3))
+        report("{} edited: update_schema with a JSON Patch".format(name),
+               measure(lambda: update_schema(schema, patch=patch), 1, 3))
@@ -0,0 +1,45 @@
+'''
+Compares building a schema with thousands of definitions eagerly and lazily, when a document only uses a few of them.
+'''
+import tracemalloc
+from validator import get_schema
+from validator.classes import build_all
+from benchmarks.common import measure, report
+from benchmarks.schemas import many_definitions_schema, many_definitions_document
+
+
+def allocated(function):
+    """
+    :param function: Function without arguments.
+    :return: Bytes still allocated by what the function returns.
+    """
+
+    tracemalloc.start()
+    result = function()
+    size = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    del result
+    return size
+
+
+def validated(schema, document):
+    schema.validate(document)
+    return schema
+
+
+def run():
+    document = many_definitions_document(5)
+    for size in [1000, 5000]:
+        json_schema = many_definitions_schema(size)
+        report("{} definitions: get_schema".format(size), measure(lambda: get_schema(json_schema), 1, 3))
+        report("{} definitions: get_schema(lazy=True)".format(size),
+               measure(lambda: get_schema(json_schema, lazy=True), 1, 3))
+        report("{} definitions: get_schema(lazy=True) + first validation".format(size),
+               measure(lambda: get_schema(json_schema, lazy=True).validate(document), 1, 3))
+        report("{} definitions: get_schema(lazy=True) + build_all".format(size),
+               measure(lambda: build_all(get_schema(json_schema, lazy=True)), 1, 3))
+        print("{:<60} {:>10.1f} MB".format("{} definitions: memory, eager".format(size),
+                                           allocated(lambda: get_schema(json_schema)) / 1e6))
+        print("{:<60} {:>10.1f} MB".format("{} definitions: memory, lazy after a validation".format(size),
+                                           allocated(lambda: validated(get_schema(json_schema, lazy=True), document))
+                                           / 1e6))
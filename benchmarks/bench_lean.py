@@ -0,0 +1,28 @@
+'''
+Compares the memory a schema with thousands of definitions keeps alive when it's built normally and with `lean=True`,
+after the caller dropped the dict it was loaded from.
+'''
+import json
+from validator import get_schema
+from benchmarks.bench_lazy import allocated
+from benchmarks.common import measure, report
+from benchmarks.schemas import many_definitions_schema
+
+
+def run():
+    invalid = []
+    for size in [1000, 5000]:
+        text = json.dumps(many_definitions_schema(size))
+        normal = allocated(lambda: get_schema(json.loads(text)))
+        lean = allocated(lambda: get_schema(json.loads(text), lean=True))
+        print("{:<60} {:>10.1f} MB".format("{} definitions: memory".format(size), normal / 1e6))
+        print("{:<60} {:>10.1f} MB".format("{} definitions: memory, lean ({:.1f}x less)".format(size, normal / lean),
+                                           lean / 1e6))
+        report("{} definitions: get_schema".format(size), measure(lambda: get_schema(json.loads(text)), 1, 3))
+        report("{} definitions: get_schema(lean=True)".format(size),
+               measure(lambda: get_schema(json.loads(text), lean=True), 1, 3))
+        schema = get_schema(json.loads(text), lean=True)
+        response = schema.validate(invalid)
+        assert not response.is_valid
+        report("{} definitions: lean schema_pointer.get_json()".format(size),
+               measure(lambda: response.schema_pointer.get_json(), 1, 3))
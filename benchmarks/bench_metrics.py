@@ -0,0 +1,25 @@
+'''
+Measures the overhead of the validation metrics that `Schema.validate` records.
+'''
+from validator import get_schema
+from validator.metrics import METRICS
+from benchmarks.common import measure, report, PERSON_SCHEMA, PERSON
+
+
+def run():
+    schema = get_schema(PERSON_SCHEMA)
+    invalid = dict(PERSON, age=-1)
+
+    METRICS.enabled = False
+    disabled_valid = measure(lambda: schema.validate(PERSON))
+    disabled_invalid = measure(lambda: schema.validate(invalid))
+    METRICS.enabled = True
+    enabled_valid = measure(lambda: schema.validate(PERSON))
+    enabled_invalid = measure(lambda: schema.validate(invalid))
+
+    report("valid document, metrics disabled", disabled_valid)
+    report("valid document, metrics enabled", enabled_valid)
+    report("invalid document, metrics disabled", disabled_invalid)
+    report("invalid document, metrics enabled", enabled_invalid)
+    print("overhead per valid document:   {:.1f}%".format((enabled_valid / disabled_valid - 1) * 100))
+    print("overhead per invalid document: {:.1f}%".format((enabled_invalid / disabled_invalid - 1) * 100))
@@ -0,0 +1,60 @@
+'''
+Validation of large arrays of numbers with and without the NumPy path, for lists and NumPy arrays and for arrays of
+different sizes (to find where NumPy starts to pay off, see `VECTORIZE_SIZE`).
+'''
+import random
+from validator import get_schema
+from validator import classes
+from validator.vectorized import get_numpy
+from benchmarks.common import measure, report
+
+SCHEMAS = {
+    "integer": {"type": "array", "items": {"type": "integer", "minimum": 0, "maximum": 1000000, "multipleOf": 2}},
+    "number": {"type": "array", "items": {"type": "number", "minimum": -90, "maximum": 90,
+                                          "exclusiveMaximum": True}},
+}
+
+
+def get_document(kind, size):
+    random.seed(size)
+    if kind == "integer":
+        return [random.randrange(0, 500000) * 2 for _ in range(size)]
+    return [random.uniform(-90, 89.9) for _ in range(size)]
+
+
+def pure_python(function):
+    """
+    Runs a function with the NumPy path disabled.
+    """
+
+    size = classes.VECTORIZE_SIZE
+    classes.VECTORIZE_SIZE = float("inf")
+    try:
+        return function()
+    finally:
+        classes.VECTORIZE_SIZE = size
+
+
+def run():
+    numpy = get_numpy()
+    if numpy is None:
+        print("NumPy is not installed: only the pure Python path is available.")
+        return
+    for kind, json_schema in SCHEMAS.items():
+        schema = get_schema(json_schema)
+        for size in [10, 32, 100, 1000, 100000]:
+            document = get_document(kind, size)
+            number = max(1, 100000 // size)
+            python = pure_python(lambda: measure(lambda: schema.validate(document), number=number))
+            vectorized = measure(lambda: schema.validate(document), number=number)
+            report("{} list of {} items, pure python".format(kind, size), python)
+            report("{} list of {} items, numpy ({:.1f}x)".format(kind, size, python / vectorized), vectorized)
+        array = numpy.array(document)
+        report("{} ndarray of {} items".format(kind, size), measure(lambda: schema.validate(array), number=10))
+
+        invalid = list(document)
+        invalid[-1] = -100
+        python = pure_python(lambda: schema.validate(invalid))
+        vectorized = schema.validate(invalid)
+        assert not vectorized.is_valid and vectorized.document_pointer.nodes == python.document_pointer.nodes and \
+            vectorized.schema_pointer.nodes == python.schema_pointer.nodes
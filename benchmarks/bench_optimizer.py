@@ -0,0 +1,54 @@
+'''
+Throughput of a schema with the dead weight that schema generators produce (nested and single member allOf, `{}`
+subschemas, anyOf with a branch that accepts anything, checks that an enum makes useless) before and after `optimize`.
+'''
+from validator import get_schema
+from validator.optimizer import optimize
+from benchmarks.common import measure, report
+
+PROPERTIES = 40
+
+
+def generated_schema(size):
+    properties = {}
+    for i in range(size):
+        kind = i % 4
+        if kind == 0:
+            properties["p{}".format(i)] = {"allOf": [{"allOf": [{"allOf": [{"type": "integer", "minimum": 0}]}, {}]}]}
+        elif kind == 1:
+            properties["p{}".format(i)] = {"anyOf": [{"type": "string"}, {}], "description": "generated"}
+        elif kind == 2:
+            properties["p{}".format(i)] = {"type": "integer", "enum": [1, 2, 3], "minimum": 0, "maximum": 10,
+                                           "multipleOf": 1}
+        else:
+            properties["p{}".format(i)] = {"allOf": [{}, {"type": "array", "items": {"allOf": [{"type": "number"}]},
+                                                          "additionalItems": {}}]}
+    return {"type": "object", "properties": properties, "additionalProperties": {}, "allOf": [{}]}
+
+
+def generated_document(size, valid=True):
+    document = {}
+    for i in range(size):
+        kind = i % 4
+        document["p{}".format(i)] = [i, "text", 2, [1.5, 2, 3.25]][kind]
+    if not valid:
+        document["p{}".format(size - 2)] = 7
+    return document
+
+
+def run():
+    json_schema = generated_schema(PROPERTIES)
+    schema = get_schema(json_schema)
+    optimized = optimize(schema)
+    for valid in [True, False]:
+        document = generated_document(PROPERTIES, valid)
+        before, after = schema.validate(document), optimized.validate(document)
+        assert before.is_valid == after.is_valid == valid
+        assert valid or before.schema_pointer.nodes == after.schema_pointer.nodes
+        original = measure(lambda: schema.validate(document), number=2000)
+        faster = measure(lambda: optimized.validate(document), number=2000)
+        kind = "valid" if valid else "invalid"
+        report("{} document, original schema".format(kind), original)
+        report("{} document, optimized schema ({:.2f}x)".format(kind, original / faster), faster)
+    report("optimize", measure(lambda: optimize(get_schema(json_schema)), number=20) -
+           measure(lambda: get_schema(json_schema), number=20))
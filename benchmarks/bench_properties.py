@@ -0,0 +1,41 @@
+'''
+Validation of objects against a schema with 500 properties: complete documents, documents with a few keys,
+documents with additional properties and documents that break a property dependency, and the time of the required,
+dependencies and additionalProperties checks alone.
+'''
+from validator import get_schema
+from benchmarks.common import measure, report
+
+PROPERTIES = 500
+
+
+def wide_schema(size, additional_properties):
+    properties = {"p{}".format(i): {} for i in range(size)}
+    return {
+        "type": "object",
+        "properties": properties,
+        "required": ["p{}".format(i) for i in range(0, size, 10)],
+        "dependencies": {"p{}".format(i): ["p{}".format(i + 1), "p{}".format(i + 2)] for i in range(0, size - 2, 50)},
+        "additionalProperties": additional_properties,
+    }
+
+
+def run():
+    for additional_properties in [False, {}]:
+        schema = get_schema(wide_schema(PROPERTIES, additional_properties))
+        small = get_schema(wide_schema(PROPERTIES, additional_properties) | {"required": []})
+        complete = {"p{}".format(i): i for i in range(PROPERTIES)}
+        extra = dict(complete, extra=1)
+        broken = dict(complete)
+        del broken["p452"]
+        few = {"p3": 3, "p7": 7}
+        assert schema.validate(complete) and not schema.validate(broken) and small.validate(few)
+        assert bool(schema.validate(extra)) == (additional_properties != False)
+        name = "additionalProperties={}".format(additional_properties)
+        report("{} complete document".format(name), measure(lambda: schema.validate(complete), number=200))
+        report("{} document with an additional key".format(name), measure(lambda: schema.validate(extra), number=200))
+        report("{} document missing a dependency".format(name), measure(lambda: schema.validate(broken), number=200))
+        report("{} document with 2 keys".format(name), measure(lambda: small.validate(few), number=2000))
+        for keyword in ["required_properties", "dependencies", "additional_properties"]:
+            method = getattr(schema, "validate_" + keyword)
+            report("{} validate_{} (complete document)".format(name, keyword), measure(lambda: method(complete)))
@@ -0,0 +1,18 @@
+'''
+Measures the detection of unproductive $ref cycles on schemas with thousands of definitions. The time per definition
+should stay flat as the schemas grow (the garbage collector adds some growth on the largest ones).
+'''
+from validator.refs import ReferenceGraph
+from benchmarks.common import measure, report
+from benchmarks.schemas import many_definitions_schema, reference_chain_schema
+
+
+def run():
+    for size in [1000, 5000, 20000]:
+        for name, json_schema in [("definitions", many_definitions_schema(size)),
+                                  ("chained definitions", reference_chain_schema(size))]:
+            graph = ReferenceGraph(json_schema)
+            assert not graph.get_cycles()
+            seconds = measure(lambda: ReferenceGraph(json_schema).get_cycles(), 1, 3)
+            report("{} {}: build graph + find cycles ({} vertices)".format(size, name, len(graph.vertices)), seconds)
+            report("{} {}: per definition".format(size, name), seconds / size)
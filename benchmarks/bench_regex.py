@@ -0,0 +1,52 @@
+'''
+Validation of strings against patterns that make `re` backtrack, with the linear time matcher and with `re`.
+'''
+from validator import get_schema
+from validator import utils
+from benchmarks.common import measure, report
+
+ADVERSARIAL = [
+    ("(a+)+$", "a" * 20 + "!"),
+    ("^(\\w+\\s?)*$", "word " * 4 + "word!"),
+    ("^(a|aa)+$", "a" * 28 + "!"),
+    ("(x+x+)+y", "x" * 18),
+    (".*.*=.*x", "=" * 300),
+]
+"""Patterns and strings that `re` takes exponential or polynomial time to match."""
+
+ORDINARY = [
+    ("^[a-z0-9._%+-]+@[a-z0-9.-]+\\.[a-z]{2,}$", "someone.else@example.com"),
+    ("^\\d{4}-\\d{2}-\\d{2}$", "2020-02-29"),
+    ("^[A-Z]{3}[0-9]{6}$", "ABC12345"),
+]
+
+
+def measure_matcher(pattern, string, linear, number):
+    """
+    :param pattern: Regular expression.
+    :param string: String to validate.
+    :param linear: Whether the linear time matcher is used.
+    :param number: Number of validations per repetition.
+    :return: Tuple with the seconds a validation of the string against a schema with the pattern takes and whether
+    the string is valid.
+    """
+
+    utils.LINEAR_PATTERNS = linear
+    utils.PATTERNS.clear()
+    try:
+        schema = get_schema({"type": "string", "pattern": pattern})
+        return measure(lambda: schema.validate(string), number, 3), schema.validate(string).is_valid
+    finally:
+        utils.LINEAR_PATTERNS = True
+        utils.PATTERNS.clear()
+
+
+def run():
+    for pattern, string in ADVERSARIAL + ORDINARY:
+        number = 1 if (pattern, string) in ADVERSARIAL else 10000
+        backtracking, is_valid = measure_matcher(pattern, string, False, number)
+        linear, linear_is_valid = measure_matcher(pattern, string, True, number)
+        assert is_valid == linear_is_valid
+        report("{}: re".format(pattern), backtracking)
+        report("{}: linear".format(pattern), linear)
+    report("(a+)+$, 1 MB string: linear", measure_matcher("(a+)+$", "a" * 1000000 + "!", True, 1)[0])
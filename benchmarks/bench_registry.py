@@ -0,0 +1,37 @@
+'''
+Compares building schemas that share an external reference with and without the schema registry.
+'''
+import json
+import os
+import tempfile
+from validator import get_schema
+from validator.registry import SchemaRegistry
+from benchmarks.common import measure, report
+from benchmarks.schemas import many_definitions_schema
+
+
+def run():
+    with tempfile.TemporaryDirectory() as directory:
+        shared = os.path.join(directory, "shared.json")
+        with open(shared, "w") as f:
+            json.dump(many_definitions_schema(100), f)
+        families = [{"properties": {"p{}".format(j): {"$ref": shared} for j in range(i % 5 + 1)}} for i in range(20)]
+
+        def build(registry):
+            for json_schema in families:
+                get_schema(json_schema, registry=registry)
+
+        class ForgetfulRegistry(SchemaRegistry):
+            """Registry that never keeps anything, like resolving every reference from scratch."""
+
+            def get_schema_from_reference(self, reference):
+                self.clear()
+                return super().get_schema_from_reference(reference)
+
+        report("20 schemas referencing a 100 definition file: no sharing",
+               measure(lambda: build(ForgetfulRegistry()), 3, 3))
+        report("20 schemas referencing a 100 definition file: new registry",
+               measure(lambda: build(SchemaRegistry()), 3, 3))
+        registry = SchemaRegistry()
+        registry.register_files([shared])
+        report("20 schemas referencing a 100 definition file: warm registry", measure(lambda: build(registry), 3, 3))
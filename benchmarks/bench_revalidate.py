@@ -0,0 +1,66 @@
+'''
+Compares validating a patched document of about 10 MB again with `Schema.validate` and checking only the patch with
+`Schema.revalidate`.
+'''
+import json
+from validator import get_schema
+from benchmarks.common import measure, report
+
+SCHEMA = {
+    "type": "object",
+    "required": ["orders"],
+    "properties": {
+        "orders": {
+            "type": "array",
+            "maxItems": 1000000,
+            "items": {
+                "type": "object",
+                "required": ["id", "customer", "lines"],
+                "properties": {
+                    "id": {"type": "integer", "minimum": 0},
+                    "customer": {"type": "string", "minLength": 1, "maxLength": 50},
+                    "status": {"enum": ["open", "paid", "shipped"]},
+                    "lines": {
+                        "type": "array",
+                        "items": {
+                            "type": "object",
+                            "properties": {"sku": {"type": "string"}, "quantity": {"type": "integer", "minimum": 1}},
+                            "additionalProperties": False
+                        }
+                    }
+                }
+            }
+        }
+    }
+}
+
+PATCHES = {
+    "replace a field": [{"op": "replace", "path": "/orders/25000/customer", "value": "Grace"}],
+    "append a line": [{"op": "add", "path": "/orders/25000/lines/-", "value": {"sku": "B-2", "quantity": 3}}],
+    "append an order": [{"op": "add", "path": "/orders/-",
+                         "value": {"id": 60000, "customer": "Alan", "status": "open", "lines": []}}],
+}
+
+
+def get_document(size):
+    """
+    :param size: Number of orders.
+    :return: Dict that is valid against `SCHEMA`.
+    """
+
+    return {"orders": [{"id": i, "customer": "Customer " + str(i), "status": "paid",
+                        "lines": [{"sku": "A-" + str(j), "quantity": j + 1} for j in range(4)]} for i in range(size)]}
+
+
+def run():
+    schema = get_schema(SCHEMA)
+    document = get_document(50000)
+    report("{:.1f} MB document: validate".format(len(json.dumps(document)) / 1e6),
+           measure(lambda: schema.validate(document), 1, 3))
+    for name, patch in PATCHES.items():
+        new_document, response = schema.revalidate(document, patch)
+        assert response.is_valid and schema.validate(new_document).is_valid
+        report("{}: revalidate".format(name), measure(lambda: schema.revalidate(document, patch), 100))
+    # Replacing a field can be repeated in place, since the document stays the same.
+    patch = PATCHES["replace a field"]
+    report("replace a field: revalidate in place", measure(lambda: schema.revalidate(document, patch, True), 100))
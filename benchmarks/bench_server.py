@@ -0,0 +1,158 @@
+'''
+Load test of the validation server: starts `python -m validator serve` on a Unix socket and measures the latency of
+concurrent requests (p50 and p99) and the throughput.
+
+It can also load an instance that's already running:
+
+    python -m benchmarks.bench_server --port 8080 --schema person --clients 32 --requests 200
+'''
+import argparse
+import asyncio
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+from benchmarks.common import report, PERSON_SCHEMA, PERSON
+
+INVALID_PERSON = dict(PERSON, age="unknown")
+
+
+async def request(reader, writer, path, body, content_type="application/json"):
+    """
+    Sends a request over a kept alive connection and reads its response.
+    :param reader: asyncio.StreamReader object.
+    :param writer: asyncio.StreamWriter object.
+    :param path: Path of the request.
+    :param body: bytes.
+    :param content_type: Content type of the body.
+    :return: bytes of the body of the response.
+    """
+
+    writer.write("POST {} HTTP/1.1\r\nHost: localhost\r\nContent-Type: {}\r\nContent-Length: {}\r\n\r\n".format(
+        path, content_type, len(body)).encode() + body)
+    await writer.drain()
+    length = 0
+    while True:
+        line = await reader.readline()
+        if line == b"\r\n":
+            break
+        if line.lower().startswith(b"content-length:"):
+            length = int(line.split(b":")[1])
+    return await reader.readexactly(length)
+
+
+async def load(connect, schema, clients, requests, batch=1):
+    """
+    Sends requests from concurrent clients, each one over its own connection.
+    :param connect: Coroutine function that opens a connection and returns (reader, writer).
+    :param schema: Name of the schema in the server.
+    :param clients: Number of concurrent clients.
+    :param requests: Number of requests of each client.
+    :param batch: Number of documents of each request (more than one are sent as NDJSON).
+    :return: Tuple (sorted list of the latencies in seconds, seconds of the whole test).
+    """
+
+    documents = [PERSON if i % 2 == 0 else INVALID_PERSON for i in range(batch)]
+    if batch == 1:
+        body, content_type = json.dumps(PERSON).encode(), "application/json"
+    else:
+        body = "".join(json.dumps(document) + "\n" for document in documents).encode()
+        content_type = "application/x-ndjson"
+    latencies = []
+
+    async def client():
+        reader, writer = await connect()
+        try:
+            for _ in range(requests):
+                start = time.perf_counter()
+                response = await request(reader, writer, "/validate/" + schema, body, content_type)
+                latencies.append(time.perf_counter() - start)
+                assert response.count(b'"valid"') == batch, response
+        finally:
+            writer.close()
+
+    start = time.perf_counter()
+    await asyncio.gather(*[client() for _ in range(clients)])
+    return sorted(latencies), time.perf_counter() - start
+
+
+def report_load(name, latencies, seconds, documents):
+    """
+    :param name: Name of the measure.
+    :param latencies: Sorted list of the latencies of the requests.
+    :param seconds: Seconds of the whole test.
+    :param documents: Number of documents validated.
+    """
+
+    report("{}: p50".format(name), latencies[len(latencies) // 2])
+    report("{}: p99".format(name), latencies[min(len(latencies) - 1, len(latencies) * 99 // 100)])
+    report("{}: per document".format(name), seconds / documents)
+
+
+async def wait_for_socket(path, process, timeout=30):
+    """
+    :param path: Path of the Unix socket of the server.
+    :param process: subprocess.Popen object of the server.
+    :param timeout: Seconds to wait for the server to start.
+    """
+
+    deadline = time.monotonic() + timeout
+    while not os.path.exists(path):
+        if process.poll() is not None or time.monotonic() > deadline:
+            raise RuntimeError("The server didn't start.")
+        await asyncio.sleep(0.05)
+
+
+async def run_local(directory):
+    schema_path = os.path.join(directory, "person.json")
+    with open(schema_path, "w") as f:
+        json.dump(PERSON_SCHEMA, f)
+    socket_path = os.path.join(directory, "validator.sock")
+    process = subprocess.Popen([sys.executable, "-m", "validator", "serve", "--unix", socket_path, schema_path])
+    try:
+        await wait_for_socket(socket_path, process)
+
+        def connect():
+            return asyncio.open_unix_connection(socket_path)
+
+        for clients, batch in [(1, 1), (16, 1), (64, 1), (16, 100)]:
+            requests = max(2000 // (clients * batch), 20)
+            latencies, seconds = await load(connect, "person", clients, requests, batch)
+            report_load("{} clients, {} documents per request".format(clients, batch), latencies, seconds,
+                        clients * requests * batch)
+    finally:
+        process.terminate()
+        process.wait()
+
+
+def run():
+    with tempfile.TemporaryDirectory() as directory:
+        asyncio.run(run_local(directory))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Load test of a running validation server.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8080)
+    parser.add_argument("--unix", metavar="PATH")
+    parser.add_argument("--schema", default="person", help="name of a schema that PERSON documents are sent to")
+    parser.add_argument("--clients", type=int, default=16)
+    parser.add_argument("--requests", type=int, default=200, help="requests of each client")
+    parser.add_argument("--batch", type=int, default=1, help="documents of each request")
+    arguments = parser.parse_args()
+
+    def connect():
+        if arguments.unix:
+            return asyncio.open_unix_connection(arguments.unix)
+        return asyncio.open_connection(arguments.host, arguments.port)
+
+    latencies, seconds = asyncio.run(load(connect, arguments.schema, arguments.clients, arguments.requests,
+                                          arguments.batch))
+    report_load("{} clients, {} documents per request".format(arguments.clients, arguments.batch), latencies,
+                seconds, arguments.clients * arguments.requests * arguments.batch)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,110 @@
+'''
+Stress test of one shared schema validating documents from many threads. Every response is compared with the one
+obtained from a single thread, and the throughput of each number of threads is reported (it only scales on a CPython
+without the GIL).
+'''
+import sys
+import threading
+import time
+from validator import get_schema
+from validator.metrics import METRICS
+from benchmarks.schemas import many_definitions_schema, many_definitions_document
+
+VALIDATIONS = 4000
+
+SHORT_LIVED_THREADS = 200
+"""Threads that validate a few documents and end, like the ones created per request or by pools that are recreated."""
+
+
+def get_documents():
+    documents = [many_definitions_document(depth, width) for depth in range(1, 6) for width in [1, 5, 10]]
+    invalid = many_definitions_document(4)
+    invalid["p3"]["next"]["next"]["name"] = "a name that is much too long"
+    documents.append(invalid)
+    documents.append({"p1": {"id": "not an integer"}})
+    return documents
+
+
+def summarize(response):
+    if response.is_valid:
+        return True
+    return response.document_pointer.nodes, response.schema_pointer.nodes
+
+
+def stress(schema, documents, expected, threads):
+    """
+    Validates `VALIDATIONS` documents split between `threads` threads.
+    :return: Tuple (seconds, number of responses that differ from the expected ones).
+    """
+
+    errors = []
+    barrier = threading.Barrier(threads + 1)
+
+    def work(offset):
+        barrier.wait()
+        for i in range(offset, VALIDATIONS, threads):
+            index = i % len(documents)
+            if summarize(schema.validate(documents[index])) != expected[index]:
+                errors.append(index)
+
+    workers = [threading.Thread(target=work, args=(offset,)) for offset in range(threads)]
+    for worker in workers:
+        worker.start()
+    barrier.wait()
+    start = time.perf_counter()
+    for worker in workers:
+        worker.join()
+    return time.perf_counter() - start, len(errors)
+
+
+def churn(schema, documents, expected):
+    """
+    Validates every document from `SHORT_LIVED_THREADS` threads, a few of them at a time.
+    :return: Number of responses that differ from the expected ones.
+    """
+
+    errors = []
+
+    def work():
+        for document, response in zip(documents, expected):
+            if summarize(schema.validate(document)) != response:
+                errors.append(document)
+
+    for _ in range(SHORT_LIVED_THREADS // 10):
+        workers = [threading.Thread(target=work) for _ in range(10)]
+        for worker in workers:
+            worker.start()
+        for worker in workers:
+            worker.join()
+    return len(errors)
+
+
+def run():
+    gil = getattr(sys, "_is_gil_enabled", lambda: True)()
+    print("GIL enabled: {}".format(gil))
+    json_schema = many_definitions_schema(500)
+    documents = get_documents()
+    expected = [summarize(get_schema(json_schema).validate(document)) for document in documents]
+    for lazy in [False, True]:
+        base = None
+        for threads in [1, 2, 4, 8]:
+            # A new schema each time, so lazy schemas are built while the threads race to use them.
+            schema = get_schema(json_schema, lazy=lazy)
+            before = sum(METRICS.documents.values())
+            seconds, errors = stress(schema, documents, expected, threads)
+            recorded = sum(METRICS.documents.values()) - before
+            base = base or seconds
+            print("{:<5} {:>2} threads: {:>9.0f} validations/s  speedup {:>4.2f}  wrong responses {}  "
+                  "recorded {}/{}".format("lazy" if lazy else "eager", threads, VALIDATIONS / seconds,
+                                          base / seconds, errors, recorded, VALIDATIONS))
+            assert errors == 0 and recorded == VALIDATIONS
+    # The shards of the threads that end are added to one, so they don't pile up.
+    schema = get_schema(json_schema)
+    before = sum(METRICS.documents.values())
+    start = time.perf_counter()
+    errors = churn(schema, documents, expected)
+    seconds = time.perf_counter() - start
+    recorded = sum(METRICS.documents.values()) - before
+    print("{} short lived threads: {:.2f} s  wrong responses {}  recorded {}/{}  shards {}".format(
+        SHORT_LIVED_THREADS, seconds, errors, recorded, SHORT_LIVED_THREADS * len(documents), METRICS.shards))
+    assert errors == 0 and recorded == SHORT_LIVED_THREADS * len(documents) and METRICS.shards <= 2
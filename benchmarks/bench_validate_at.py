@@ -0,0 +1,27 @@
+'''
+Compares validating a whole document of about 10 MB after a partial update with `Schema.validate` and validating only
+the updated value at its JSON Pointer with `Schema.validate_at`, with a pointer that was already used and with new ones.
+'''
+import json
+from validator import get_schema
+from benchmarks.bench_revalidate import SCHEMA, get_document
+from benchmarks.common import measure, report
+
+UPDATES = {
+    "a field": ("/orders/25000/customer", "Grace"),
+    "a line": ("/orders/25000/lines/2", {"sku": "B-2", "quantity": 3}),
+    "an order": ("/orders/25000", {"id": 25000, "customer": "Alan", "status": "open", "lines": []}),
+}
+
+
+def run():
+    schema = get_schema(SCHEMA)
+    document = get_document(50000)
+    report("{:.1f} MB document: validate".format(len(json.dumps(document)) / 1e6),
+           measure(lambda: schema.validate(document), 1, 3))
+    for name, (pointer, value) in UPDATES.items():
+        assert schema.validate_at(pointer, value).is_valid
+        report("{}: validate_at".format(name), measure(lambda: schema.validate_at(pointer, value), 10000))
+    # Each call uses another order, so the pointer is resolved from the index of "/orders" up.
+    pointers = iter(["/orders/{}/customer".format(i) for i in range(100000)])
+    report("a field of a new order: validate_at", measure(lambda: schema.validate_at(next(pointers), "Grace"), 10000))
@@ -0,0 +1,60 @@
+'''
+Helpers shared by the benchmarks.
+'''
+import time
+
+
+def measure(function, number=1000, repeat=5):
+    """
+    Measures the time a function takes.
+    :param function: Function without arguments.
+    :param number: Calls per repetition.
+    :param repeat: Repetitions (the best one is kept).
+    :return: Seconds per call of the best repetition.
+    """
+
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for _ in range(number):
+            function()
+        best = min(best, time.perf_counter() - start)
+    return best / number
+
+
+def report(name, seconds):
+    """
+    Prints the time per call of a benchmark.
+    :param name: Name of the measure.
+    :param seconds: Seconds per call.
+    """
+
+    if seconds >= 1e-3:
+        print("{:<60} {:>10.3f} ms".format(name, seconds * 1e3))
+    else:
+        print("{:<60} {:>10.3f} us".format(name, seconds * 1e6))
+
+
+PERSON_SCHEMA = {
+    "type": "object",
+    "required": ["name", "age"],
+    "properties": {
+        "name": {"type": "string", "minLength": 1, "maxLength": 50},
+        "age": {"type": "integer", "minimum": 0, "maximum": 150},
+        "email": {"type": "string", "pattern": "^[^@]+@[^@]+$"},
+        "tags": {"type": "array", "items": {"type": "string"}, "uniqueItems": True},
+        "address": {
+            "type": "object",
+            "properties": {
+                "street": {"type": "string"},
+                "number": {"type": "integer"}
+            },
+            "additionalProperties": False
+        }
+    }
+}
+"""Small schema used by several benchmarks."""
+
+PERSON = {"name": "Ada", "age": 36, "email": "ada@example.com", "tags": ["math", "poetry"],
+          "address": {"street": "St James's Square", "number": 12}}
+"""Document that is valid against `PERSON_SCHEMA`."""
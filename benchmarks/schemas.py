@@ -0,0 +1,56 @@
+'''
+Generators of large schemas used by the benchmarks.
+'''
+
+
+def many_definitions_schema(size):
+    """
+    Builds a schema with `size` object definitions. The root has a property per definition and each definition
+    references another one (definition i references definition i // 2), so every definition is used.
+    :param size: Number of definitions.
+    :return: Dict object.
+    """
+
+    definitions = {}
+    root_properties = {}
+    for i in range(size):
+        definitions["d" + str(i)] = {
+            "type": "object",
+            "properties": {
+                "id": {"type": "integer", "minimum": 0},
+                "name": {"type": "string", "maxLength": 20},
+                "tags": {"type": "array", "items": {"type": "string"}},
+                "next": {"$ref": "#/definitions/d" + str(i // 2)},
+            },
+            "required": ["id"]
+        }
+        root_properties["p" + str(i)] = {"$ref": "#/definitions/d" + str(i)}
+    return {"type": "object", "properties": root_properties, "definitions": definitions}
+
+
+def many_definitions_document(depth, width=10):
+    """
+    Builds a document that is valid against `many_definitions_schema`.
+    :param depth: Number of nested objects under each property.
+    :param width: Number of properties of the root.
+    :return: Dict object.
+    """
+
+    document = {"id": depth, "name": "last", "tags": []}
+    for i in range(depth - 1, 0, -1):
+        document = {"id": i, "name": "n" + str(i), "tags": ["a"], "next": document}
+    return {"p" + str(i): document for i in range(width)}
+
+
+def reference_chain_schema(size):
+    """
+    Builds a schema with `size` definitions where each one is applied to the same instance as the next one (through
+    allOf and $ref), so every reference is an edge of the reference graph.
+    :param size: Number of definitions.
+    :return: Dict object.
+    """
+
+    definitions = {"d" + str(i): {"allOf": [{"$ref": "#/definitions/d" + str(i + 1)}, {"minProperties": 0}]}
+                   for i in range(size)}
+    definitions["d" + str(size)] = {"type": "object"}
+    return {"definitions": definitions, "$ref": "#/definitions/d0"}
@@ -0,0 +1,27 @@
+import unittest
+from validator import get_schema
+from validator.vectorized import VECTORIZE_SIZE, get_numpy
+
+NAN = float("nan")
+
+
+@unittest.skipIf(get_numpy() is None, "NumPy is not installed")
+class TestBatchNumbers(unittest.TestCase):
+
+    def test_nan_column(self):
+        schema = get_schema({"type": "object", "properties": {"x": {"type": "number", "minimum": 0}}})
+        for size in [1, VECTORIZE_SIZE, 4 * VECTORIZE_SIZE]:
+            records = [{"x": 1.0}] * (size - 1) + [{"x": NAN}]
+            self.assertFalse(schema.validate(records[-1]).is_valid)
+            batch = schema.validate_batch(records)
+            self.assertEqual(batch.valid, [True] * (size - 1) + [False])
+
+    def test_mixed_column(self):
+        schema = get_schema({"type": "object", "properties": {"x": {"type": "integer", "maximum": 5}}})
+        records = [{"x": i % 7} for i in range(4 * VECTORIZE_SIZE)] + [{"x": 1.5}, {"x": True}, {}]
+        batch = schema.validate_batch(records)
+        self.assertEqual(batch.valid, [schema.validate(record).is_valid for record in records])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,107 @@
+import unittest
+from validator import get_schema
+from validator.budget import Budget, BudgetExceededResponse
+from validator.optimizer import optimize
+from validator.vectorized import get_numpy
+
+JSON_SCHEMA = {
+    "type": "object",
+    "properties": {
+        "name": {"type": "string"},
+        "children": {"type": "array", "items": {"$ref": "#"}},
+        "kind": {"anyOf": [{"type": "integer"}, {"type": "string"}]}
+    }
+}
+
+DOCUMENT = {"name": "root", "kind": "a", "children": [{"name": "é" * 3, "children": [{"name": "leaf", "kind": 1}]}]}
+
+
+def summarize(response):
+    return response.is_valid, response.document_pointer and response.document_pointer.nodes, \
+        response.schema_pointer and response.schema_pointer.nodes
+
+
+class TestBudget(unittest.TestCase):
+
+    def setUp(self):
+        self.schema = get_schema(JSON_SCHEMA)
+
+    def assert_exceeded(self, response, limit, document_nodes, schema_nodes):
+        self.assertIsInstance(response, BudgetExceededResponse)
+        self.assertFalse(response.is_valid)
+        self.assertEqual(response.limit, limit)
+        self.assertEqual(response.document_pointer.nodes, document_nodes)
+        self.assertEqual(response.schema_pointer.nodes, schema_nodes)
+
+    def test_enough_budget_gives_the_same_response(self):
+        budget = Budget(seconds=10, nodes=1000, depth=10, string_bytes=1000)
+        for document in [DOCUMENT, {"children": [{"kind": None}]}, {"name": 1}, []]:
+            response = self.schema.validate(document, budget=budget)
+            self.assertNotIsInstance(response, BudgetExceededResponse)
+            self.assertEqual(summarize(response), summarize(self.schema.validate(document)))
+        self.assertTrue(self.schema.validate(DOCUMENT, budget=Budget()).is_valid)
+
+    def test_nodes(self):
+        # Every value once, and "kind" once more for each anyOf branch it's checked against (one for 1, two for "a").
+        self.assertTrue(self.schema.validate(DOCUMENT, budget=Budget(nodes=13)).is_valid)
+        response = self.schema.validate(DOCUMENT, budget=Budget(nodes=12))
+        self.assert_exceeded(response, "nodes", ["kind"], ["properties", "kind", "anyOf", 1])
+        response = self.schema.validate(DOCUMENT, budget=Budget(nodes=8))
+        self.assert_exceeded(response, "nodes", ["children", 0, "children", 0, "kind"],
+                             ["properties", "children", "items", "properties", "children", "items", "properties",
+                              "kind"])
+        self.assert_exceeded(self.schema.validate(DOCUMENT, budget=Budget(nodes=0)), "nodes", [], [])
+        self.assert_exceeded(self.schema.validate(1, budget=Budget(nodes=0)), "nodes", [], [])
+
+    def test_depth(self):
+        self.assertTrue(self.schema.validate(DOCUMENT, budget=Budget(depth=5)).is_valid)
+        response = self.schema.validate(DOCUMENT, budget=Budget(depth=4))
+        self.assert_exceeded(response, "depth", ["children", 0, "children", 0, "name"],
+                             ["properties", "children", "items", "properties", "children", "items", "properties",
+                              "name"])
+        response = self.schema.validate(DOCUMENT, budget=Budget(depth=0))
+        self.assertEqual(response.limit, "depth")
+        self.assertEqual(len(response.document_pointer.nodes), 1)
+        self.assertTrue(self.schema.validate({}, budget=Budget(depth=0)).is_valid)
+
+    def test_string_bytes(self):
+        # "root", "ééé" (6 bytes in UTF-8), "leaf" and "a", which is visited three times (see `test_nodes`).
+        self.assertTrue(self.schema.validate(DOCUMENT, budget=Budget(string_bytes=17)).is_valid)
+        response = self.schema.validate(DOCUMENT, budget=Budget(string_bytes=16))
+        self.assert_exceeded(response, "string_bytes", ["kind"], ["properties", "kind", "anyOf", 1])
+        response = self.schema.validate(DOCUMENT, budget=Budget(string_bytes=9))
+        self.assert_exceeded(response, "string_bytes", ["children", 0, "name"],
+                             ["properties", "children", "items", "properties", "name"])
+        self.assert_exceeded(self.schema.validate("a", budget=Budget(string_bytes=0)), "string_bytes", [], [])
+        self.assertTrue(self.schema.validate({"name": ""}, budget=Budget(string_bytes=0)).is_valid)
+
+    def test_seconds(self):
+        self.assert_exceeded(self.schema.validate(DOCUMENT, budget=Budget(seconds=0)), "seconds", [], [])
+        schema = get_schema({"type": "array", "items": {"type": "array", "items": {"type": "integer"}}})
+        response = schema.validate([list(range(100))] * 10000, budget=Budget(seconds=0.01))
+        self.assertEqual(response.limit, "seconds")
+        self.assertEqual(len(response.schema_pointer.nodes), len(response.document_pointer.nodes))
+
+    def test_schemas_of_other_engines(self):
+        # An optimized schema validates its node with its own (recursive) engine, so it's a single node of the budget.
+        schema = optimize(get_schema(JSON_SCHEMA))
+        self.assertTrue(schema.validate(DOCUMENT, budget=Budget(nodes=1, depth=0, string_bytes=0)).is_valid)
+        self.assert_exceeded(schema.validate(DOCUMENT, budget=Budget(nodes=0)), "nodes", [], [])
+        self.assertEqual(summarize(schema.validate({"children": [{"name": 1}]}, budget=Budget(nodes=1))),
+                         summarize(schema.validate({"children": [{"name": 1}]})))
+
+    @unittest.skipIf(get_numpy() is None, "NumPy is not installed")
+    def test_ndarray(self):
+        # NumPy arrays are validated by `ArraySchema.validate_node`, so their items are not nodes of the budget.
+        schema = get_schema({"type": "object", "properties": {"values": {"type": "array",
+                                                                         "items": {"type": "number", "minimum": 0}}}})
+        values = get_numpy().ones(1000)
+        self.assertTrue(schema.validate({"values": values}, budget=Budget(nodes=2, depth=1)).is_valid)
+        values[500] = -1
+        response = schema.validate({"values": values}, budget=Budget(nodes=2))
+        self.assertEqual(summarize(response), summarize(schema.validate({"values": values})))
+        self.assertEqual(response.document_pointer.nodes, ["values", 500])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,73 @@
+import json
+import os
+import shutil
+import tempfile
+import unittest
+from validator.cache import SchemaCache
+from validator.formats import FORMATS, register_format
+
+
+def is_even_length(string):
+    return len(string) % 2 == 0
+
+
+class TestSchemaCache(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.formats = dict(FORMATS)
+
+    def tearDown(self):
+        FORMATS.clear()
+        FORMATS.update(self.formats)
+        shutil.rmtree(self.directory)
+
+    def test_format_registered_after_caching(self):
+        json_schema = {"type": "string", "format": "even"}
+        self.assertTrue(SchemaCache(self.directory).get_schema(json_schema).validate("abc").is_valid)
+        register_format("even", is_even_length)
+        schema = SchemaCache(self.directory).get_schema(json_schema)
+        self.assertFalse(schema.validate("abc").is_valid)
+        self.assertTrue(schema.validate("ab").is_valid)
+        # The entry stored with the format is used while it's registered.
+        self.assertFalse(SchemaCache(self.directory).get_schema(json_schema).validate("abc").is_valid)
+
+    def test_schema_that_cant_be_pickled(self):
+        register_format("short", lambda string: len(string) < 3)
+
+        def is_upper(string):
+            return string.isupper()
+
+        register_format("upper", is_upper)
+        cache = SchemaCache(self.directory)
+        for format_name in ["short", "upper"]:
+            schema = cache.get_schema({"type": "string", "format": format_name})
+            self.assertFalse(schema.validate("abcd").is_valid)
+            self.assertEqual(os.listdir(self.directory), [])
+
+    def test_cached_schema(self):
+        json_schema = {"type": "object", "properties": {"a": {"type": "integer"}}}
+        cache = SchemaCache(self.directory)
+        cache.get_schema(json_schema)
+        key_files = len(list(os.scandir(self.directory)))
+        schema = cache.get_schema(json_schema)
+        self.assertEqual(len(list(os.scandir(self.directory))), key_files)
+        self.assertFalse(schema.validate({"a": "x"}).is_valid)
+
+    def test_referenced_file_changed(self):
+        person = os.path.join(self.directory, "person.json")
+        name = os.path.join(self.directory, "name.json")
+        write_json(name, {"type": "string", "maxLength": 3})
+        write_json(person, {"type": "object", "properties": {"name": {"$ref": name}}})
+        self.assertFalse(SchemaCache(self.directory).get_schema_from_file(person).validate({"name": "Grace"}).is_valid)
+        write_json(name, {"type": "string"})
+        self.assertTrue(SchemaCache(self.directory).get_schema_from_file(person).validate({"name": "Grace"}).is_valid)
+
+
+def write_json(path, json_object):
+    with open(path, "w") as f:
+        json.dump(json_object, f)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,22 @@
+import unittest
+from validator import get_schema
+from validator.classes import Schema, MultipleSchema, ObjectSchema
+
+
+class TestGetSchema(unittest.TestCase):
+
+    def test_type_dispatch(self):
+        self.assertIs(type(get_schema({"type": "object"})), ObjectSchema)
+        self.assertIs(type(get_schema({"type": ["object", "null"]})), MultipleSchema)
+        self.assertIs(type(get_schema({"minimum": 1})), MultipleSchema)
+
+    def test_unknown_type_of_a_subschema(self):
+        # Subschemas are not validated against the meta schema, so they can have a type it doesn't know.
+        whole_schema = {"properties": {"a": {"type": "any"}}}
+        schema = get_schema(whole_schema["properties"]["a"], whole_schema)
+        self.assertIs(type(schema), Schema)
+        self.assertTrue(schema.validate(1).is_valid)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,200 @@
+import unittest
+from validator import get_schema
+from validator.formats import FORMATS, register_format, is_date_time, is_email, is_hostname, is_ipv4, is_ipv6, is_uri
+
+DATE_TIMES = [
+    ("2020-02-29T23:59:59Z", True),
+    ("2021-02-29T23:59:59Z", False),
+    ("1900-02-29T00:00:00Z", False),
+    ("2000-02-29T00:00:00Z", True),
+    ("2020-04-31T00:00:00Z", False),
+    ("2020-12-31T23:59:60Z", True),
+    ("2020-12-31t23:59:60.25z", True),
+    ("2020-12-31T23:58:60Z", False),
+    ("2021-01-01T00:59:60+01:00", True),
+    ("2020-12-31T22:59:60-01:00", True),
+    ("2020-12-31T23:59:60+01:00", False),
+    ("2020-12-31T18:29:60-05:30", True),
+    ("2020-01-01T00:00:00.123456789+23:59", True),
+    ("2020-01-01T00:00:00.Z", False),
+    ("2020-01-01T00:00:00+24:00", False),
+    ("2020-01-01T00:00:00+01:60", False),
+    ("2020-01-01T00:00:00+0100", False),
+    ("2020-01-01T00:00:00", False),
+    ("2020-01-01 00:00:00Z", False),
+    ("2020-01-01T24:00:00Z", False),
+    ("2020-01-01T00:00:61Z", False),
+    ("2020-1-01T00:00:00ZZ", False),
+    ("２０２０-01-01T00:00:00Z", False),
+]
+
+EMAILS = [
+    ("someone@example.com", True),
+    ("some.one+tag@example.com", True),
+    ("\"some one\"@example.com", True),
+    ("\"some\\\"one\"@example.com", True),
+    ("\"some@one\"@example.com", True),
+    ("\"some\"one\"@example.com", False),
+    ("\"someone\\\"@example.com", False),
+    ("\"\"@example.com", True),
+    ("someone@[192.168.0.1]", True),
+    ("someone@[IPv6:2001:db8::1]", True),
+    ("someone@[2001:db8::1]", False),
+    ("someone@[192.168.0.256]", False),
+    (".someone@example.com", False),
+    ("someone.@example.com", False),
+    ("some..one@example.com", False),
+    ("some one@example.com", False),
+    ("@example.com", False),
+    ("someone@", False),
+    ("someone@-example.com", False),
+    ("a" * 64 + "@example.com", True),
+    ("a" * 65 + "@example.com", False),
+]
+
+HOSTNAMES = [
+    ("example.com", True),
+    ("www.example-site.com", True),
+    ("a", True),
+    ("1.2.3", True),
+    ("xn--bcher-kva.example", True),
+    ("a" * 63 + ".com", True),
+    ("a" * 64 + ".com", False),
+    (".".join(["a" * 63] * 3) + "." + "a" * 61, True),
+    (".".join(["a" * 63] * 3) + "." + "a" * 62, False),
+    ("", False),
+    ("-example.com", False),
+    ("example-.com", False),
+    ("example.com.", False),
+    ("exa..mple.com", False),
+    ("exa_mple.com", False),
+    ("bücher.example", False),
+]
+
+IPV4S = [
+    ("0.0.0.0", True),
+    ("192.168.0.1", True),
+    ("255.255.255.255", True),
+    ("256.0.0.1", False),
+    ("192.168.0.01", False),
+    ("192.168.00.1", False),
+    ("010.0.0.1", False),
+    ("1.2.3", False),
+    ("1.2.3.4.5", False),
+    ("1..3.4", False),
+    ("1.2.3.4 ", False),
+    ("+1.2.3.4", False),
+    ("١.2.3.4", False),
+]
+
+IPV6S = [
+    ("::", True),
+    ("::1", True),
+    ("1::", True),
+    ("2001:db8::ff00:42:8329", True),
+    ("2001:0db8:0000:0000:0000:ff00:0042:8329", True),
+    ("1:2:3:4:5:6:7::", True),
+    ("::2:3:4:5:6:7:8", True),
+    ("1:2:3:4:5:6::8", True),
+    ("1:2:3:4:5:6:7:8::", False),
+    ("::1:2:3:4:5:6:7:8", False),
+    ("1::2::3", False),
+    (":::", False),
+    ("1:2:3:4:5:6:7", False),
+    ("1:2:3:4:5:6:7:8:9", False),
+    (":1:2:3:4:5:6:7", False),
+    ("1:2:3:4:5:6:7:", False),
+    ("::ffff:192.168.0.1", True),
+    ("1:2:3:4:5:6:192.168.0.1", True),
+    ("1:2:3:4:5:6:7:192.168.0.1", False),
+    ("::192.168.0.01", False),
+    ("::1.2.3.4:5", False),
+    ("12345::", False),
+    ("g::", False),
+]
+
+URIS = [
+    ("https://example.com/a?b=c#d", True),
+    ("urn:isbn:0451450523", True),
+    ("mailto:someone@example.com", True),
+    ("a+b-c.d:x", True),
+    ("https://[2001:db8::1]/a", True),
+    ("https://[2001:db8::1]:8080", True),
+    ("https://user@[::1]:80/", True),
+    ("https://[v1.fe80::a+en1]/", True),
+    ("https://[192.168.0.1]/", False),
+    ("https://[2001:db8::1/", False),
+    ("https://2001:db8::1]/", False),
+    ("https://[::1]x/", False),
+    ("https://x[::1]/", False),
+    ("https://example.com/[a]", False),
+    ("https://[::1]/?a=[b]", False),
+    ("mailto:[::1]", False),
+    ("https://example.com/%41%2f", True),
+    ("https://example.com/%4", False),
+    ("https://example.com/%zz", False),
+    ("https://example.com/a#b#c", False),
+    ("https://example.com/a b", False),
+    ("//example.com/a", False),
+    ("1http://example.com", False),
+    ("example.com", False),
+]
+
+
+class TestFormats(unittest.TestCase):
+
+    def assert_table(self, checker, table):
+        for string, expected in table:
+            self.assertEqual(checker(string), expected, string)
+
+    def test_date_time(self):
+        self.assert_table(is_date_time, DATE_TIMES)
+
+    def test_email(self):
+        self.assert_table(is_email, EMAILS)
+
+    def test_hostname(self):
+        self.assert_table(is_hostname, HOSTNAMES)
+
+    def test_ipv4(self):
+        self.assert_table(is_ipv4, IPV4S)
+
+    def test_ipv6(self):
+        self.assert_table(is_ipv6, IPV6S)
+
+    def test_uri(self):
+        self.assert_table(is_uri, URIS)
+
+    def test_format_keyword(self):
+        for name, table in [("date-time", DATE_TIMES), ("email", EMAILS), ("hostname", HOSTNAMES), ("ipv4", IPV4S),
+                            ("ipv6", IPV6S), ("uri", URIS)]:
+            schema = get_schema({"type": "string", "format": name})
+            for string, expected in table:
+                response = schema.validate(string)
+                self.assertEqual(response.is_valid, expected, (name, string))
+                if not expected:
+                    self.assertEqual(response.schema_pointer.nodes, ["format"])
+        # Formats only apply to strings.
+        self.assertTrue(get_schema({"format": "ipv4"}).validate(1).is_valid)
+
+    def test_unregistered_formats_are_ignored(self):
+        schema = get_schema({"type": "string", "format": "not-a-format"})
+        self.assertTrue(schema.validate("anything").is_valid)
+
+    def test_register_format(self):
+        before = get_schema({"type": "string", "format": "even-length"})
+        register_format("even-length", lambda string: len(string) % 2 == 0)
+        try:
+            schema = get_schema({"type": "string", "format": "even-length"})
+            self.assertTrue(schema.validate("ab").is_valid)
+            self.assertFalse(schema.validate("abc").is_valid)
+            # Schemas built before keep the checker they had.
+            self.assertTrue(before.validate("abc").is_valid)
+            register_format("even-length", lambda string: True)
+            self.assertFalse(schema.validate("abc").is_valid)
+        finally:
+            del FORMATS["even-length"]
+
+
+if __name__ == "__main__":
+    unittest.main()
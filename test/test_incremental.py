@@ -0,0 +1,51 @@
+import unittest
+from validator import get_schema
+from validator.incremental import update_schema
+
+
+class TestUpdateSchema(unittest.TestCase):
+
+    def assert_same_outcome(self, json_schema, patch, new_json_schema):
+        schema = get_schema(json_schema)
+        with self.assertRaises(KeyError):
+            get_schema(new_json_schema)
+        with self.assertRaises(KeyError):
+            update_schema(schema, patch=patch)
+        with self.assertRaises(KeyError):
+            update_schema(schema, new_json_schema)
+
+    def test_removed_definition_referenced_by_unreached_definition(self):
+        self.assert_same_outcome({"definitions": {"c": {"type": "integer"}, "d": {"$ref": "#/definitions/c"}},
+                                  "type": "object"},
+                                 [{"op": "remove", "path": "/definitions/c"}],
+                                 {"definitions": {"d": {"$ref": "#/definitions/c"}}, "type": "object"})
+
+    def test_removed_target_inside_changed_definition(self):
+        self.assert_same_outcome({"definitions": {"c": {"properties": {"x": {}}},
+                                                  "d": {"$ref": "#/definitions/c/properties/x"}},
+                                  "type": "object"},
+                                 [{"op": "remove", "path": "/definitions/c/properties/x"}],
+                                 {"definitions": {"c": {"properties": {}},
+                                                  "d": {"$ref": "#/definitions/c/properties/x"}},
+                                  "type": "object"})
+
+    def test_removed_definition_without_referrers(self):
+        json_schema = {"definitions": {"c": {"type": "integer"}, "d": {"$ref": "#/definitions/c"}},
+                       "properties": {"a": {"$ref": "#/definitions/d"}}}
+        schema = get_schema(json_schema)
+        schema = update_schema(schema, patch=[{"op": "replace", "path": "/definitions/d", "value": {"type": "string"}},
+                                              {"op": "remove", "path": "/definitions/c"}])
+        self.assertTrue(schema.validate({"a": "x"}).is_valid)
+        self.assertFalse(schema.validate({"a": 1}).is_valid)
+
+    def test_edited_definition(self):
+        json_schema = {"definitions": {"c": {"type": "integer"}, "d": {"$ref": "#/definitions/c"}},
+                       "properties": {"a": {"$ref": "#/definitions/d"}}}
+        schema = update_schema(get_schema(json_schema),
+                               patch=[{"op": "replace", "path": "/definitions/c/type", "value": "string"}])
+        self.assertTrue(schema.validate({"a": "x"}).is_valid)
+        self.assertFalse(schema.validate({"a": 1}).is_valid)
+
+
+if __name__ == "__main__":
+    unittest.main()
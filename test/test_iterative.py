@@ -0,0 +1,71 @@
+import unittest
+from validator import get_schema
+from validator.profiler import Profiler
+
+LEAVES = [
+    {"type": "string", "minLength": 2, "maxLength": 3, "pattern": "^a"},
+    {"type": "string", "format": "ipv4"},
+    {"type": "integer", "multipleOf": 2, "minimum": 0, "maximum": 10, "exclusiveMaximum": True},
+    {"type": "number", "minimum": 1.5, "exclusiveMinimum": True},
+    {"type": "boolean"},
+    {"type": "null"},
+    {"type": "integer", "enum": [1, 2, 12]},
+    {"enum": [1, "a", None]},
+    {"type": "string", "anyOf": [{"minLength": 3}, {"maxLength": 0}], "not": {"enum": ["abc"]}}
+]
+
+DOCUMENTS = [None, True, 0, 1, 2, 12, 1.5, 4.0, -2, "", "a", "ab", "abc", "abcd", "ba", "1.2.3.4", [], {}]
+
+
+def summarize(response):
+    if response.is_valid:
+        return True
+    return response.document_pointer.nodes, response.schema_pointer.nodes
+
+
+def deep_list(depth):
+    document = []
+    for _ in range(depth):
+        document = [document]
+    return document
+
+
+class TestIterative(unittest.TestCase):
+
+    def test_same_responses_as_recursive(self):
+        json_schemas = LEAVES + [
+            {"type": "object", "required": ["a", "b"], "minProperties": 2, "maxProperties": 3,
+             "dependencies": {"a": ["c"]}, "properties": {"a": {"anyOf": LEAVES}}},
+            {"type": "array", "items": [LEAVES[0]], "additionalItems": False, "minItems": 1},
+            {"type": "array", "items": {"type": "integer"}, "maxItems": 2, "uniqueItems": True}
+        ]
+        documents = DOCUMENTS + [{"a": 1, "b": 2}, {"a": 1, "b": 2, "c": 3}, {"a": [], "b": 2, "c": 3}, {"b": 1},
+                                 {"a": 1, "b": 2, "c": 3, "d": 4}, ["ab"], ["ab", 1], [1, 1], [1, 2, 3], ["x"]]
+        for json_schema in json_schemas:
+            schema = get_schema(json_schema)
+            for document in documents:
+                self.assertEqual(summarize(schema.validate(document, iterative=True)),
+                                 summarize(schema.validate(document)), (json_schema, document))
+
+    def test_unique_items_of_deep_lists(self):
+        schema = get_schema({"type": "array", "uniqueItems": True})
+        for iterative in [False, True]:
+            response = schema.validate([deep_list(100000), deep_list(100000)], iterative=iterative)
+            self.assertFalse(response.is_valid)
+            self.assertEqual(response.document_pointer.nodes, [1])
+            self.assertTrue(schema.validate([deep_list(100000), deep_list(99999)], iterative=iterative).is_valid)
+        self.assertTrue(schema.validate([{"a": [1, {"b": 2}]}, {"a": [1, {"b": 3}]}], iterative=True).is_valid)
+        self.assertFalse(schema.validate([{"a": 1, "b": [2]}, {"b": [2], "a": 1}], iterative=True).is_valid)
+
+    def test_keywords_are_profiled(self):
+        schema = get_schema({"type": "object", "properties": {"a": {"type": "string", "maxLength": 3}},
+                             "minProperties": 1})
+        with Profiler(schema) as profiler:
+            self.assertFalse(schema.validate({"a": "abcd"}, iterative=True).is_valid)
+            self.assertTrue(schema.validate({"a": "abc"}, iterative=True).is_valid)
+        self.assertIn(("#/properties/a", "maxLength"), profiler.stats)
+        self.assertIn(("#", "minProperties"), profiler.stats)
+
+
+if __name__ == "__main__":
+    unittest.main()
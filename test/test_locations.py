@@ -0,0 +1,77 @@
+import unittest
+from validator import get_schema
+
+
+def get_locations(document, nodes=()):
+    """
+    :return: List of tuples (JSON Pointer, value) of every value inside a document, the document included.
+    """
+
+    locations = [("".join("/" + node.replace("~", "~0").replace("/", "~1") for node in nodes), document)]
+    if isinstance(document, dict):
+        for key, value in document.items():
+            locations.extend(get_locations(value, nodes + (key,)))
+    elif isinstance(document, list):
+        for i, value in enumerate(document):
+            locations.extend(get_locations(value, nodes + (str(i),)))
+    return locations
+
+
+class TestValidateAt(unittest.TestCase):
+
+    def test_index_under_schema_without_type(self):
+        schema = get_schema({"properties": {"a": {}}, "additionalProperties": False})
+        self.assertTrue(schema.validate([5]).is_valid)
+        self.assertTrue(schema.validate_at("/0", 5).is_valid)
+        self.assertFalse(schema.validate_at("/b", 5).is_valid)
+
+    def test_index_under_object_or_array(self):
+        schema = get_schema({"type": ["object", "array"], "properties": {"0": {"type": "string"}},
+                             "items": {"type": "integer"}})
+        self.assertTrue(schema.validate({"0": "a"}).is_valid)
+        self.assertTrue(schema.validate([1]).is_valid)
+        self.assertTrue(schema.validate_at("/0", "a").is_valid)
+        self.assertTrue(schema.validate_at("/0", 1).is_valid)
+
+    def test_index_under_single_type(self):
+        schema = get_schema({"type": ["array", "null"], "items": {"type": "integer"}})
+        self.assertFalse(schema.validate_at("/0", "a").is_valid)
+        self.assertFalse(schema.validate_at("/a", 1).is_valid)
+        schema = get_schema({"type": "object", "properties": {"0": {"type": "string"}}})
+        self.assertFalse(schema.validate_at("/0", 1).is_valid)
+
+    def test_values_of_valid_documents(self):
+        json_schema = {
+            "definitions": {"node": {"properties": {"value": {"type": "integer"},
+                                                    "children": {"items": {"$ref": "#/definitions/node"}}},
+                                     "additionalProperties": False}},
+            "type": ["object", "array"],
+            "properties": {"tree": {"$ref": "#/definitions/node"},
+                           "pair": {"type": "array", "items": [{"type": "string"}, {"type": "integer"}],
+                                    "additionalItems": False}},
+            "patternProperties": {"^x": {"type": "string"}},
+            "items": {"$ref": "#/definitions/node"}
+        }
+        documents = [
+            {"tree": {"value": 1, "children": [{"value": 2}, {"children": [{"value": 3}]}]}, "pair": ["a", 1]},
+            {"x0": "a", "0": [1, {"value": 2}]},
+            [{"value": 1, "children": []}, {"children": [{"value": 2}]}],
+            {"tree": {"children": {"0": {"value": "a"}}}},
+        ]
+        for lazy in [False, True]:
+            schema = get_schema(json_schema, lazy=lazy)
+            for document in documents:
+                self.assertTrue(schema.validate(document).is_valid)
+                for pointer, value in get_locations(document):
+                    self.assertTrue(schema.validate_at(pointer, value).is_valid, pointer)
+
+    def test_failure_pointers(self):
+        schema = get_schema({"type": "object", "properties": {"a": {"type": "array", "items": {"minimum": 1}}}})
+        response = schema.validate_at("/a/3", 0)
+        self.assertFalse(response.is_valid)
+        self.assertEqual(response.document_pointer.nodes, ["a", "3"])
+        self.assertEqual(response.schema_pointer.nodes, ["properties", "a", "items", "minimum"])
+
+
+if __name__ == "__main__":
+    unittest.main()
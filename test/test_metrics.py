@@ -0,0 +1,51 @@
+import threading
+import unittest
+from validator import get_schema
+from validator.metrics import Metrics, METRICS
+
+
+class TestMetrics(unittest.TestCase):
+
+    def test_ended_threads_are_retired(self):
+        schema = get_schema({"type": "integer"})
+        label = METRICS.get_label(schema)
+        METRICS.reset()
+        for _ in range(20):
+            threads = [threading.Thread(target=lambda: [schema.validate(i) for i in [1, "a"]]) for _ in range(10)]
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+        self.assertEqual(METRICS.documents[label], 400)
+        self.assertEqual(METRICS.invalid[label], 200)
+        self.assertEqual(METRICS.latency[label].count, 400)
+        self.assertLessEqual(METRICS.shards, 2)
+
+    def test_reset_drops_previous_shards(self):
+        metrics = Metrics()
+        thread = threading.Thread(target=metrics.record_remote_fetch, args=["http://example.com/a.json"])
+        thread.start()
+        thread.join()
+        metrics.record_remote_fetch("http://example.com/a.json")
+        self.assertEqual(metrics.remote_fetches, {"http://example.com/a.json": 2})
+        metrics.reset()
+        self.assertEqual(metrics.remote_fetches, {})
+        metrics.record_remote_fetch("http://example.com/a.json")
+        self.assertEqual(metrics.remote_fetches, {"http://example.com/a.json": 1})
+        self.assertEqual(metrics.shards, 2)
+
+    def test_additional_property_keys_are_not_labels(self):
+        schema = get_schema({"type": "object", "properties": {"a": {"type": "object", "additionalProperties": False}},
+                             "additionalProperties": {"type": "integer"}})
+        metrics = Metrics()
+        for i in range(50):
+            metrics.record_validation(schema, schema.validate({"user-key-{}".format(i): "x"}), 0.001)
+        metrics.record_validation(schema, schema.validate({"a": {"b": 1}}), 0.001)
+        self.assertEqual(len(metrics.failures), 2)
+        label = metrics.get_label(schema)
+        self.assertEqual(metrics.get_failures(), {(label, "#/additionalProperties", "type"): 50,
+                                                  (label, "#/properties/a", "additionalProperties"): 1})
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,94 @@
+import unittest
+from validator import get_schema
+from validator.classes import Schema, IntegerSchema, StringSchema
+from validator.optimizer import optimize
+
+DOCUMENTS = [None, True, False, 0, 1, 2, 3, 7, -1, 1.5, "", "a", "abc", [], [1], [1, "a"], [1, 2, 3], {}, {"a": 1},
+             {"a": "x"}, {"a": 1, "b": 2}, {"b": [1, 2]}, {"a": None}]
+"""Documents of every type that each schema is checked with, besides its own."""
+
+
+class TestOptimize(unittest.TestCase):
+
+    def assert_equivalent(self, json_schema, documents=()):
+        """
+        Checks that the optimized graph accepts the same documents as the original schema, and that the optimized
+        schema reports the same failures.
+        :return: OptimizedSchema object.
+        """
+
+        schema = get_schema(json_schema)
+        optimized = optimize(schema)
+        for document in list(documents) + DOCUMENTS:
+            expected = schema.validate(document)
+            self.assertEqual(optimized.optimized.validate_node(document).is_valid, expected.is_valid, document)
+            response = optimized.validate(document)
+            self.assertEqual(response.is_valid, expected.is_valid, document)
+            if not expected.is_valid:
+                self.assertEqual(response.schema_pointer.nodes, expected.schema_pointer.nodes, document)
+                self.assertEqual(response.document_pointer.nodes, expected.document_pointer.nodes, document)
+        return optimized
+
+    def test_flatten_all_of(self):
+        optimized = self.assert_equivalent({"allOf": [{"allOf": [{"allOf": [{"type": "integer", "minimum": 2}]},
+                                                                 {"maximum": 5}]}]}, [4, 6])
+        root = optimized.optimized
+        self.assertTrue(all(not member.allOf for member in root.allOf))
+        optimized = self.assert_equivalent({"allOf": [{"type": "integer", "minimum": 2}]})
+        self.assertIs(type(optimized.optimized), IntegerSchema)
+
+    def test_drop_always_true(self):
+        optimized = self.assert_equivalent({"type": "object", "allOf": [{}, {"required": ["a"]}],
+                                            "properties": {"a": {}, "b": {"type": "array"}},
+                                            "additionalProperties": {}})
+        root = optimized.optimized
+        self.assertEqual(len(root.allOf), 1)
+        self.assertEqual(list(root.properties), ["b"])
+        self.assertIs(root.additionalProperties, True)
+        optimized = self.assert_equivalent({"type": "string", "anyOf": [{"maxLength": 1}, {}]})
+        self.assertFalse(optimized.optimized.anyOf)
+        self.assert_equivalent({"type": "array", "items": [{"type": "integer"}], "additionalItems": {}})
+
+    def test_fold_enum(self):
+        optimized = self.assert_equivalent({"type": "integer", "enum": [1, 2, 3, 7, "a"], "minimum": 2,
+                                            "multipleOf": 1})
+        self.assertIs(type(optimized.optimized), Schema)
+        self.assertEqual(list(optimized.optimized.enum), [2, 3, 7])
+        optimized = self.assert_equivalent({"type": "string", "enum": ["a", "abc", 1], "maxLength": 2})
+        self.assertEqual(list(optimized.optimized.enum), ["a"])
+        self.assert_equivalent({"enum": [[1], {"a": 1}, 1], "type": "array"})
+
+    def test_unsatisfiable(self):
+        cases = [
+            ({"type": "integer", "minimum": 5, "maximum": 2}, "#"),
+            ({"type": "object", "properties": {"a": {"type": "string", "minLength": 3, "maxLength": 1}}},
+             "#/properties/a"),
+            ({"type": "integer", "enum": [1, 2], "minimum": 3}, "#"),
+            ({"type": "object", "required": ["a"], "properties": {"a": {"type": "array", "minItems": 2,
+                                                                        "maxItems": 1}}}, "#/properties/a"),
+            ({"type": "object", "required": ["a", "b"], "maxProperties": 1}, "#"),
+            ({"allOf": [{"type": "integer"}, {"not": {}}]}, "#/allOf/1"),
+        ]
+        for json_schema, pointer in cases:
+            optimized = self.assert_equivalent(json_schema)
+            self.assertIn(pointer, optimized.unsatisfiable, json_schema)
+        optimized = self.assert_equivalent({"anyOf": [{"type": "integer", "minimum": 3, "maximum": 1},
+                                                      {"type": "string"}]})
+        # The string branch is the only one left, so it replaces the anyOf.
+        self.assertIs(type(optimized.optimized), StringSchema)
+        optimized = self.assert_equivalent({"oneOf": [{"type": "integer", "minimum": 3, "maximum": 1},
+                                                      {"type": "string"}, {"maxLength": 2}]})
+        self.assertEqual(len(optimized.optimized.oneOf), 2)
+
+    def test_recursive_and_referenced(self):
+        self.assert_equivalent({
+            "definitions": {"node": {"allOf": [{"allOf": [{"type": "object"}]}, {}],
+                                     "properties": {"value": {"enum": [1, 2, "a"], "type": "integer"},
+                                                    "children": {"type": "array",
+                                                                 "items": {"$ref": "#/definitions/node"}}}}},
+            "$ref": "#/definitions/node"
+        }, [{"value": 1, "children": [{"value": 2}, {"value": "a"}]}, {"children": [{"children": [{"value": 3}]}]}])
+
+
+if __name__ == "__main__":
+    unittest.main()
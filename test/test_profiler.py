@@ -0,0 +1,60 @@
+import unittest
+from validator import get_schema
+from validator.classes import Schema, IntegerSchema, ObjectSchema
+from validator.profiler import Profiler, CALLS, TOTAL, SELF
+
+
+class TestProfiler(unittest.TestCase):
+
+    def profile(self, json_schema, documents):
+        """
+        :return: Dict where each (pointer, keyword) pair holds its number of calls.
+        """
+
+        schema = get_schema(json_schema)
+        with Profiler(schema) as profiler:
+            for document in documents:
+                schema.validate(document)
+        return {frame: stat[CALLS] for frame, stat in profiler.stats.items()}
+
+    def test_number_nodes(self):
+        calls = self.profile({"items": {"type": "number", "minimum": 0}}, [[1.5, 2, 3]])
+        self.assertEqual(calls[("#/items", "validate")], 3)
+        self.assertEqual(calls[("#/items", "minimum")], 3)
+        calls = self.profile({"items": {"type": "integer"}}, [[1, 2]])
+        self.assertEqual(calls[("#/items", "validate")], 2)
+
+    def test_super_validate_node_is_not_counted(self):
+        calls = self.profile({"type": "object", "properties": {"a": {"type": "integer"}}}, [{"a": 1}, {"a": 2}])
+        self.assertEqual(calls[("#", "validate")], 2)
+        self.assertEqual(calls[("#/properties/a", "validate")], 2)
+
+    def test_dependencies_counted_once(self):
+        calls = self.profile({"type": "object", "dependencies": {"a": ["b"], "c": {"required": ["d"]}}},
+                             [{"a": 1, "b": 2, "c": 3, "d": 4}])
+        self.assertEqual(calls[("#", "dependencies")], 1)
+        self.assertNotIn(("#", "validate_property_dependencies"), calls)
+        self.assertNotIn(("#", "validate_schema_dependencies"), calls)
+
+    def test_self_time_adds_up(self):
+        schema = get_schema({"type": "array", "items": {"type": "object", "required": ["a"]}})
+        with Profiler(schema) as profiler:
+            schema.validate([{"a": i} for i in range(100)])
+        root_total = profiler.stats[("#", "validate")][TOTAL]
+        self_times = sum(stat[SELF] for stat in profiler.stats.values())
+        self.assertAlmostEqual(self_times, root_total, delta=root_total * 0.01)
+        self.assertTrue(profiler.collapsed_stacks().startswith("#"))
+
+    def test_disable_restores_methods(self):
+        originals = [Schema.validate_node, IntegerSchema.validate_node, ObjectSchema.validate_dependencies]
+        schema = get_schema({"type": "integer"})
+        with Profiler(schema):
+            self.assertIsNot(IntegerSchema.validate_node, originals[1])
+            with self.assertRaises(RuntimeError):
+                Profiler().enable()
+        self.assertEqual([Schema.validate_node, IntegerSchema.validate_node, ObjectSchema.validate_dependencies],
+                         originals)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,88 @@
+import re
+import unittest
+from validator import utils
+from validator.regex import LinearPattern, MAX_NFA_STATES, compile_linear
+from validator.utils import check_pattern, get_pattern
+
+STRINGS = ["", "a", "b", "ab", "aab", "aaab", "abab", "ba", "abc", "a\n", "a\nb", "\na", "ab\n", "1", "a1", "_", " ",
+           "a b", "ABC", "x\ty", "aaaa", "é", "éa"]
+
+PATTERNS = [
+    # Anchors: `$` also matches before a newline at the end, `\Z` only at the end.
+    "^a", "a$", "^a$", "^$", "\\Aa", "a\\Z", "^a\\Z", "b$", "^ab\\Z", "^(a|b)$", "\n$", "^\n",
+    # Lazy quantifiers match the same strings as greedy ones.
+    "a+?b", "a*?$", "^a??b", "(ab)+?$", "^a{1,2}?b", ".*?c",
+    # Counted repetitions.
+    "^a{2}$", "^a{2,3}b$", "^a{,2}$", "^(ab){1,2}$", "a{0,1}b", "^a{3,}", "^(a|b){2,4}$",
+    # Character classes and their negations.
+    "[^a]", "^[^ab]+$", "[^\\d]", "\\D", "^\\W", "\\S", "[^a-z\\s]", "^[\\w ]+$", "[^\n]$", "^.$", "^.+$",
+    # Alternation and groups.
+    "^(a|ab)(c|bcd)?$", "(a|b)*c", "^(|a)b", "a|^b",
+]
+
+
+def matches_with_re(pattern, string):
+    """
+    The loop `check_pattern` runs with a compiled `re` pattern.
+    """
+
+    compiled = re.compile(pattern)
+    return any(compiled.match(string, index) for index in range(len(string)))
+
+
+class TestRegex(unittest.TestCase):
+
+    def test_same_matches_as_re(self):
+        for pattern in PATTERNS:
+            linear = compile_linear(pattern)
+            self.assertIsInstance(linear, LinearPattern, pattern)
+            for string in STRINGS:
+                self.assertEqual(linear.matches(string), matches_with_re(pattern, string), (pattern, string))
+
+    def test_unsupported_patterns_fall_back_to_re(self):
+        for pattern, valid, invalid in [("(a)\\1", "baa", "aba"), ("a(?=b)", "ab", "ac"), ("(?<!b)a", "ca", "ba"),
+                                        ("\\ba", "b a", "ba"), ("(?i)^a", "A", "bA"), ("(?>a+)b", "aab", "aac"),
+                                        ("a++b", "aab", "aac"), ("(?P<x>a)(?P=x)", "aa", "ab")]:
+            try:
+                re.compile(pattern)
+            except re.error:
+                # Possessive quantifiers and atomic groups need Python 3.11.
+                continue
+            self.assertIsNone(compile_linear(pattern), pattern)
+            self.assertNotIsInstance(get_pattern(pattern), LinearPattern)
+            self.assertTrue(check_pattern(pattern, valid), pattern)
+            self.assertFalse(check_pattern(pattern, invalid), pattern)
+
+    def test_invalid_patterns_are_reported_by_re(self):
+        self.assertIsNone(compile_linear("(a"))
+        with self.assertRaises(re.error):
+            get_pattern("(a")
+
+    def test_patterns_with_too_many_states(self):
+        pattern = "^a{{{}}}$".format(MAX_NFA_STATES)
+        self.assertIsNone(compile_linear(pattern))
+        self.assertTrue(check_pattern(pattern, "a" * MAX_NFA_STATES))
+        self.assertFalse(check_pattern(pattern, "a" * (MAX_NFA_STATES - 1)))
+        self.assertIsInstance(compile_linear("^a{{{}}}$".format(MAX_NFA_STATES // 2)), LinearPattern)
+
+    def test_linear_matcher_doesnt_backtrack(self):
+        linear = compile_linear("^(a+)+$")
+        self.assertFalse(linear.matches("a" * 5000 + "!"))
+        self.assertTrue(linear.matches("a" * 5000))
+
+    def test_pattern_cache_is_bounded(self):
+        size = utils.MAX_PATTERNS
+        utils.PATTERNS.clear()
+        try:
+            utils.MAX_PATTERNS = 10
+            for i in range(25):
+                get_pattern("^a{{{}}}$".format(i))
+                self.assertLessEqual(len(utils.PATTERNS), 10)
+            self.assertTrue(check_pattern("^a{3}$", "aaa"))
+        finally:
+            utils.MAX_PATTERNS = size
+            utils.PATTERNS.clear()
+
+
+if __name__ == "__main__":
+    unittest.main()
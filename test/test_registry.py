@@ -0,0 +1,68 @@
+import json
+import os
+import shutil
+import tempfile
+import unittest
+from validator.classes import get_schema_from_file
+from validator.exceptions import CircularSchemaException
+from validator.registry import SchemaRegistry
+
+
+class TestRegistry(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def write(self, name, json_schema):
+        path = os.path.join(self.directory, name)
+        with open(path, "w") as f:
+            json.dump(json_schema, f)
+        return path
+
+    def test_recursion_across_files(self):
+        a = os.path.join(self.directory, "a.json")
+        b = self.write("b.json", {"type": "object", "properties": {"a": {"$ref": a}}})
+        self.write("a.json", {"type": "object", "properties": {"b": {"$ref": b}, "value": {"type": "integer"}}})
+        for lazy in [False, True]:
+            registry = SchemaRegistry()
+            schema = get_schema_from_file(a, registry=registry, lazy=lazy)
+            self.assertTrue(schema.validate({"b": {"a": {"value": 1, "b": {"a": {"value": 2}}}}}).is_valid)
+            response = schema.validate({"b": {"a": {"b": {"a": {"value": "x"}}}}})
+            self.assertFalse(response.is_valid)
+            self.assertEqual(response.document_pointer.nodes, ["b", "a", "b", "a", "value"])
+            schema = registry.get_schema_from_file(b)
+            self.assertTrue(schema.validate({"a": {"value": 1, "b": {"a": {}}}}).is_valid)
+            self.assertFalse(schema.validate({"a": {"b": {"a": {"value": "x"}}}}).is_valid)
+
+    def test_recursion_across_fragments(self):
+        a = os.path.join(self.directory, "a.json")
+        b = self.write("b.json", {"definitions": {"list": {"type": "array",
+                                                           "items": {"$ref": a + "#/definitions/node"}}}})
+        self.write("a.json", {"definitions": {"node": {"type": "object",
+                                                       "properties": {"children": {"$ref": b + "#/definitions/list"}},
+                                                       "required": ["children"]}},
+                              "$ref": "#/definitions/node"})
+        schema = SchemaRegistry().get_schema_from_file(a)
+        self.assertTrue(schema.validate({"children": [{"children": []}, {"children": [{"children": []}]}]}).is_valid)
+        self.assertFalse(schema.validate({"children": [{"children": [{}]}]}).is_valid)
+
+    def test_unproductive_cycle_across_files(self):
+        a = os.path.join(self.directory, "a.json")
+        b = self.write("b.json", {"definitions": {"x": {"anyOf": [{"$ref": "#/definitions/y"}]},
+                                                  "y": {"not": {"$ref": a}}}})
+        self.write("a.json", {"allOf": [{"$ref": b + "#/definitions/x"}]})
+        with self.assertRaises(CircularSchemaException):
+            get_schema_from_file(a, registry=SchemaRegistry())
+        with self.assertRaises(CircularSchemaException):
+            SchemaRegistry().get_schema_from_file(b + "#/definitions/x")
+        self.write("a.json", {"$ref": b})
+        self.write("b.json", {"$ref": a})
+        with self.assertRaises(CircularSchemaException):
+            SchemaRegistry().get_schema_from_file(a)
+
+
+if __name__ == "__main__":
+    unittest.main()
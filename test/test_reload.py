@@ -0,0 +1,69 @@
+import json
+import os
+import shutil
+import tempfile
+import time
+import unittest
+from validator.reload import SchemaWatcher
+
+
+class TestSchemaWatcher(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.path = os.path.join(self.directory, "schema.json")
+        self.version = 0
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def write(self, json_schema):
+        """
+        :param json_schema: Dict object, or a string that's written as it is.
+        """
+
+        with open(self.path, "w") as f:
+            f.write(json_schema if isinstance(json_schema, str) else json.dumps(json_schema))
+        # The modification time changes even if the file system has a coarse clock.
+        self.version += 1
+        os.utime(self.path, ns=(self.version * 10 ** 9, self.version * 10 ** 9))
+
+    def wait_for(self, condition):
+        deadline = time.monotonic() + 5
+        while not condition():
+            self.assertLess(time.monotonic(), deadline)
+            time.sleep(0.01)
+
+    def test_broken_version_keeps_the_old_schema(self):
+        self.write({"type": "integer"})
+        watcher = SchemaWatcher({"schema": self.path})
+        for broken in [{"items": [{}], "properties": {"a": {"$ref": "#/items/3"}}}, {"$ref": "#/definitions/x"},
+                       {"type": 1}, "{"]:
+            self.write(broken)
+            self.assertEqual(watcher.check(), [])
+            self.assertIn("schema", watcher.errors)
+            self.assertTrue(watcher.get_schema("schema").validate(1).is_valid)
+        self.write({"type": "string"})
+        self.assertEqual(watcher.check(), ["schema"])
+        self.assertEqual(watcher.errors, {})
+        self.assertTrue(watcher.get_schema("schema").validate("a").is_valid)
+
+    def test_thread_survives_a_broken_version(self):
+        self.write({"type": "integer"})
+        watcher = SchemaWatcher({"schema": self.path}, interval=0.01)
+        watcher.start()
+        try:
+            self.write({"items": [{}], "properties": {"a": {"$ref": "#/items/3"}}})
+            self.wait_for(lambda: "schema" in watcher.errors)
+            self.assertIn("IndexError", watcher.errors["schema"])
+            self.assertTrue(watcher.get_schema("schema").validate(1).is_valid)
+            self.write({"type": "string"})
+            self.wait_for(lambda: watcher.reloads == 1)
+            self.assertTrue(watcher.get_schema("schema").validate("a").is_valid)
+            self.assertNotIn("schema", watcher.errors)
+        finally:
+            watcher.stop()
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,122 @@
+import copy
+import unittest
+from validator import get_schema
+from validator.patch import apply_patch
+
+JSON_SCHEMA = {
+    "type": "object",
+    "required": ["id", "tags", "lines"],
+    "properties": {
+        "id": {"type": "integer"},
+        "tags": {"type": "array", "items": {"type": "string"}, "uniqueItems": True, "maxItems": 4},
+        "lines": {"type": "array", "minItems": 1,
+                  "items": {"type": "object", "required": ["qty"], "properties": {"qty": {"type": "integer",
+                                                                                          "minimum": 1}},
+                            "additionalProperties": False}},
+        "pair": {"type": "array", "items": [{"type": "string"}, {"type": "integer"}], "additionalItems": False},
+        "note": {"type": "string"}
+    },
+    "dependencies": {"note": ["id"], "discount": {"required": ["code"]}},
+    "patternProperties": {"^x-": {"type": "integer"}},
+    "additionalProperties": {"type": ["string", "integer"]}
+}
+
+DOCUMENT = {"id": 1, "tags": ["a", "b"], "lines": [{"qty": 1}, {"qty": 2}, {"qty": 3}], "pair": ["p", 1], "note": "n"}
+
+PATCHES = [
+    # Lists: add and remove in the middle and at the end.
+    [{"op": "add", "path": "/lines/1", "value": {"qty": 5}}],
+    [{"op": "add", "path": "/lines/1", "value": {"qty": 0}}],
+    [{"op": "add", "path": "/lines/-", "value": {"qty": 0}}],
+    [{"op": "add", "path": "/lines/3", "value": {"qty": 4}}],
+    [{"op": "add", "path": "/lines/3", "value": {"qty": 4, "x": 1}}],
+    [{"op": "remove", "path": "/lines/1"}],
+    [{"op": "remove", "path": "/lines/2"}],
+    [{"op": "remove", "path": "/lines/2"}, {"op": "remove", "path": "/lines/1"}, {"op": "remove", "path": "/lines/0"}],
+    [{"op": "add", "path": "/pair/-", "value": 2}],
+    [{"op": "remove", "path": "/pair/1"}],
+    [{"op": "replace", "path": "/pair/0", "value": 1}],
+    # Moves and copies.
+    [{"op": "move", "from": "/lines/0", "path": "/lines/-"}],
+    [{"op": "move", "from": "/lines/2/qty", "path": "/lines/0/count"}],
+    [{"op": "move", "from": "/note", "path": "/x-note"}],
+    [{"op": "move", "from": "/id", "path": "/other"}],
+    [{"op": "copy", "from": "/lines/0", "path": "/lines/1"}],
+    [{"op": "copy", "from": "/tags/0", "path": "/tags/-"}],
+    [{"op": "copy", "from": "/id", "path": "/x-id"}],
+    [{"op": "copy", "from": "/tags", "path": "/x-tags"}],
+    # Required keys and dependencies.
+    [{"op": "remove", "path": "/id"}],
+    [{"op": "remove", "path": "/lines/0/qty"}],
+    [{"op": "add", "path": "/discount", "value": 5}],
+    [{"op": "add", "path": "/discount", "value": 5}, {"op": "add", "path": "/code", "value": "c"}],
+    [{"op": "add", "path": "/code", "value": "c"}, {"op": "add", "path": "/discount", "value": 5},
+     {"op": "remove", "path": "/code"}],
+    # uniqueItems and maxItems after an append.
+    [{"op": "add", "path": "/tags/-", "value": "a"}],
+    [{"op": "add", "path": "/tags/-", "value": "c"}],
+    [{"op": "add", "path": "/tags/-", "value": "c"}, {"op": "add", "path": "/tags/-", "value": "d"},
+     {"op": "add", "path": "/tags/-", "value": "e"}],
+    [{"op": "replace", "path": "/tags/1", "value": "a"}],
+    # Values of other keywords.
+    [{"op": "replace", "path": "/id", "value": "1"}],
+    [{"op": "add", "path": "/x-count", "value": "many"}],
+    [{"op": "add", "path": "/extra", "value": []}],
+    [{"op": "add", "path": "/extra", "value": "ok"}],
+    [{"op": "replace", "path": "/lines/1/qty", "value": 0}],
+    [{"op": "test", "path": "/id", "value": 1}, {"op": "replace", "path": "", "value": {"id": 2}}],
+]
+
+
+def summarize(response):
+    if response.is_valid:
+        return True
+    return response.document_pointer.nodes, response.schema_pointer.nodes
+
+
+class TestRevalidate(unittest.TestCase):
+
+    def test_same_responses_as_validate(self):
+        for lazy in [False, True]:
+            schema = get_schema(JSON_SCHEMA, lazy=lazy)
+            self.assertTrue(schema.validate(DOCUMENT).is_valid)
+            outcomes = set()
+            for patch in PATCHES:
+                document, response = schema.revalidate(DOCUMENT, patch)
+                expected = apply_patch(DOCUMENT, patch)
+                self.assertEqual(document, expected, patch)
+                self.assertEqual(summarize(response), summarize(schema.validate(expected)), patch)
+                outcomes.add(response.is_valid)
+            self.assertEqual(outcomes, {True, False})
+
+    def test_document_is_not_modified(self):
+        schema = get_schema(JSON_SCHEMA)
+        for patch in PATCHES:
+            document = copy.deepcopy(DOCUMENT)
+            new_document, _ = schema.revalidate(document, patch)
+            self.assertEqual(document, DOCUMENT, patch)
+            self.assertIsNot(new_document, document)
+        # Only the containers on the paths of the operations are copied.
+        new_document, _ = schema.revalidate(DOCUMENT, [{"op": "add", "path": "/tags/-", "value": "c"}])
+        self.assertIs(new_document["lines"], DOCUMENT["lines"])
+        self.assertIsNot(new_document["tags"], DOCUMENT["tags"])
+
+    def test_in_place(self):
+        schema = get_schema(JSON_SCHEMA)
+        document = copy.deepcopy(DOCUMENT)
+        new_document, response = schema.revalidate(document, [{"op": "add", "path": "/tags/-", "value": "a"}],
+                                                   in_place=True)
+        self.assertIs(new_document, document)
+        self.assertEqual(document["tags"], ["a", "b", "a"])
+        self.assertEqual(summarize(response), (["tags", 2], ["properties", "tags", "uniqueItems"]))
+
+    def test_invalid_patch(self):
+        schema = get_schema(JSON_SCHEMA)
+        for patch in [[{"op": "remove", "path": "/missing"}], [{"op": "test", "path": "/id", "value": 2}],
+                      [{"op": "add", "path": "/lines/9", "value": {}}]]:
+            with self.assertRaises(ValueError):
+                schema.revalidate(DOCUMENT, patch)
+
+
+if __name__ == "__main__":
+    unittest.main()
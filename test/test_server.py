@@ -0,0 +1,149 @@
+import asyncio
+import concurrent.futures
+import json
+import threading
+import unittest
+from validator import get_schema
+from validator.server import MicroBatcher, ValidationServer, validate_items
+
+SCHEMAS = {
+    "person": {"type": "object", "required": ["name"], "properties": {"name": {"type": "string"},
+                                                                     "age": {"type": "integer", "minimum": 0}}},
+    "number": {"type": "number"}
+}
+
+
+async def request(reader, writer, method, path, body=b"", headers=None):
+    """
+    Sends a request over an open connection and reads its response.
+    :return: Tuple (status code, dict of lowercase headers, bytes of the body).
+    """
+
+    lines = ["{} {} HTTP/1.1".format(method, path), "Content-Length: {}".format(len(body))]
+    lines.extend("{}: {}".format(name, value) for name, value in (headers or {}).items())
+    writer.write(("\r\n".join(lines) + "\r\n\r\n").encode("latin-1") + body)
+    await writer.drain()
+    status = int((await reader.readline()).split()[1])
+    response_headers = {}
+    while True:
+        line = (await reader.readline()).decode("latin-1")
+        if line == "\r\n":
+            break
+        name, _, value = line.partition(":")
+        response_headers[name.lower()] = value.strip()
+    return status, response_headers, await reader.readexactly(int(response_headers["content-length"]))
+
+
+class TestServer(unittest.TestCase):
+
+    def run_with_server(self, client, **options):
+        """
+        Starts a server on a free port and runs `client(reader, writer)` with a connection to it.
+        """
+
+        async def run():
+            validation_server = ValidationServer({name: get_schema(json_schema)
+                                                  for name, json_schema in SCHEMAS.items()}, **options)
+            server = await validation_server.start("127.0.0.1", 0)
+            port = server.sockets[0].getsockname()[1]
+            try:
+                reader, writer = await asyncio.open_connection("127.0.0.1", port)
+                try:
+                    return await client(reader, writer)
+                finally:
+                    writer.close()
+            finally:
+                server.close()
+                await server.wait_closed()
+                validation_server.close()
+
+        return asyncio.run(run())
+
+    def test_http_requests(self):
+        async def client(reader, writer):
+            responses = [await request(reader, writer, "GET", "/health"),
+                         await request(reader, writer, "GET", "/schemas"),
+                         await request(reader, writer, "POST", "/validate/person", b'{"name": "a", "age": 3}'),
+                         await request(reader, writer, "POST", "/validate/person?x=1", b'{"age": -1}'),
+                         await request(reader, writer, "POST", "/validate/missing", b"1"),
+                         await request(reader, writer, "GET", "/validate/person"),
+                         await request(reader, writer, "GET", "/other")]
+            # Errors in the document keep the connection open.
+            responses.append(await request(reader, writer, "POST", "/validate/number", b"{"))
+            responses.append(await request(reader, writer, "POST", "/validate/number", b"1.5",
+                                           {"Connection": "close"}))
+            return responses
+
+        responses = self.run_with_server(client)
+        self.assertEqual([status for status, _, _ in responses], [200, 200, 200, 200, 404, 405, 404, 400, 200])
+        self.assertEqual(json.loads(responses[1][2]), {"schemas": ["number", "person"]})
+        self.assertEqual(json.loads(responses[2][2]), {"valid": True})
+        self.assertEqual(json.loads(responses[3][2]), {"valid": False, "document_pointer": "#",
+                                                       "schema_pointer": "#/required/name"})
+        self.assertIn("error", json.loads(responses[7][2]))
+        self.assertEqual(responses[7][1]["connection"], "keep-alive")
+        self.assertEqual(responses[8][1]["connection"], "close")
+
+    def test_ndjson(self):
+        async def client(reader, writer):
+            body = b'{"name": "a"}\n\n{"name": 1}\n{"name": "b", "age": -1}\n{"name": "c"}\n'
+            return await request(reader, writer, "POST", "/validate/person", body,
+                                 {"Content-Type": "application/x-ndjson"})
+
+        status, headers, body = self.run_with_server(client, batch_size=2)
+        self.assertEqual(status, 200)
+        self.assertEqual(headers["content-type"], "application/x-ndjson")
+        self.assertEqual([json.loads(line) for line in body.decode().splitlines()], [
+            {"valid": True},
+            {"valid": False, "document_pointer": "#/name", "schema_pointer": "#/properties/name/type"},
+            {"valid": False, "document_pointer": "#/age", "schema_pointer": "#/properties/age/minimum"},
+            {"valid": True}])
+
+    def test_line_over_the_limit(self):
+        async def client(reader, writer):
+            status, headers, _ = await request(reader, writer, "POST", "/validate/number", b"1",
+                                               {"X-Large": "x" * 100000})
+            return status, headers, await reader.read()
+
+        status, headers, rest = self.run_with_server(client)
+        self.assertEqual(status, 431)
+        self.assertEqual(headers["connection"], "close")
+        self.assertEqual(rest, b"")
+
+    def test_micro_batches(self):
+        batches = []
+        release = threading.Event()
+
+        def validate(items):
+            batches.append([document for _, document in items])
+            # The first batch keeps the only worker busy while the other documents arrive.
+            release.wait(5)
+            return [{"valid": True, "document": document} for _, document in items]
+
+        async def run():
+            with concurrent.futures.ThreadPoolExecutor(1) as executor:
+                batcher = MicroBatcher(executor, validate, 1, batch_size=4)
+                futures = [batcher.submit("number", i) for i in range(4)]
+                await asyncio.sleep(0.05)
+                futures.extend(batcher.submit("number", i) for i in range(4, 10))
+                release.set()
+                return await asyncio.gather(*futures)
+
+        results = asyncio.run(run())
+        self.assertEqual([result["document"] for result in results], list(range(10)))
+        self.assertEqual(batches, [[0, 1, 2, 3], [4, 5, 6, 7], [8, 9]])
+
+
+class TestValidateItems(unittest.TestCase):
+
+    def test_error_fails_only_its_document(self):
+        schemas = {"ok": get_schema({"type": "integer"}), "bad": get_schema({"type": "string", "pattern": "("})}
+        results = validate_items(schemas, [("ok", 1), ("bad", "x"), ("ok", "y"), ("missing", 1)])
+        self.assertEqual(results[0], {"valid": True})
+        self.assertIn("error", results[1])
+        self.assertFalse(results[2]["valid"])
+        self.assertIn("error", results[3])
+
+
+if __name__ == "__main__":
+    unittest.main()
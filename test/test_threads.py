@@ -0,0 +1,97 @@
+import sys
+import threading
+import unittest
+from validator import get_schema
+from validator.optimizer import optimize
+
+THREADS = 16
+
+JSON_SCHEMA = {
+    "definitions": {
+        "node": {"type": "object", "required": ["name"],
+                 "properties": {"name": {"type": "string", "maxLength": 8},
+                                "size": {"type": "integer", "minimum": 0},
+                                "children": {"type": "array", "items": {"$ref": "#/definitions/node"}}},
+                 "additionalProperties": False},
+        "leaf": {"allOf": [{"allOf": [{"$ref": "#/definitions/node"}]}, {"maxProperties": 2}]}
+    },
+    "type": "object",
+    "properties": {"root": {"$ref": "#/definitions/node"}, "leaves": {"type": "array",
+                                                                   "items": {"$ref": "#/definitions/leaf"}}},
+    "patternProperties": {"^x-": {"enum": [1, 2, "a"]}}
+}
+
+
+def get_documents():
+    def tree(depth, width):
+        node = {"name": "n{}".format(depth), "size": depth}
+        if depth > 0:
+            node["children"] = [tree(depth - 1, width) for _ in range(width)]
+        return node
+
+    documents = [{"root": tree(depth, width), "leaves": [{"name": "a"}, {"name": "b", "size": 1}]}
+                 for depth in range(4) for width in [1, 3]]
+    invalid = tree(3, 2)
+    invalid["children"][1]["children"][0]["name"] = "a name that is too long"
+    documents.extend([{"root": invalid}, {"root": tree(2, 2), "leaves": [{"name": "a", "size": 1, "children": []}]},
+                      {"x-a": 3}, {"root": {"name": "a", "size": -1}}, {"root": {"name": "a", "other": 1}}])
+    return documents
+
+
+def summarize(response):
+    if response.is_valid:
+        return True
+    return response.document_pointer.nodes, response.schema_pointer.nodes
+
+
+class TestThreads(unittest.TestCase):
+
+    def setUp(self):
+        # Threads are switched more often, so more of them are in the middle of a build or a validation at once.
+        self.switch_interval = sys.getswitchinterval()
+        sys.setswitchinterval(1e-5)
+
+    def tearDown(self):
+        sys.setswitchinterval(self.switch_interval)
+
+    def assert_same_responses(self, schema, documents, expected):
+        """
+        Validates every document from `THREADS` threads that start at once, and compares the responses with the ones of
+        a single thread.
+        """
+
+        errors = []
+        barrier = threading.Barrier(THREADS)
+
+        def work(offset):
+            barrier.wait()
+            for i in range(len(documents) * 4):
+                index = (i + offset) % len(documents)
+                try:
+                    if summarize(schema.validate(documents[index])) != expected[index]:
+                        errors.append(index)
+                except Exception as error:
+                    errors.append(error)
+
+        workers = [threading.Thread(target=work, args=(offset,)) for offset in range(THREADS)]
+        for worker in workers:
+            worker.start()
+        for worker in workers:
+            worker.join()
+        self.assertEqual(errors, [])
+
+    def test_shared_schemas(self):
+        documents = get_documents()
+        expected = [summarize(get_schema(JSON_SCHEMA).validate(document)) for document in documents]
+        self.assertIn(True, expected)
+        self.assertTrue(any(summary is not True for summary in expected))
+        # The lazy schema and the optimized one are first used from every thread at once.
+        for _ in range(5):
+            self.assert_same_responses(get_schema(JSON_SCHEMA, lazy=True), documents, expected)
+            self.assert_same_responses(optimize(get_schema(JSON_SCHEMA)), documents, expected)
+            self.assert_same_responses(optimize(get_schema(JSON_SCHEMA, lazy=True)), documents, expected)
+        self.assert_same_responses(get_schema(JSON_SCHEMA, lean=True), documents, expected)
+
+
+if __name__ == "__main__":
+    unittest.main()
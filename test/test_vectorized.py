@@ -0,0 +1,61 @@
+import unittest
+from validator import get_schema
+from validator.vectorized import VECTORIZE_SIZE, get_numpy
+
+NAN = float("nan")
+
+
+@unittest.skipIf(get_numpy() is None, "NumPy is not installed")
+class TestNumbers(unittest.TestCase):
+
+    def test_nan_against_bounds(self):
+        for bounds in [{"minimum": 0}, {"maximum": 3}, {"maximum": 3, "exclusiveMaximum": True}]:
+            items = dict({"type": "number"}, **bounds)
+            schema = get_schema({"type": "array", "items": items})
+            for size in [1, VECTORIZE_SIZE - 1, VECTORIZE_SIZE, 4 * VECTORIZE_SIZE]:
+                document = [1.0] * (size - 1) + [NAN]
+                response = schema.validate(document)
+                self.assertFalse(response.is_valid, (bounds, size))
+                self.assertEqual(response.document_pointer.nodes, [size - 1])
+
+    def test_nan_without_bounds(self):
+        schema = get_schema({"type": "array", "items": {"type": "number"}})
+        for size in [1, 4 * VECTORIZE_SIZE]:
+            self.assertTrue(schema.validate([1.0] * (size - 1) + [NAN]).is_valid)
+
+    def test_ndarray_with_nan(self):
+        numpy = get_numpy()
+        schema = get_schema({"type": "array", "items": {"type": "number", "minimum": 0}})
+        document = numpy.ones(4 * VECTORIZE_SIZE)
+        self.assertTrue(schema.validate(document).is_valid)
+        document[5] = NAN
+        self.assertFalse(schema.validate(document).is_valid)
+
+    def test_large_ints_mixed_with_floats(self):
+        schema = get_schema({"type": "array", "items": {"type": "number", "maximum": 2 ** 53}})
+        for size in [1, 4 * VECTORIZE_SIZE]:
+            response = schema.validate([2 ** 53 + 1] + [0.5] * size)
+            self.assertFalse(response.is_valid, size)
+            self.assertEqual(response.document_pointer.nodes, [0])
+            self.assertTrue(schema.validate([2 ** 53] + [0.5] * size).is_valid)
+
+    def test_ndarray_against_many_types(self):
+        numpy = get_numpy()
+        document = numpy.ones(4 * VECTORIZE_SIZE)
+        for json_schema in [{"type": ["array", "string"]}, {"type": ["array", "string"], "items": {"minimum": 0}},
+                            {"type": ["array", "null"], "enum": [[1.0] * 4 * VECTORIZE_SIZE]},
+                            {"type": ["array", "null"], "anyOf": [{"maxItems": 1}, {"items": {"type": "number"}}]}]:
+            for iterative in [False, True]:
+                schema = get_schema(json_schema)
+                self.assertTrue(schema.validate(document, iterative=iterative).is_valid, (json_schema, iterative))
+        for iterative in [False, True]:
+            response = get_schema({"type": ["string", "null"]}).validate(document, iterative=iterative)
+            self.assertFalse(response.is_valid)
+            response = get_schema({"type": ["array", "null"], "items": {"maximum": 0}}).validate(document,
+                                                                                               iterative=iterative)
+            self.assertFalse(response.is_valid)
+            self.assertEqual(response.document_pointer.nodes, [0])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -1,6 +1,8 @@
 '''
 Module providing the classes for validating JSON Schemas
 '''
+__version__ = "0.1.0"
+
 from .classes import get_schema, get_schema_from_file, get_schema_from_url
 
 
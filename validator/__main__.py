@@ -0,0 +1,54 @@
+'''
+Command line of the validator:
+
+    python -m validator serve [--host HOST] [--port PORT] [--unix PATH] [--workers N] [--processes]
+                              [--reload SECONDS] SCHEMA...
+
+Each SCHEMA is the path of a schema file, served under its file name without extension, or NAME=PATH.
+'''
+import argparse
+import asyncio
+from .server import MAX_BATCH_SIZE, BATCH_DELAY, get_schema_name, serve
+
+
+def get_files(arguments):
+    """
+    :param arguments: List of "PATH" or "NAME=PATH" strings.
+    :return: Dict where each name holds its path.
+    """
+
+    files = {}
+    for argument in arguments:
+        name, separator, path = argument.partition("=")
+        if not separator:
+            name, path = get_schema_name(argument), argument
+        files[name] = path
+    return files
+
+
+def main(args=None):
+    parser = argparse.ArgumentParser(prog="python -m validator")
+    commands = parser.add_subparsers(dest="command", required=True)
+    serve_parser = commands.add_parser("serve", help="validate documents sent over HTTP against resident schemas")
+    serve_parser.add_argument("schemas", nargs="+", metavar="SCHEMA", help="PATH or NAME=PATH of a schema file")
+    serve_parser.add_argument("--host", default="127.0.0.1")
+    serve_parser.add_argument("--port", type=int, default=8080)
+    serve_parser.add_argument("--unix", metavar="PATH", help="listen on a Unix socket instead of TCP")
+    serve_parser.add_argument("--workers", type=int, default=1, help="batches validated at the same time")
+    serve_parser.add_argument("--processes", action="store_true", help="use worker processes instead of threads")
+    serve_parser.add_argument("--batch-size", type=int, default=MAX_BATCH_SIZE)
+    serve_parser.add_argument("--batch-delay", type=float, default=BATCH_DELAY, metavar="SECONDS")
+    serve_parser.add_argument("--lean", action="store_true", help="don't keep the dicts of the schemas")
+    serve_parser.add_argument("--reload", type=float, metavar="SECONDS",
+                              help="check the schema files every SECONDS and build again the ones that change")
+    arguments = parser.parse_args(args)
+    try:
+        asyncio.run(serve(get_files(arguments.schemas), arguments.host, arguments.port, arguments.unix,
+                          arguments.workers, arguments.processes, arguments.batch_size, arguments.batch_delay,
+                          arguments.lean, arguments.reload))
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,321 @@
+'''
+Module providing an opt-in mode that learns in which order the checks of each schema should run.
+'''
+from .classes import Schema, ObjectSchema, ArraySchema, IntegerSchema, StringSchema, BooleanSchema, NullSchema, \
+    walk_schema
+from .profiler import KEYWORDS
+from .utils import JSONPointer, Response
+from .vectorized import is_ndarray
+
+
+ADAPTED_CLASSES = [Schema, ObjectSchema, ArraySchema, IntegerSchema, StringSchema, BooleanSchema, NullSchema]
+"""Classes whose `validate_node` method is replaced while an adaptive ordering is enabled (NumberSchema inherits it
+from IntegerSchema and MultipleSchema validates its keywords through Schema's)."""
+
+COMBINATOR_CHECKS = ["validate_any_of", "validate_one_of", "validate_all_of", "validate_not", "validate_enum"]
+"""Checks of every schema, in the order `Schema.validate_node` runs them. They don't depend on the type of the
+document."""
+
+CHECKS = {
+    ObjectSchema: ["validate_type", "validate_required_properties", "validate_properties", "validate_min_properties",
+                   "validate_max_properties", "validate_dependencies", "validate_additional_properties",
+                   "validate_pattern_properties"],
+    ArraySchema: ["validate_type", "validate_items", "validate_additional_items", "validate_min_items",
+                  "validate_max_items", "validate_unique_items"],
+    IntegerSchema: ["validate_type", "validate_multiple_of", "validate_minimum", "validate_maximum"],
+    StringSchema: ["validate_type", "validate_min_len", "validate_max_len", "validate_pattern",
+                   "validate_format"],
+    BooleanSchema: ["validate_type"],
+    NullSchema: ["validate_type"],
+}
+"""Checks each schema class runs after the combinator checks, in the order its `validate_node` runs them. The type
+check always runs before the others, which assume the document has the right type."""
+
+EXPENSIVE_CHECKS = ["validate_any_of", "validate_one_of", "validate_all_of", "validate_not", "validate_properties",
+                    "validate_dependencies", "validate_additional_properties", "validate_pattern_properties",
+                    "validate_items", "validate_additional_items", "validate_unique_items", "validate_pattern",
+                    "validate_format"]
+"""Checks that validate subschemas or go through the whole document. They keep their declared order after the cheap
+checks, which are sorted by how often they fail."""
+
+UNIONS = ["anyOf", "oneOf"]
+
+REORDER_INTERVAL = 1000
+"""Number of validations of a schema object after which its checks and branches are sorted again."""
+
+
+class NodeState:
+    """
+    Order and counters of the checks and union branches of one schema object.
+    """
+
+    def __init__(self, schema, pointer):
+        """
+        :param schema: Schema object.
+        :param pointer: JSONPointer string of the schema object.
+        :return: None.
+        """
+
+        self.pointer = pointer
+        self.validations = 0
+        self.owner = next(schema_class for schema_class in type(schema).__mro__
+                          if "validate_node" in vars(schema_class))
+        """Class whose `validate_node` validates the schema object."""
+
+        self.checks = [name for name in COMBINATOR_CHECKS if has_check(schema, name)] + \
+            CHECKS.get(get_checked_class(schema), [])
+        """Names of the checks of the schema object in their declared order."""
+
+        self.functions = {name: getattr(type(schema), name) for name in self.checks}
+        self.failures = {name: 0 for name in self.checks}
+        self.order = list(self.checks)
+        """Names of the checks in the order they run."""
+
+        self.matches = {keyword: [0] * len(getattr(schema, keyword)) for keyword in UNIONS}
+        self.branches = {keyword: list(range(len(getattr(schema, keyword)))) for keyword in UNIONS}
+        """Dict where anyOf and oneOf hold the indexes of their branches in the order they are tried."""
+
+    def reorder(self):
+        """
+        Sorts the cheap checks by their failures and the union branches by their matches (both in descending order),
+        and halves the counters so the order follows changes in the documents.
+        """
+
+        cheap = sorted([name for name in self.checks if name not in EXPENSIVE_CHECKS], key=lambda name:
+                       -self.failures[name])
+        self.order = place_type_check(cheap + [name for name in self.checks if name in EXPENSIVE_CHECKS])
+        for keyword in UNIONS:
+            matches = self.matches[keyword]
+            self.branches[keyword] = sorted(range(len(matches)), key=lambda i: -matches[i])
+            self.matches[keyword] = [count // 2 for count in matches]
+        self.failures = {name: count // 2 for name, count in self.failures.items()}
+
+
+class AdaptiveOrdering:
+    """
+    Opt-in mode that counts how often each check of each schema object fails and how often each anyOf and oneOf branch
+    matches, and every `interval` validations of a schema object sorts its cheap checks so the ones that fail most run
+    first and its branches so the ones that match most are tried first.
+
+    Documents are valid or invalid exactly as before, and anyOf and oneOf report the same responses (a branch that
+    matches ends an anyOf, but when none matches every branch has been tried). When a document fails more than one
+    check, the check that's reported may be a different one from the schema's declared order. The learned ordering can
+    be exported and loaded again after a restart:
+
+        with AdaptiveOrdering(schema) as ordering:
+            for document in documents:
+                schema.validate(document)
+        json.dump(ordering.export(), file)
+
+    While it is not enabled the schema classes are left untouched, so it has no overhead.
+    """
+
+    active = None
+    """Adaptive ordering that is currently enabled (only one can be enabled at a time)."""
+
+    def __init__(self, schema, interval=REORDER_INTERVAL, ordering=None):
+        """
+        :param schema: Schema object whose nodes are going to be reordered.
+        :param interval: Number of validations of a schema object between two sorts of its checks.
+        :param ordering: Dict returned by `export` (optional).
+        :return: None.
+        """
+
+        self.interval = interval
+        self.states = {}
+        """Dict where the id of each schema object holds its NodeState."""
+
+        self.__pointers = {}
+        self.__originals = []
+        for nodes, node in walk_schema(schema):
+            if id(node) not in self.states:
+                pointer = JSONPointer.get_string_from_nodes(nodes)
+                self.states[id(node)] = NodeState(node, pointer)
+                self.__pointers.setdefault(pointer, self.states[id(node)])
+        if ordering is not None:
+            self.load(ordering)
+
+    def enable(self):
+        """
+        Replaces the `validate_node` method of the schema classes by one that runs the checks in the learned order.
+        """
+
+        if AdaptiveOrdering.active is not None:
+            raise RuntimeError("Another adaptive ordering is already enabled.")
+        AdaptiveOrdering.active = self
+        for schema_class in ADAPTED_CLASSES:
+            function = vars(schema_class)["validate_node"]
+            self.__originals.append((schema_class, function))
+            schema_class.validate_node = self.__wrap(schema_class, function)
+
+    def disable(self):
+        """
+        Restores the original methods of the schema classes.
+        """
+
+        for schema_class, function in self.__originals:
+            schema_class.validate_node = function
+        self.__originals = []
+        if AdaptiveOrdering.active is self:
+            AdaptiveOrdering.active = None
+
+    def __enter__(self):
+        self.enable()
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.disable()
+
+    def reorder(self):
+        """
+        Sorts the checks and branches of every schema object now.
+        """
+
+        for state in self.states.values():
+            state.reorder()
+
+    def export(self):
+        """
+        :return: Dict (that can be serialized to json) where the JSONPointer string of each schema object holds the
+        keywords of its checks in the order they run and the branch indexes of its anyOf and oneOf.
+        """
+
+        ordering = {}
+        for pointer, state in self.__pointers.items():
+            if not state.checks:
+                continue
+            ordering[pointer] = {"checks": [KEYWORDS.get(name, name) for name in state.order]}
+            for keyword in UNIONS:
+                if state.branches[keyword]:
+                    ordering[pointer][keyword] = list(state.branches[keyword])
+        return ordering
+
+    def load(self, ordering):
+        """
+        Sets the order of the checks and branches of the schema objects from a dict returned by `export`. Pointers and
+        keywords that are not in the schema are ignored, and checks that are missing run after the others.
+        :param ordering: Dict.
+        """
+
+        for pointer, node_ordering in ordering.items():
+            state = self.__pointers.get(pointer)
+            if state is None:
+                continue
+            names = {KEYWORDS.get(name, name): name for name in state.checks}
+            order = [names[keyword] for keyword in node_ordering.get("checks", []) if keyword in names]
+            order = list(dict.fromkeys(order))
+            state.order = place_type_check(order + [name for name in state.checks if name not in order])
+            for keyword in UNIONS:
+                branches = node_ordering.get(keyword)
+                if branches is not None and sorted(branches) == list(range(len(state.branches[keyword]))):
+                    state.branches[keyword] = list(branches)
+
+    def __wrap(self, schema_class, function):
+        ordering = self
+
+        def validate_node(schema, document):
+            state = ordering.states.get(id(schema))
+            # Schemas of other classes call this method through super() (MultipleSchema validates its combinators
+            # with it), and NumPy arrays are converted by ArraySchema.validate_node.
+            if state is None or (state.owner is not schema_class and (schema_class is not Schema or
+                                                                      state.owner in ADAPTED_CLASSES)) or \
+                    (type(document) is not list and is_ndarray(document)):
+                return function(schema, document)
+            state.validations += 1
+            if state.validations % ordering.interval == 0:
+                state.reorder()
+            for name in state.order:
+                if name == "validate_any_of" or name == "validate_one_of":
+                    response = validate_union(schema, state, document, "anyOf" if name == "validate_any_of" else
+                                              "oneOf")
+                else:
+                    response = state.functions[name](schema, document)
+                if not response.is_valid:
+                    state.failures[name] += 1
+                    return response
+            return Response(True, None, None)
+
+        validate_node.__name__ = function.__name__
+        validate_node.__doc__ = function.__doc__
+        return validate_node
+
+
+def validate_union(schema, state, document, keyword):
+    """
+    Validates a document against the anyOf or oneOf keyword of a schema, trying its branches in the learned order. The
+    response is the same one `validate_any_of` or `validate_one_of` returns.
+    :param schema: Schema object.
+    :param state: NodeState of the schema.
+    :param document: document to validate.
+    :param keyword: "anyOf" or "oneOf".
+    :return: Response object.
+    """
+
+    branches = getattr(schema, keyword)
+    matches = state.matches[keyword]
+    count = 0
+    last_invalid = None
+    last_invalid_index = -1
+    for i in state.branches[keyword]:
+        response = branches[i].validate_node(document)
+        if response.is_valid:
+            matches[i] += 1
+            count += 1
+            if keyword == "anyOf" or count > 1:
+                break
+        elif i > last_invalid_index:
+            last_invalid = response
+            last_invalid_index = i
+    if count == 1 or (count > 1 and keyword == "anyOf"):
+        return Response(True, None, None)
+    if count > 1:
+        return Response(False, JSONPointer(document, []), JSONPointer(schema.whole_schema,
+                                                                      schema.build_nodes(["oneOf"])))
+    last_invalid.add_upward_document_and_schema_nodes([], [last_invalid_index])
+    last_invalid.add_upward_document_and_schema_nodes([], schema.build_nodes([keyword]))
+    return last_invalid
+
+
+def place_type_check(order):
+    """
+    Moves the type check right before the first check that depends on the type of the document.
+    :param order: List of check names.
+    :return: List of check names.
+    """
+
+    if "validate_type" not in order:
+        return order
+    order = [name for name in order if name != "validate_type"]
+    for i, name in enumerate(order):
+        if name not in COMBINATOR_CHECKS:
+            return order[:i] + ["validate_type"] + order[i:]
+    return order + ["validate_type"]
+
+
+def has_check(schema, name):
+    """
+    :param schema: Schema object.
+    :param name: Name of a combinator check.
+    :return: True if the schema has the keyword of the check.
+    """
+
+    return {
+        "validate_any_of": schema.has_any_of,
+        "validate_one_of": schema.has_one_of,
+        "validate_all_of": schema.has_all_of,
+        "validate_not": schema.has_not,
+        "validate_enum": schema.has_enum,
+    }[name]()
+
+
+def get_checked_class(schema):
+    """
+    :param schema: Schema object.
+    :return: The class of `CHECKS` whose checks the schema runs (NumberSchema runs the ones of IntegerSchema), or
+    None if it only runs the combinator checks.
+    """
+
+    for schema_class in CHECKS:
+        if isinstance(schema, schema_class):
+            return schema_class
+    return None
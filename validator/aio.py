@@ -0,0 +1,180 @@
+'''
+Module providing the asyncio variants of loading schemas and validating documents.
+'''
+import asyncio
+import collections
+import os
+import sys
+from .classes import get_schema_from_document, get_registry
+from .refs import get_external_references
+from .registry import split_reference
+from .utils import get_json_from_file, get_json_from_url, is_valid_url
+
+
+FETCH_CONCURRENCY = 8
+"""Maximum number of documents that are fetched at the same time."""
+
+DEFAULT_CONCURRENCY = 1 if getattr(sys, "_is_gil_enabled", lambda: True)() else os.cpu_count() or 1
+"""Maximum number of documents that are validated in the executor at the same time. With the GIL threads don't
+validate in parallel, and every thread that competes for it delays the event loop a bit more, so only one is used."""
+
+LARGE_DOCUMENT = 2000
+"""Number of values (objects, arrays and scalars) from which a document is validated in the executor. Smaller
+documents are validated on the event loop, since handing them to a thread costs more than validating them."""
+
+YIELD_INTERVAL = 0.002
+"""Seconds a stream validates documents on the event loop before it lets other tasks run."""
+
+
+async def aget_schema_from_url(url, registry=None, lazy=False, concurrency=FETCH_CONCURRENCY, executor=None,
+                               lean=False):
+    """
+    Same as `get_schema_from_url` but it doesn't block the event loop. The document and every file or url it references
+    (and the ones they reference) are fetched concurrently and added to the registry, and then the schema is built in
+    the executor.
+    :param url: url pointing a schema.
+    :param registry: SchemaRegistry object (None means the default registry).
+    :param lazy: If it's True subschemas are built the first time they are used.
+    :param concurrency: Maximum number of documents fetched at the same time.
+    :param executor: concurrent.futures.Executor object. None means the default executor of the event loop.
+    :param lean: If it's True the schema objects don't keep the dicts they were built from.
+    :return: Schema object.
+    """
+
+    registry = get_registry(registry)
+    uri, fragment = split_reference(url)
+    await aload_documents([uri], registry, concurrency, executor)
+    document = registry.get_document(uri)
+
+    return await asyncio.get_running_loop().run_in_executor(executor, get_schema_from_document, document, fragment,
+                                                            registry, lazy, lean)
+
+
+async def aload_documents(uris, registry=None, concurrency=FETCH_CONCURRENCY, executor=None):
+    """
+    Fetches documents and the documents they reference, level by level, and adds them to the registry. Documents
+    that are already in the registry are not fetched again.
+    :param uris: List of canonical uris.
+    :param registry: SchemaRegistry object (None means the default registry).
+    :param concurrency: Maximum number of documents fetched at the same time.
+    :param executor: concurrent.futures.Executor object. None means the default executor of the event loop.
+    """
+
+    registry = get_registry(registry)
+    loop = asyncio.get_running_loop()
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def fetch(uri):
+        async with semaphore:
+            if is_valid_url(uri):
+                return await loop.run_in_executor(executor, get_json_from_url, uri)
+            return await loop.run_in_executor(executor, get_json_from_file, uri)
+
+    seen = set(uris)
+    pending = [uri for uri in uris if uri not in registry.documents]
+    while pending:
+        documents = await asyncio.gather(*[fetch(uri) for uri in pending])
+        next_pending = []
+        for uri, document in zip(pending, documents):
+            registry.add_document(document, uri)
+            for reference in get_external_references(document):
+                referenced_uri = split_reference(reference)[0]
+                if referenced_uri not in seen and referenced_uri not in registry.documents:
+                    seen.add(referenced_uri)
+                    next_pending.append(referenced_uri)
+        pending = next_pending
+
+
+async def avalidate(schema, document, executor=None):
+    """
+    Validates a document without blocking the event loop: large documents (see `LARGE_DOCUMENT`) are validated in the
+    executor and small ones right away.
+    :param schema: Schema object.
+    :param document: document to validate.
+    :param executor: concurrent.futures.Executor object. None means the default executor of the event loop.
+    :return: Response object.
+    """
+
+    if not is_large(document):
+        return schema.validate(document)
+    return await asyncio.get_running_loop().run_in_executor(executor, schema.validate, document)
+
+
+async def avalidate_stream(schema, documents, concurrency=DEFAULT_CONCURRENCY, executor=None):
+    """
+    Validates the documents of an (async or not) iterable and yields their responses in the same order.
+
+    Large documents are validated in the executor, at most `concurrency` at the same time, while the following small
+    ones are validated on the event loop, which is given back to other tasks every `YIELD_INTERVAL` seconds.
+    :param schema: Schema object.
+    :param documents: Async iterable or iterable of documents.
+    :param concurrency: Maximum number of documents validated in the executor at the same time.
+    :param executor: concurrent.futures.Executor object. None means the default executor of the event loop. A
+    ProcessPoolExecutor validates in parallel even with the GIL (the schema is pickled with each document).
+    :return: Async generator of Response objects.
+    """
+
+    loop = asyncio.get_running_loop()
+    pending = collections.deque()
+    running = set()
+    last_yield = loop.time()
+    async for document in iterate(documents):
+        if is_large(document):
+            if len(running) >= concurrency:
+                done, _ = await asyncio.wait(running, return_when=asyncio.FIRST_COMPLETED)
+                running -= done
+            future = loop.run_in_executor(executor, schema.validate, document)
+            running.add(future)
+            pending.append(future)
+        else:
+            pending.append(schema.validate(document))
+        while pending and (not asyncio.isfuture(pending[0]) or pending[0].done()):
+            item = pending.popleft()
+            running.discard(item)
+            yield item.result() if asyncio.isfuture(item) else item
+        if loop.time() - last_yield >= YIELD_INTERVAL:
+            await asyncio.sleep(0)
+            last_yield = loop.time()
+    while pending:
+        item = pending.popleft()
+        yield await item if asyncio.isfuture(item) else item
+
+
+async def iterate(documents):
+    """
+    :param documents: Async iterable or iterable.
+    :return: Async generator of its items.
+    """
+
+    if hasattr(documents, "__aiter__"):
+        async for document in documents:
+            yield document
+    else:
+        for document in documents:
+            yield document
+
+
+def is_large(document, limit=LARGE_DOCUMENT):
+    """
+    Checks if a document has at least `limit` values. It stops counting when it gets there, so it's cheap even for
+    very large documents.
+    :param document: Any json object.
+    :param limit: Number of values.
+    :return: bool.
+    """
+
+    count = 0
+    pending = [document]
+    while pending:
+        current = pending.pop()
+        count += 1
+        if count >= limit:
+            return True
+        if isinstance(current, (dict, list)):
+            if count + len(current) >= limit:
+                return True
+            pending.extend(current.values() if isinstance(current, dict) else current)
+        elif isinstance(current, str):
+            # Long strings are expensive to check against a pattern.
+            count += len(current) // 64
+    return False
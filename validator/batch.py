@@ -0,0 +1,202 @@
+'''
+Module providing the columnar validation of batches of records against an object schema.
+'''
+import time
+from .classes import Schema, ObjectSchema, IntegerSchema, NumberSchema, StringSchema
+from .metrics import METRICS
+from .utils import Response
+from .vectorized import get_invalid_numbers
+
+
+BATCH_SIZE = 10000
+"""Number of records that are transposed into columns at once."""
+
+
+class BatchResponse:
+    """
+    Response of the validation of a batch of documents.
+    """
+
+    def __init__(self, valid, errors):
+        """
+        :param valid: List where each document index holds True if it's valid.
+        :param errors: Dict where each invalid document index holds its Response object.
+        """
+
+        self.valid = valid
+        """List of bools, one per document, in the same order as the documents."""
+
+        self.errors = errors
+        """Dict where each invalid document index holds the same Response object that `schema.validate` returns."""
+
+    def get_invalid_indexes(self):
+        """
+        :return: Sorted list of the indexes of the invalid documents.
+        """
+
+        return sorted(self.errors)
+
+    def __len__(self):
+        return len(self.valid)
+
+    def __bool__(self):
+        return not self.errors
+
+    def __repr__(self):
+        return "{} of {} documents are valid".format(len(self.valid) - len(self.errors), len(self.valid))
+
+
+def validate_batch(schema, documents, batch_size=BATCH_SIZE):
+    """
+    Validates a list of records against the same schema. When the schema is an object schema the records are
+    transposed into one column per property and each column is validated against its property schema in one pass
+    (integer and number columns with NumPy if it's installed). Other schemas validate the records one by one.
+    :param schema: Schema object.
+    :param documents: List of documents.
+    :param batch_size: Number of records transposed at once.
+    :return: BatchResponse object. The error of each invalid document is the one `schema.validate` returns.
+    """
+
+    start = time.perf_counter()
+    valid = [True] * len(documents)
+    errors = {}
+    if is_columnar(schema):
+        for offset in range(0, len(documents), batch_size):
+            chunk = documents[offset:offset + batch_size]
+            for i in get_invalid_records(schema, chunk):
+                errors[offset + i] = schema.validate_node(chunk[i])
+    else:
+        for i, document in enumerate(documents):
+            response = schema.validate_node(document)
+            if not response.is_valid:
+                errors[i] = response
+    for i in errors:
+        valid[i] = False
+    if METRICS.enabled and documents:
+        elapsed = (time.perf_counter() - start) / len(documents)
+        valid_response = Response(True, None, None)
+        for i in range(len(documents)):
+            METRICS.record_validation(schema, errors.get(i, valid_response), elapsed)
+    return BatchResponse(valid, errors)
+
+
+def get_invalid_records(schema, records):
+    """
+    Finds the records that are not valid against an object schema, keyword by keyword and property by property.
+    :param schema: ObjectSchema object without enum nor anyOf, allOf, oneOf or not.
+    :param records: List of documents.
+    :return: Set of the indexes of the invalid records.
+    """
+
+    invalid = {i for i, record in enumerate(records) if not isinstance(record, dict)}
+    alive = [i for i in range(len(records)) if i not in invalid]
+    for key in schema.required:
+        alive = remove_invalid([i for i in alive if key not in records[i]], alive, invalid)
+    for key, property_schema in schema.properties.items():
+        rows = [i for i in alive if key in records[i]]
+        column = [records[i][key] for i in rows]
+        alive = remove_invalid([i for i, is_valid in zip(rows, validate_column(property_schema, column))
+                                if not is_valid], alive, invalid)
+    if schema.minProperties is not None:
+        alive = remove_invalid([i for i in alive if len(records[i]) < schema.minProperties], alive, invalid)
+    if schema.maxProperties is not None:
+        alive = remove_invalid([i for i in alive if len(records[i]) > schema.maxProperties], alive, invalid)
+    if schema.property_dependencies or schema.schema_dependencies:
+        alive = remove_invalid([i for i in alive if not schema.validate_dependencies(records[i]).is_valid], alive,
+                               invalid)
+    if schema.additionalProperties is not True and not is_trivial(schema.additionalProperties):
+        alive = remove_invalid([i for i in alive if not records[i].keys() <= schema.declared_keys and
+                                not schema.validate_additional_properties(records[i]).is_valid], alive, invalid)
+    if schema.patternProperties:
+        remove_invalid([i for i in alive if not schema.validate_pattern_properties(records[i]).is_valid], alive,
+                       invalid)
+    return invalid
+
+
+def remove_invalid(failed, alive, invalid):
+    """
+    :param failed: List of the indexes that failed a check.
+    :param alive: List of the indexes that passed every check so far.
+    :param invalid: Set of the invalid indexes, `failed` is added to it.
+    :return: List of the indexes of `alive` that are not in `failed`.
+    """
+
+    if not failed:
+        return alive
+    invalid.update(failed)
+    return [i for i in alive if i not in invalid]
+
+
+def validate_column(schema, values):
+    """
+    Validates the values of a property of many records.
+    :param schema: Schema object of the property.
+    :param values: List of values.
+    :return: List of bools, True for the valid values.
+    """
+
+    plain = is_plain(schema, enum=True)
+    if plain and type(schema) is StringSchema and schema.pattern is None:
+        return validate_string_column(schema, values)
+    if plain and not schema.has_enum():
+        if type(schema) is IntegerSchema or type(schema) is NumberSchema:
+            invalid = get_invalid_numbers(schema, type(schema) is IntegerSchema, values)
+            if invalid is not None:
+                return (~invalid).tolist()
+        elif type(schema) is Schema:
+            return [True] * len(values)
+    return [schema.validate_node(value).is_valid for value in values]
+
+
+def validate_string_column(schema, values):
+    """
+    Validates values against a string schema with no pattern, checking the type, enum, minLength, maxLength and format
+    of every value at once.
+    :param schema: StringSchema object without pattern, anyOf, allOf, oneOf or not.
+    :param values: List of values.
+    :return: List of bools, True for the valid values.
+    """
+
+    valid = [isinstance(value, str) for value in values]
+    if schema.has_enum():
+        strings = {item for item in schema.enum if isinstance(item, str)}
+        valid = [is_valid and value in strings for is_valid, value in zip(valid, values)]
+    if schema.minLength is not None or schema.maxLength is not None:
+        minimum = schema.minLength if schema.minLength is not None else 0
+        maximum = schema.maxLength if schema.maxLength is not None else float("inf")
+        valid = [is_valid and minimum <= len(value) <= maximum for is_valid, value in zip(valid, values)]
+    if schema.format_checker is not None:
+        checker = schema.format_checker
+        valid = [is_valid and checker(value) for is_valid, value in zip(valid, values)]
+    return valid
+
+
+def is_columnar(schema):
+    """
+    :param schema: Schema object.
+    :return: True if the schema can validate a batch column by column: an object schema whose only keywords are
+    object keywords.
+    """
+
+    return isinstance(schema, Schema) and is_plain(schema) and type(schema) is ObjectSchema
+
+
+def is_plain(schema, enum=False):
+    """
+    :param schema: Schema object.
+    :param enum: Whether the schema may have an enum.
+    :return: True if the schema has no anyOf, allOf, oneOf or not (nor enum, unless `enum` is True).
+    """
+
+    return (enum or not schema.has_enum()) and not schema.has_any_of() and not schema.has_all_of() and \
+        not schema.has_one_of() and not schema.has_not()
+
+
+def is_trivial(schema):
+    """
+    :param schema: Schema object or bool.
+    :return: True if it's a schema that every document is valid against, like the default additionalProperties.
+    """
+
+    return isinstance(schema, Schema) and is_plain(schema) and type(schema) is Schema
+
@@ -0,0 +1,64 @@
+'''
+Module providing the limits of the work a single validation can do.
+'''
+from .utils import Response
+
+
+CLOCK_INTERVAL = 64
+"""Number of nodes visited between two readings of the clock."""
+
+LIMITS = ["seconds", "nodes", "depth", "string_bytes"]
+"""Names of the limits of a budget."""
+
+
+class Budget:
+    """
+    Limits of a validation, so a hostile document (huge arrays, long strings, wide oneOf...) can't keep a worker busy:
+
+        response = schema.validate(document, budget=Budget(seconds=0.05, nodes=100000, depth=64))
+
+    A node is a value of the document checked against a schema object, so a value that's validated against several
+    schemas (anyOf, allOf...) counts once for each. Limits that are None are not checked. A budget holds no state, so
+    the same one can be used by many validations at the same time.
+    """
+
+    def __init__(self, seconds=None, nodes=None, depth=None, string_bytes=None):
+        """
+        :param seconds: Wall time the validation can take (checked every `CLOCK_INTERVAL` nodes).
+        :param nodes: Number of nodes the validation can visit.
+        :param depth: Depth of the deepest node of the document the validation can visit (the root has depth 0).
+        :param string_bytes: Number of bytes (in UTF-8) of the strings the validation can visit.
+        :return: None.
+        """
+
+        self.seconds = seconds
+        self.nodes = nodes
+        self.depth = depth
+        self.string_bytes = string_bytes
+
+    def __repr__(self):
+        limits = ", ".join("{}={!r}".format(name, getattr(self, name)) for name in LIMITS
+                           if getattr(self, name) is not None)
+        return "Budget({})".format(limits)
+
+
+class BudgetExceededResponse(Response):
+    """
+    Response of a validation that was stopped because it exceeded its budget. It's not valid, but the document may be:
+    it was not validated completely. Its pointers point to the document node and the schema node the validation was
+    going to visit.
+    """
+
+    def __init__(self, limit, document_pointer, schema_pointer):
+        """
+        :param limit: Name of the limit that was exceeded ("seconds", "nodes", "depth" or "string_bytes").
+        :param document_pointer: JSONPointer to the node of the document.
+        :param schema_pointer: JSONPointer to the node of the schema.
+        """
+
+        super().__init__(False, document_pointer, schema_pointer)
+        self.limit = limit
+
+    def __repr__(self):
+        return "Budget exceeded (" + self.limit + ") on: " + str(self.document_pointer.nodes) + \
+               "\nOn Schema: " + str(self.schema_pointer.nodes)
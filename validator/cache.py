@@ -0,0 +1,158 @@
+'''
+Module providing an opt-in on-disk cache of compiled schemas.
+'''
+import os
+import pickle
+import threading
+from . import __version__
+from .classes import get_schema, get_registry
+from .formats import get_formats_signature
+from .refs import get_external_references
+from .utils import get_json_hash, get_json_from_file, is_valid_url
+
+
+class SchemaCache:
+    """
+    Cache that stores compiled schema objects in a directory, so a new process can load them instead of building
+    them again with `get_schema` (meta schema validation, reference checks and the construction of every node).
+
+    Entries are keyed by the hash of the schema (the hash of its content for dicts, the hash of the file for
+    `self.get_schema_from_file`), the version of the library and the registered formats, since string schemas keep the
+    checker of their format. Each entry also records the files the schema references with their hashes and is
+    discarded if any of them changed (remote schemas are identified by their url). Entries are pickled, so the
+    directory must only be writable by trusted users.
+    """
+
+    EXTENSION = ".schema.pickle"
+
+    def __init__(self, directory):
+        """
+        :param directory: Path of the cache directory. It's created if it does not exist.
+        :return: None.
+        """
+
+        self.directory = directory
+        os.makedirs(directory, exist_ok=True)
+
+    def get_schema(self, json_schema):
+        """
+        Returns the schema object corresponding to a dict, loading it from the cache if it's there and building it
+        (and storing it) otherwise.
+        :param json_schema: Dict object.
+        :return: Schema object.
+        """
+
+        key = get_json_hash([__version__, "dict", get_json_hash(json_schema), get_formats_signature()])
+        schema = self.load(key)
+        if schema is None:
+            schema = get_schema(json_schema)
+            self.store(key, schema, json_schema)
+        return schema
+
+    def get_schema_from_file(self, file):
+        """
+        Same as `self.get_schema` but the schema is read from the local file system. A cached schema is loaded
+        without parsing the file.
+        :param file: path to the schema.
+        :return: Schema object.
+        """
+
+        key = get_json_hash([__version__, "file", get_file_hash(file), get_formats_signature()])
+        schema = self.load(key)
+        if schema is None:
+            json_schema = get_json_from_file(file)
+            schema = get_schema(json_schema)
+            self.store(key, schema, json_schema)
+        return schema
+
+    def get_path(self, key):
+        return os.path.join(self.directory, key + SchemaCache.EXTENSION)
+
+    def load(self, key):
+        """
+        :param key: Key of a cache entry.
+        :return: The cached schema object, or None if it's not in the cache, it was stored by another version or a
+        file it references changed.
+        """
+
+        try:
+            with open(self.get_path(key), "rb") as f:
+                version, stored_key, dependencies, schema = pickle.load(f)
+        except (OSError, EOFError, pickle.UnpicklingError, AttributeError, ImportError, ValueError, TypeError):
+            return None
+        if version != __version__ or stored_key != key:
+            return None
+        changed = [reference for reference, file_hash in dependencies
+                   if file_hash is not None and get_file_hash(reference) != file_hash]
+        for reference in changed:
+            # The default registry still holds the previous version, which the schema would be built with again.
+            get_registry().remove(reference)
+        return None if changed else schema
+
+    def store(self, key, schema, json_schema):
+        """
+        Stores a schema object. The entry is written to a temporary file that then replaces the entry, so readers
+        never see a partial entry.
+        :param key: Key of the cache entry.
+        :param schema: Schema object.
+        :param json_schema: Dict the schema object was built from.
+        :return: True if the schema could be stored.
+        """
+
+        dependencies = []
+        for reference in sorted(get_dependencies(json_schema)):
+            dependencies.append((reference, None if is_valid_url(reference) else get_file_hash(reference)))
+        path = self.get_path(key)
+        temporary_path = "{}.{}.{}.tmp".format(path, os.getpid(), threading.get_ident())
+        try:
+            with open(temporary_path, "wb") as f:
+                pickle.dump((__version__, key, dependencies, schema), f, protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(temporary_path, path)
+        except (OSError, pickle.PicklingError, RecursionError, AttributeError, TypeError):
+            # Local functions and lambdas, like format checkers, raise AttributeError or TypeError.
+            if os.path.exists(temporary_path):
+                os.remove(temporary_path)
+            return False
+        return True
+
+    def clear(self):
+        """
+        Removes every entry of the cache.
+        """
+
+        for name in os.listdir(self.directory):
+            if name.endswith(SchemaCache.EXTENSION):
+                os.remove(os.path.join(self.directory, name))
+
+
+def get_dependencies(json_schema):
+    """
+    Returns every $ref of a schema that points to a file or a url, and the ones of the files it references.
+    :param json_schema: Dict object.
+    :return: Set of strings.
+    """
+
+    dependencies = set()
+    pending = [json_schema]
+    while pending:
+        for reference in get_external_references(pending.pop()):
+            if reference not in dependencies:
+                dependencies.add(reference)
+                if not is_valid_url(reference) and os.path.isfile(reference):
+                    pending.append(get_json_from_file(reference))
+    return dependencies
+
+
+def get_file_hash(path):
+    """
+    :param path: Path of a file.
+    :return: sha1 hash of its bytes, or an empty string if it can't be read.
+    """
+
+    import hashlib
+
+    try:
+        with open(path, "rb") as f:
+            return hashlib.sha1(f.read()).hexdigest()
+    except OSError:
+        return ""
@@ -1,8 +1,13 @@
-from .utils import *
-from .exceptions import *
+from .utils import JSONPointer, Response, NONE, has_key, check_pattern, get_size_of_smaller, \
+    find_repeated_item, get_json_from_file, get_json_from_url, equals, FrozenList, FrozenDict, SchemaSource
+from .exceptions import InvalidSchemaException, CircularSchemaException
+from .formats import get_format_checker
+from .metrics import METRICS, get_json_label
+from .refs import ReferenceGraph
+from .vectorized import VECTORIZE_SIZE, find_invalid_number, is_ndarray
 import os
-import json
-from urllib.request import urlopen
+import threading
+import time
 
 
 PATH = os.path.dirname(os.path.abspath(__file__))
@@ -21,10 +26,49 @@ STRING_KEYWORDS = ["minLength", "maxLength", "pattern", "format"]
 NUMBER_KEYWORDS = ["multipleOf", "minimum", "maximum", "exclusiveMinimum", "exclusiveMaximum"]
 """Number schema keywords."""
 
+META_SCHEMA = None
+"""Meta schema object (see `get_meta_schema`)."""
+
+BUILD_LOCK = threading.RLock()
+"""Lock held while a LazySchema builds itself (or the meta schema is built), so a schema shared between threads is
+built only once."""
+
+SOURCE_ATTRIBUTES = ["dict_schema", "whole_schema"]
+"""Attributes that hold the dicts a schema was built from. They belong to the caller, so they are not frozen."""
+
+EMPTY_LIST = FrozenList()
+EMPTY_DICT = FrozenDict()
+"""Empty containers shared by every frozen schema."""
+
+
+class Definitions(dict):
+    """
+    Dict where each reference path holds the schema object that was built for it. Every schema object of a build
+    shares the same one, so it also holds the options of the build.
+    """
+
+    def __init__(self, registry=None, lazy=False):
+        """
+        :param registry: SchemaRegistry object used to resolve references to other files or urls. If it's None the
+        default registry is used.
+        :param lazy: If it's True subschemas are built the first time they are used (see `LazySchema`).
+        :return: None.
+        """
+
+        super().__init__()
+        self.registry = registry
+        self.lazy = lazy
+
+    def get_registry(self):
+        return get_registry(self.registry)
+
 
 class Schema:
     """
     Base class for all schemas.
+
+    Schema objects are immutable once they are built (see `freeze_schema`), so one schema can validate documents from
+    many threads at the same time.
     """
 
     COUNT = 0
@@ -55,7 +99,8 @@ class Schema:
         self.oneOf = []
         self._not = None
         if not self.path_is_empty():
-            self.definitions[self.path] = self
+            # A LazySchema that was registered for this path becomes this schema, so it's kept.
+            self.definitions.setdefault(self.path, self)
         if has_key(json_schema, "type"):
             self.type = json_schema['type']
         if has_key(json_schema, "enum"):
@@ -69,6 +114,11 @@ class Schema:
         if has_key(json_schema, "not"):
             self.__build_not(json_schema["not"])
 
+    def __setattr__(self, name, value):
+        if "frozen" in self.__dict__:
+            raise AttributeError("Schema objects can't be modified after they are built.")
+        object.__setattr__(self, name, value)
+
     def path_is_empty(self):
         """
         Checks if this schema's path is an empty string. It also checks if this schema does not come from a reference.
@@ -92,36 +142,18 @@ class Schema:
         if has_key(self.definitions, reference):
             return self.definitions[reference]
         elif JSONPointer.is_json_pointer(reference):
-            return self.build_child_schema(JSONPointer(self.whole_schema, reference).get_json(), path=reference)
-        elif is_valid_url(reference):
-            return get_schema_from_url(reference)
+            # Every reference to the same pointer shares one schema object, so recursive schemas are finite graphs.
+            path = JSONPointer.normalize(reference)
+            if has_key(self.definitions, path):
+                return self.definitions[path]
+            return self.build_child_schema(JSONPointer(self.whole_schema, reference).get_json(), path=path)
         else:
-            return get_schema_from_file(reference)
+            return self.definitions.get_registry().get_schema_from_reference(reference)
 
     def __build_child_schema_normally(self, child_schema, path=""):
-        if "type" in child_schema:
-            schema_type = child_schema["type"]
-            if isinstance(schema_type, str):
-                if schema_type == "object":
-                    return ObjectSchema(child_schema, self.whole_schema, self.definitions, path)
-                elif schema_type == "array":
-                    return ArraySchema(child_schema, self.whole_schema, self.definitions, path)
-                elif schema_type == "string":
-                    return StringSchema(child_schema, self.whole_schema, self.definitions, path)
-                elif schema_type == "number":
-                    return NumberSchema(child_schema, self.whole_schema, self.definitions, path)
-                elif schema_type == "integer":
-                    return IntegerSchema(child_schema, self.whole_schema, self.definitions, path)
-                elif schema_type == "boolean":
-                    return BooleanSchema(child_schema, self.whole_schema, self.definitions, path)
-                elif schema_type == "null":
-                    return NullSchema(child_schema, self.whole_schema, self.definitions, path)
-                else:
-                    return Schema(child_schema, self.whole_schema, self.definitions, path)
-            else:
-                return MultipleSchema(child_schema, self.whole_schema, self.definitions, path)
-        else:
-            return MultipleSchema(child_schema, self.whole_schema, self.definitions, path)
+        if self.definitions.lazy:
+            return LazySchema(child_schema, self.whole_schema, self.definitions, path)
+        return build_schema_object(child_schema, self.whole_schema, self.definitions, path)
 
     def __build_any_of(self, any_of):
         for json_schema in any_of:
@@ -134,9 +166,105 @@ class Schema:
     def __build_not(self, not_this):
         self._not = self.build_child_schema(not_this)
 
-    def validate(self, document):
+    def get_children(self):
         """
-        Validates a document against this schema.
+        Returns the schemas that this schema validates its document (or parts of it) against.
+        :return: List of tuples whose first element is the list of nodes from this schema to the child and whose second
+        element is the child schema object.
+        """
+
+        children = []
+        for keyword in ["anyOf", "allOf", "oneOf"]:
+            for i, schema in enumerate(getattr(self, keyword)):
+                children.append(([keyword, i], schema))
+        if self._not is not None:
+            children.append((["not"], self._not))
+        return children
+
+    def validate(self, document, iterative=False, budget=None):
+        """
+        Validates a document against this schema and records the validation in `METRICS`.
+        :param document: document to validate.
+        :param iterative: If it's True the document is validated with an explicit stack instead of recursion (see
+        `validator.iterative`), so it can be nested as deep as it wants.
+        :param budget: Budget object that limits the validation (see `validator.budget`). Validations with a budget are
+        iterative.
+        :return: Response object with pointers to the document and corresponding schema that failed (if it fails). If
+        the validation exceeds its budget it's a BudgetExceededResponse.
+        """
+
+        if not METRICS.enabled:
+            return self.__validate_document(document, iterative, budget)
+        start = time.perf_counter()
+        response = self.__validate_document(document, iterative, budget)
+        METRICS.record_validation(self, response, time.perf_counter() - start)
+        return response
+
+    def __validate_document(self, document, iterative, budget):
+        if iterative or budget is not None:
+            from .iterative import validate_iteratively
+
+            return validate_iteratively(self, document, budget)
+        return self.validate_node(document)
+
+    def validate_batch(self, documents):
+        """
+        Validates a list of documents (object schemas validate them column by column, see `validator.batch`).
+        :param documents: List of documents.
+        :return: BatchResponse object with the validity of each document and the Response of the invalid ones.
+        """
+
+        from .batch import validate_batch
+
+        return validate_batch(self, documents)
+
+    def revalidate(self, document, patch, in_place=False):
+        """
+        Applies a JSON Patch to a document that's valid against this schema and validates the new document checking
+        only what the patch changed: the new values and the keywords of the containers on their way (see
+        `validator.revalidation`). The validation is recorded in `METRICS` like the ones of `self.validate`.
+        :param document: Document that's valid against this schema (if it's not, the result is undefined).
+        :param patch: List of JSON Patch (RFC 6902) operations.
+        :param in_place: If it's True the document is modified instead of copied. Otherwise the containers on the
+        paths of the operations are copied and the rest is shared with the new document.
+        :return: Tuple (new document, Response object).
+        """
+
+        from .revalidation import revalidate
+
+        if not METRICS.enabled:
+            return revalidate(self, document, patch, in_place)
+        start = time.perf_counter()
+        document, response = revalidate(self, document, patch, in_place)
+        METRICS.record_validation(self, response, time.perf_counter() - start)
+        return document, response
+
+    def validate_at(self, pointer, value):
+        """
+        Validates a value against the subschemas that govern a location of the documents of this schema, without the
+        rest of the document (see `validator.locations`). The subschemas of each pointer are found once and kept, so
+        repeated pointers are resolved with a dict lookup. The validation is recorded in `METRICS` like the ones of
+        `self.validate`.
+        :param pointer: JSON Pointer string of the location, of RFC 6901 ("/orders/0/customer") or a URI fragment
+        ("#/orders/0/customer").
+        :param value: Json value at the location.
+        :return: Response object. Its document pointer holds the nodes from the root of the document.
+        :raise ValueError: If the pointer is not a JSON Pointer, or it ends in "-" under a list of items.
+        """
+
+        from .locations import validate_at
+
+        if not METRICS.enabled:
+            return validate_at(self, pointer, value)
+        start = time.perf_counter()
+        response = validate_at(self, pointer, value)
+        METRICS.record_validation(self, response, time.perf_counter() - start)
+        return response
+
+    def validate_node(self, document):
+        """
+        Validates a document against this schema. Schemas validate their children through this method, so unlike
+        `self.validate` it does not record anything.
         :param document: document to validate.
         :return: Response object with pointers to the document and corresponding schema that failed (if it fails).
         """
@@ -268,7 +396,7 @@ class Schema:
         """
 
         if self._not is not None:
-            validate_not = self._not.validate(document)
+            validate_not = self._not.validate_node(document)
             if not validate_not.is_valid:
                 return Response(True, None, None)
             else:
@@ -358,6 +486,20 @@ class ObjectSchema(Schema):
         if has_key(json_schema, "patternProperties"):
             self.__build_pattern_properties(json_schema["patternProperties"])
 
+        self.required_keys = frozenset(self.required)
+        """Frozenset of the required keys, so a document is checked against all of them at once."""
+
+        self.declared_keys = frozenset(self.properties).union(self.required)
+        """Frozenset of the keys that are not additional properties (besides the ones that match a pattern)."""
+
+        self.property_order = {key: i for i, key in enumerate(self.properties)}
+        """Dict where each key of `self.properties` holds its position, so properties can be validated in the order of
+        the document and still report the same failure."""
+
+        self.property_dependency_keys = {key: frozenset(dependencies)
+                                         for key, dependencies in self.property_dependencies.items()}
+        """Dict where each key of `self.property_dependencies` holds the frozenset of its dependencies."""
+
     def __build_additional_properties(self, additional_properties):
         if isinstance(additional_properties, bool):
             self.additionalProperties = additional_properties
@@ -379,14 +521,31 @@ class ObjectSchema(Schema):
         for key, child_schema in patter_properties.items():
             self.patternProperties[key] = self.build_child_schema(child_schema)
 
-    def validate(self, document):
+    def get_children(self):
+        """
+        Returns the schemas that this schema validates its document (or parts of it) against.
+        :return: List of tuples (nodes, schema object).
+        """
+
+        children = super().get_children()
+        for key, schema in self.properties.items():
+            children.append((["properties", key], schema))
+        for key, schema in self.patternProperties.items():
+            children.append((["patternProperties", key], schema))
+        for key, schema in self.schema_dependencies.items():
+            children.append((["dependencies", key], schema))
+        if isinstance(self.additionalProperties, Schema):
+            children.append((["additionalProperties"], self.additionalProperties))
+        return children
+
+    def validate_node(self, document):
         """
         Validates a document against this schema.
         :param document: document to validate.
         :return: Response object with pointers to the document and corresponding schema that failed (if it fails).
         """
 
-        super_validate = super().validate(document)
+        super_validate = super().validate_node(document)
         if not super_validate.is_valid:
             return super_validate
         validate_type = self.validate_type(document)
@@ -434,15 +593,42 @@ class ObjectSchema(Schema):
         :return: Response object with pointers to the document and corresponding schema that failed (if it fails).
         """
 
+        if len(document) < len(self.properties):
+            return self.__validate_document_properties(document)
         for key, schema in self.properties.items():
             if has_key(document, key):
-                validate_property = schema.validate(document[key])
+                validate_property = schema.validate_node(document[key])
                 if not validate_property.is_valid:
                     validate_property.set_document(document)
                     validate_property.add_upward_document_and_schema_nodes([key], self.build_nodes(["properties", key]))
                     return validate_property
         return Response(True, None, None)
 
+    def __validate_document_properties(self, document):
+        """
+        Validates a document this schema's properties keyword going through the keys of the document, which are fewer
+        than the properties. If many properties fail, the one that's declared first is reported.
+        :param document: document to validate.
+        :return: Response object with pointers to the document and corresponding schema that failed (if it fails).
+        """
+
+        failed_key = None
+        failed_response = None
+        for key in document:
+            schema = self.properties.get(key)
+            if schema is None or (failed_key is not None and self.property_order[key] > self.property_order[failed_key]):
+                continue
+            validate_property = schema.validate_node(document[key])
+            if not validate_property.is_valid:
+                failed_key = key
+                failed_response = validate_property
+        if failed_response is None:
+            return Response(True, None, None)
+        failed_response.set_document(document)
+        failed_response.add_upward_document_and_schema_nodes([failed_key], self.build_nodes(["properties",
+                                                                                             failed_key]))
+        return failed_response
+
     def validate_required_properties(self, document):
         """
         Validates a document this schema's required keyword.
@@ -450,6 +636,8 @@ class ObjectSchema(Schema):
         :return: Response object with pointers to the document and corresponding schema that failed (if it fails).
         """
 
+        if self.required_keys <= document.keys():
+            return Response(True, None, None)
         for key in self.required:
             if not has_key(document, key):
                 return Response(False, JSONPointer(document, []), JSONPointer(self.whole_schema,
@@ -502,8 +690,8 @@ class ObjectSchema(Schema):
         :return: Response object with pointers to the document and corresponding schema that failed (if it fails).
         """
 
-        for key, list_of_dependencies in self.property_dependencies.items():
-            if has_key(document, key) and not has_all_keys(document, list_of_dependencies):
+        for key, dependencies in self.property_dependency_keys.items():
+            if has_key(document, key) and not dependencies <= document.keys():
                 return Response(False, JSONPointer(document, [key]), JSONPointer(self.whole_schema,
                                                                                  self.build_nodes(["dependencies",
                                                                                                    key])))
@@ -518,7 +706,7 @@ class ObjectSchema(Schema):
 
         for key, schema in self.schema_dependencies.items():
             if has_key(document, key):
-                validate_dependency = schema.validate(document)
+                validate_dependency = schema.validate_node(document)
                 if not validate_dependency.is_valid:
                     validate_dependency.set_document(document)
                     validate_dependency.add_upward_document_and_schema_nodes([key], self.build_nodes(["dependencies",
@@ -549,7 +737,7 @@ class ObjectSchema(Schema):
             if self.key_is_pattern_property(key):
                 for pattern in self.get_key_patterns(key):
                     patter_schema = self.patternProperties[pattern]
-                    validate = patter_schema.validate(document[key])
+                    validate = patter_schema.validate_node(document[key])
                     if not validate:
                         validate.add_upward_document_and_schema_nodes([key], ["patternProperties",
                                                                               pattern])
@@ -563,7 +751,7 @@ class ObjectSchema(Schema):
         :return: Response object with pointers to the document and corresponding schema that failed (if it fails).
         """
 
-        if not self.additionalProperties:
+        if not self.additionalProperties and not document.keys() <= self.declared_keys:
             for key in document:
                 if self.key_is_additional_property(key):
                     return Response(False, JSONPointer(document, [key]), JSONPointer(self.whole_schema,
@@ -577,8 +765,7 @@ class ObjectSchema(Schema):
         :param key:
         :return: bool.
         """
-        if (key not in self.properties) and (key not in self.required) and \
-                not self.key_is_pattern_property(key):
+        if key not in self.declared_keys and not self.key_is_pattern_property(key):
             return True
         return False
 
@@ -613,9 +800,11 @@ class ObjectSchema(Schema):
         :return: Response object with pointers to the document and corresponding schema that failed (if it fails).
         """
 
+        if document.keys() <= self.declared_keys:
+            return Response(True, None, None)
         for key in document:
             if self.key_is_additional_property(key):
-                validate_additional_key = self.additionalProperties.validate(document[key])
+                validate_additional_key = self.additionalProperties.validate_node(document[key])
                 if not validate_additional_key:
                     validate_additional_key.set_document(document)
                     validate_additional_key.add_upward_document_and_schema_nodes([key],
@@ -671,14 +860,33 @@ class ArraySchema(Schema):
         else:
             self.additionalItems = self.build_child_schema(additionalItems)
 
-    def validate(self, document):
+    def get_children(self):
+        """
+        Returns the schemas that this schema validates its document (or parts of it) against.
+        :return: List of tuples (nodes, schema object).
+        """
+
+        children = super().get_children()
+        if isinstance(self.items, list):
+            for i, schema in enumerate(self.items):
+                children.append((["items", i], schema))
+        else:
+            children.append((["items"], self.items))
+        if isinstance(self.additionalItems, Schema):
+            children.append((["additionalItems"], self.additionalItems))
+        return children
+
+    def validate_node(self, document):
         """
         Validates a document against this schema.
         :param document: document to validate.
         :return: Response object with pointers to the document and corresponding schema that failed (if it fails).
         """
 
-        validate_super = super().validate(document)
+        if type(document) is not list and is_ndarray(document) and not self.__accepts_ndarray(document):
+            # NumPy arrays that can't be checked at once are validated as lists of python numbers.
+            return self.validate_node(document.tolist())
+        validate_super = super().validate_node(document)
         if not validate_super.is_valid:
             return validate_super
         validate_type = self.validate_type(document)
@@ -708,7 +916,7 @@ class ArraySchema(Schema):
         :return: Response object with pointers to the document and corresponding schema that failed (if it fails).
         """
 
-        if not isinstance(document, list):
+        if not isinstance(document, list) and not is_ndarray(document):
             return Response(False, JSONPointer(document, []), JSONPointer(self.whole_schema,
                                                                           self.build_nodes(["type"])))
         return Response(True, None, None)
@@ -733,7 +941,7 @@ class ArraySchema(Schema):
         """
 
         for i in range(0, get_size_of_smaller(document, self.items)):
-            validate_item = self.items[i].validate(document[i])
+            validate_item = self.items[i].validate_node(document[i])
             if not validate_item.is_valid:
                 validate_item.set_document(document)
                 validate_item.add_upward_document_and_schema_nodes([i], self.build_nodes(["items", i]))
@@ -747,14 +955,54 @@ class ArraySchema(Schema):
         :return: Response object with pointers to the document and corresponding schema that failed (if it fails).
         """
 
-        for i in range(0, len(document)):
-            validate_element = self.items.validate(document[i])
+        start = 0
+        if type(document) is not list or len(document) >= VECTORIZE_SIZE:
+            start = self.__find_invalid_number(document)
+            if start == NONE:
+                return Response(True, None, None)
+        values = document if type(document) is list else document.tolist()
+        for i in range(start, len(values)):
+            validate_element = self.items.validate_node(values[i])
             if not validate_element.is_valid:
                 validate_element.set_document(document)
                 validate_element.add_upward_document_and_schema_nodes([i], self.build_nodes(["items"]))
                 return validate_element
         return Response(True, None, None)
 
+    def __find_invalid_number(self, document):
+        """
+        Checks every item of a large array at once with NumPy when `self.items` is a plain integer or number schema.
+        :param document: List or NumPy array.
+        :return: Index of the first invalid item (the pure Python path builds its response), `NONE` if every item is
+        valid or 0 if the array has to be checked item by item.
+        """
+
+        if not self.__has_number_items():
+            return 0
+        index = find_invalid_number(self.items, type(self.items) is IntegerSchema, document)
+        return 0 if index is None else index
+
+    def __has_number_items(self):
+        """
+        :return: True if `self.items` is an integer or number schema whose only keywords are numeric.
+        """
+
+        items = self.items
+        if isinstance(items, list) or items.has_enum() or items.has_any_of() or items.has_all_of() or \
+                items.has_one_of() or items.has_not():
+            return False
+        return type(items) is IntegerSchema or type(items) is NumberSchema
+
+    def __accepts_ndarray(self, document):
+        """
+        :param document: NumPy array.
+        :return: True if this schema can validate the array as it is: a one dimensional array of numbers against an
+        integer or number items schema and no keyword that compares whole arrays.
+        """
+
+        return document.ndim == 1 and not self.uniqueItems and not self.has_enum() and not self.has_any_of() and \
+            not self.has_all_of() and not self.has_one_of() and not self.has_not() and self.__has_number_items()
+
     def validate_additional_items(self, document):
         """
         Validates a document against this schema's additionalItems keyword.
@@ -776,7 +1024,7 @@ class ArraySchema(Schema):
     def __validate_additional_items_schema(self, document):
         additional_items = self.get_additional_items(document)
         for additional_item in additional_items:
-            validate_additional_item = self.additionalItems.validate(additional_item)
+            validate_additional_item = self.additionalItems.validate_node(additional_item)
             if not validate_additional_item:
                 validate_additional_item.add_upward_document_and_schema_nodes([document.index(additional_item)], ["additionalItems"])
                 return validate_additional_item
@@ -910,14 +1158,14 @@ class IntegerSchema(Schema):
         if has_key(json_schema, "exclusiveMaximum"):
             self.exclusiveMaximum = json_schema["exclusiveMaximum"]
 
-    def validate(self, document):
+    def validate_node(self, document):
         """
         Validates a document against this schema.
         :param document: document to validate.
         :return: Response object with pointers to the document and corresponding schema that failed (if it fails).
         """
 
-        super_validate = super().validate(document)
+        super_validate = super().validate_node(document)
         if not super_validate.is_valid:
             return super_validate
         validate_type = self.validate_type(document)
@@ -1024,6 +1272,9 @@ class StringSchema(Schema):
         self.minLength = None
         self.maxLength = None
         self.pattern = None
+        self.format = None
+        self.format_checker = None
+        """Function that checks the format (see `validator.formats`), or None if the format is not registered."""
 
         if has_key(json_schema, "minLength"):
             self.minLength = (json_schema["minLength"])
@@ -1031,15 +1282,18 @@ class StringSchema(Schema):
             self.maxLength = json_schema["maxLength"]
         if has_key(json_schema, "pattern"):
             self.pattern = json_schema["pattern"]
+        if has_key(json_schema, "format"):
+            self.format = json_schema["format"]
+            self.format_checker = get_format_checker(self.format)
 
-    def validate(self, document):
+    def validate_node(self, document):
         """
         Validates a document against this schema.
         :param document: document to validate.
         :return: Response object with pointers to the document and corresponding schema that failed (if it fails).
         """
 
-        super_validate = super().validate(document)
+        super_validate = super().validate_node(document)
         if not super_validate.is_valid:
             return super_validate
         validate_type = self.validate_type(document)
@@ -1054,6 +1308,9 @@ class StringSchema(Schema):
         validate_pattern=self.validate_pattern(document)
         if not validate_pattern.is_valid:
             return validate_pattern
+        validate_format = self.validate_format(document)
+        if not validate_format.is_valid:
+            return validate_format
         return Response(True, None, None)
 
     def validate_type(self, document):
@@ -1101,6 +1358,17 @@ class StringSchema(Schema):
                 return Response(False, JSONPointer(document, []), JSONPointer(self.whole_schema, self.build_nodes(["pattern"])))
         return Response(True, None, None)
 
+    def validate_format(self, document):
+        """
+        Validates a document against this schema's format keyword.
+        :param document: document to validate.
+        :return: Response object with pointers to the document and corresponding schema that failed (if it fails).
+        """
+
+        if self.format_checker is not None and not self.format_checker(document):
+            return Response(False, JSONPointer(document, []), JSONPointer(self.whole_schema, self.build_nodes(["format"])))
+        return Response(True, None, None)
+
 
 class BooleanSchema(Schema):
     """
@@ -1119,14 +1387,14 @@ class BooleanSchema(Schema):
 
         super().__init__(json_schema, whole_schema, definitions, path)
 
-    def validate(self, document):
+    def validate_node(self, document):
         """
         Validates a document against this schema.
         :param document: document to validate.
         :return: Response object with pointers to the document and corresponding schema that failed (if it fails).
         """
 
-        super_validate = super().validate(document)
+        super_validate = super().validate_node(document)
         if not super_validate.is_valid:
             return super_validate
         validate_type = self.validate_type(document)
@@ -1163,14 +1431,14 @@ class NullSchema(Schema):
 
         super().__init__(json_schema, whole_schema, definitions, path)
 
-    def validate(self, document):
+    def validate_node(self, document):
         """
         Validates a document against this schema.
         :param document: document to validate.
         :return: Response object with pointers to the document and corresponding schema that failed (if it fails).
         """
 
-        super_validate = super().validate(document)
+        super_validate = super().validate_node(document)
         if not super_validate.is_valid:
             return super_validate
         validate_type = self.validate_type(document)
@@ -1217,8 +1485,25 @@ class MultipleSchema(Schema):
             elif type == "null":
                 self.schemas[type] = NullSchema(json_schema, whole_schema, definitions, "")
 
-    def validate(self, document):
-        validate_super = super().validate(document)
+    def get_children(self):
+        """
+        Returns the schemas that this schema validates its document (or parts of it) against. The schema built for
+        each type lies in the same place as this schema, so its list of nodes is empty.
+        :return: List of tuples (nodes, schema object).
+        """
+
+        children = super().get_children()
+        for schema in self.schemas.values():
+            children.append(([], schema))
+        return children
+
+    def validate_node(self, document):
+        if type(document) is not list and is_ndarray(document) and (self.has_enum() or self.has_any_of() or
+                                                                     self.has_all_of() or self.has_one_of() or
+                                                                     self.has_not()):
+            # These keywords compare whole documents, so the NumPy array is validated as a list of python numbers.
+            document = document.tolist()
+        validate_super = super().validate_node(document)
         if not validate_super:
             return validate_super
         if isinstance(document, str):
@@ -1228,7 +1513,7 @@ class MultipleSchema(Schema):
                 else:
                     return Response(False, JSONPointer(document, []), JSONPointer(self.whole_schema, ["type"]))
             else:
-                return self.schemas["string"].validate(document)
+                return self.schemas["string"].validate_node(document)
         elif isinstance(document, bool):
             if "boolean" not in self.schemas:
                 if self.validates_any:
@@ -1245,9 +1530,9 @@ class MultipleSchema(Schema):
                     else:
                         return Response(False, JSONPointer(document, []), JSONPointer(self.whole_schema, ["type"]))
                 else:
-                    return self.schemas["number"].validate(document)
+                    return self.schemas["number"].validate_node(document)
             else:
-                return self.schemas["integer"].validate(document)
+                return self.schemas["integer"].validate_node(document)
         elif isinstance(document, dict):
             if "object" not in self.schemas:
                 if self.validates_any:
@@ -1255,20 +1540,20 @@ class MultipleSchema(Schema):
                 else:
                     return Response(False, JSONPointer(document, []), JSONPointer(self.whole_schema, ["type"]))
             else:
-                return self.schemas["object"].validate(document)
-        elif isinstance(document, list):
+                return self.schemas["object"].validate_node(document)
+        elif isinstance(document, list) or is_ndarray(document):
             if "array" not in self.schemas:
                 if self.validates_any:
                     return Response(True, None, None)
                 else:
                     return Response(False, JSONPointer(document, []), JSONPointer(self.whole_schema, ["type"]))
             else:
-                return self.schemas["array"].validate(document)
+                return self.schemas["array"].validate_node(document)
         elif isinstance(document, float):
             if "number" in self.schemas:
-                return self.schemas["number"].validate(document)
+                return self.schemas["number"].validate_node(document)
             elif "integer" in self.schemas:
-                return self.schemas["integer"].validate(document)
+                return self.schemas["integer"].validate_node(document)
             else:
                 if self.validates_any:
                     return Response(True, None, None)
@@ -1282,36 +1567,197 @@ class MultipleSchema(Schema):
                     return Response(False, JSONPointer(document, []), JSONPointer(self.whole_schema, ["type"]))
             else:
                 return Response(True, None, None)
+        elif self.validates_any:
+            return Response(True, None, None)
+        else:
+            # Documents of other python types are not any of the JSON types.
+            return Response(False, JSONPointer(document, []), JSONPointer(self.whole_schema, ["type"]))
+
+
+class LazySchema(Schema):
+    """
+    Placeholder of a subschema that's built the first time it's used. Reading any of its attributes (validating a
+    document, getting its children...) builds the real schema object and turns this object into it, so every parent
+    that holds it gets the built schema without paying anything else afterwards.
+    """
+
+    def __init__(self, json_schema, whole_schema, definitions, path):
+        """
+        Receives the same arguments as the schema object it stands for.
+        :return: None.
+        """
+
+        self.arguments = (json_schema, whole_schema, definitions, path)
+        if path != "":
+            definitions.setdefault(path, self)
+
+    def __getattribute__(self, name):
+        if name in ["arguments", "build", "__class__", "__dict__"]:
+            return object.__getattribute__(self, name)
+        # Another thread may turn this object into the built schema at any moment, and the built schema has no `build`
+        # method, so it's called through this class.
+        LazySchema.build(self)
+        return getattr(self, name)
+
+    def build(self):
+        """
+        Builds the real schema object and turns this object into it.
+        """
+
+        with BUILD_LOCK:
+            if type(self) is LazySchema:
+                json_schema, _, definitions, _ = self.arguments
+                if "$ref" in json_schema:
+                    # A reference to a document that was being built when it was found (see
+                    # `SchemaRegistry.get_schema_from_reference`).
+                    built = definitions.get_registry().get_schema_from_reference(json_schema["$ref"])
+                    if type(built) is LazySchema:
+                        LazySchema.build(built)
+                else:
+                    built = build_schema_object(*self.arguments)
+                # The class goes first: a schema built by the registry is already frozen, and so is its dict.
+                self.__class__ = type(built)
+                self.__dict__ = built.__dict__
+                freeze_schema(self)
+
+
+def freeze_schema(schema):
+    """
+    Makes a schema object and every schema object reachable from it immutable: their lists and dicts are replaced by
+    FrozenList and FrozenDict objects and setting an attribute raises AttributeError. LazySchema objects are frozen
+    when they are built.
+    :param schema: Schema object.
+    :return: `schema`.
+    """
+
+    pending = [schema]
+    while pending:
+        current = pending.pop()
+        if type(current) is LazySchema:
+            continue
+        attributes = current.__dict__
+        if "frozen" in attributes:
+            continue
+        # Replacing the value of an existing key while iterating is allowed.
+        for name, value in attributes.items():
+            value_type = type(value)
+            if value_type is list:
+                attributes[name] = FrozenList(value) if value else EMPTY_LIST
+            elif value_type is dict and name not in SOURCE_ATTRIBUTES:
+                attributes[name] = FrozenDict(value) if value else EMPTY_DICT
+        attributes["frozen"] = True
+        for _, child in current.get_children():
+            pending.append(child)
+    return schema
+
+
+def release_sources(schema, whole_schema, label):
+    """
+    Drops the dicts that the schema objects built from `whole_schema` keep (`dict_schema` and `whole_schema`), which
+    validation doesn't need. Their `whole_schema` becomes a SchemaSource, so the schema pointers of the responses can
+    still be resolved with `get_json()`. Schemas of other files or urls belong to the registry and keep theirs.
+    :param schema: Schema object that was not built lazily.
+    :param whole_schema: Whole schema dict the schema was built from.
+    :param label: Label that identifies the schema in the metrics.
+    :return: `schema`.
+    """
+
+    source = SchemaSource(whole_schema, label)
+    for _, node in walk_schema(schema):
+        # Frozen schema objects can't set attributes, but their dict can still be written.
+        if node.whole_schema is whole_schema:
+            node.__dict__.update(dict_schema=None, whole_schema=source)
+    return schema
+
+
+def build_all(schema):
+    """
+    Builds every LazySchema reachable from `schema`, so a schema built with `lazy=True` can be warmed up before it's
+    used.
+    :param schema: Schema object.
+    :return: `schema`.
+    """
+
+    for _ in walk_schema(schema):
+        pass
+    return schema
 
 
-def get_schema(json_schema, whole_schema=None):
+def get_meta_schema():
+    """
+    Returns the meta schema object that every schema is validated against. It's built the first time it's needed.
+    :return: Schema object.
+    """
+
+    global META_SCHEMA
+    if META_SCHEMA is None:
+        with BUILD_LOCK:
+            if META_SCHEMA is None:
+                meta_schema_json = get_json_from_file(PATH + os.sep + "meta_schema.json")
+                META_SCHEMA = freeze_schema(__get_corresponding_schema(meta_schema_json, meta_schema_json,
+                                                                       Definitions(), ""))
+    return META_SCHEMA
+
+
+def get_registry(registry=None):
+    """
+    :param registry: SchemaRegistry object or None.
+    :return: `registry`, or the default registry of the process if it's None.
+    """
+
+    if registry is None:
+        from .registry import REGISTRY
+        return REGISTRY
+    return registry
+
+
+def get_schema(json_schema, whole_schema=None, registry=None, lazy=False, lean=False):
     """
     This method recieves a dict object and return the corresponding schema object. If it's not a valid schema it will
     raise an exception.
     :param json_schema: Dict object.
+    :param whole_schema: The whole schema where `json_schema` comes from. If it's None `json_schema` is the whole
+    schema and it's validated against the meta schema.
+    :param registry: SchemaRegistry object that resolves the references to other files or urls (None means the default
+    registry).
+    :param lazy: If it's True subschemas are built the first time they are used (see `build_all`).
+    :param lean: If it's True the schema objects don't keep the dicts they were built from (see `release_sources`).
     :return: Schema object.
     """
 
-    if not validate_refs(json_schema, []):
-        raise CircularSchemaException()
+    if lean and lazy:
+        raise ValueError("A lean schema can't be built lazily, since its subschemas are built from its dicts.")
+    if lean:
+        schema = get_schema(json_schema, whole_schema, registry, lazy=False, lean=False)
+        return release_sources(schema, whole_schema if whole_schema is not None else json_schema,
+                               get_json_label(json_schema))
+
+    definitions = Definitions(registry, lazy)
+    graph = ReferenceGraph(json_schema, whole_schema, registry=definitions.get_registry())
+    cycles = graph.get_cycles()
+    if cycles:
+        raise CircularSchemaException("Unproductive reference cycle: " +
+                                      " -> ".join(graph.get_pointer(vertex) for vertex in cycles[0] + cycles[0][:1]))
 
     if whole_schema is None:
-        meta_schema_json = get_json_from_file(PATH + os.sep + "meta_schema.json")
-        meta_schema = __get_corresponding_schema(meta_schema_json, meta_schema_json, {}, "")
-        if not meta_schema.validate(json_schema):
+        if not get_meta_schema().validate_node(json_schema):
             raise InvalidSchemaException()
         whole_schema = json_schema
 
     if has_key(json_schema, "$ref"):
-        return __get_schema_from_ref(json_schema, whole_schema)
+        return __get_schema_from_ref(json_schema, whole_schema, definitions)
+    elif json_schema is whole_schema:
+        # The root is registered so references to "#" use it.
+        return freeze_schema(__get_corresponding_schema(json_schema, whole_schema, definitions, "#"))
     else:
-        return __get_corresponding_schema(json_schema, whole_schema, {}, "")
+        return freeze_schema(__get_corresponding_schema(json_schema, whole_schema, definitions, ""))
 
 
-def __get_schema_from_ref(json_schema, whole_schema):
+def __get_schema_from_ref(json_schema, whole_schema, definitions):
     """
-    Resolves a schema that contains a $ref.
+    Resolves a schema that contains a $ref. References to other files or urls are resolved through the registry.
     :param json_schema: JSONSchema that contains a reference.
+    :param definitions: Definitions object with the options of the build.
     :return: Schema object.
     """
 
@@ -1319,42 +1765,61 @@ def __get_schema_from_ref(json_schema, whole_schema):
     if JSONPointer.is_json_pointer(reference):
         if whole_schema is None:
             whole_schema = json_schema
-        return get_schema_from_json_pointer(JSONPointer(whole_schema, reference).get_json(), whole_schema, reference)
-    elif is_valid_url(reference):
-        return get_schema_from_url(reference)
+        return get_schema_from_json_pointer(JSONPointer(whole_schema, reference).get_json(), whole_schema,
+                                            JSONPointer.normalize(reference), definitions.registry, definitions.lazy)
     else:
-        return get_schema_from_file(reference)
+        return definitions.get_registry().get_schema_from_reference(reference)
 
 
-def get_schema_from_json_pointer(referenced, whole_schema, reference):
-    return __get_corresponding_schema(referenced, whole_schema, {}, reference)
+def get_schema_from_json_pointer(referenced, whole_schema, reference, registry=None, lazy=False):
+    return freeze_schema(__get_corresponding_schema(referenced, whole_schema, Definitions(registry, lazy), reference))
 
 
-def get_schema_from_url(url):
+def get_schema_from_url(url, registry=None, lazy=False, lean=False):
     """
     Opens a connection to the url and retrieves the schema object that's in it.
     :param url: url pointing a schema.
+    :param registry: SchemaRegistry object that resolves the references of the schema.
+    :param lazy: If it's True subschemas are built the first time they are used.
+    :param lean: If it's True the schema objects don't keep the dicts they were built from.
+    :return: Schema object.
+    """
+
+    from urllib.parse import urlparse
+
+    return get_schema_from_document(get_json_from_url(url), urlparse(url).fragment, registry, lazy, lean)
+
+
+def get_schema_from_document(document, fragment, registry=None, lazy=False, lean=False):
+    """
+    Retrieves the schema object of the part of a document a fragment points to.
+    :param document: Dict of a whole schema document.
+    :param fragment: Fragment of the url of the document, without "#".
+    :param registry: SchemaRegistry object that resolves the references of the schema.
+    :param lazy: If it's True subschemas are built the first time they are used.
+    :param lean: If it's True the schema objects don't keep the dicts they were built from.
     :return: Schema object.
     """
 
-    fragment = "#" + urlparse(url).fragment
-    f = urlopen(url)
-    json_string = f.read().decode("utf-8").replace("\n", "").replace("\t", "")
-    schema = json.loads(json_string)
+    fragment = "#" + fragment
     if JSONPointer.is_json_pointer(fragment):
-        return get_schema(JSONPointer(schema, fragment).get_json(), whole_schema=schema)
+        return get_schema(JSONPointer(document, fragment).get_json(), whole_schema=document, registry=registry,
+                          lazy=lazy, lean=lean)
     else:
         # TODO: Fragments that are not JSONPointers
-        return get_schema(schema)
+        return get_schema(document, registry=registry, lazy=lazy, lean=lean)
 
 
-def get_schema_from_file(file):
+def get_schema_from_file(file, registry=None, lazy=False, lean=False):
     """
     Retrieves a schema from the local file system.
     :param file: path to the schema.
+    :param registry: SchemaRegistry object that resolves the references of the schema.
+    :param lazy: If it's True subschemas are built the first time they are used.
+    :param lean: If it's True the schema objects don't keep the dicts they were built from.
     :return: Schema object.
     """
-    return get_schema(get_json_from_file(file))
+    return get_schema(get_json_from_file(file), registry=registry, lazy=lazy, lean=lean)
 
 
 def __get_corresponding_schema(json_schema, whole_schema, definitions, path):
@@ -1367,7 +1832,20 @@ def __get_corresponding_schema(json_schema, whole_schema, definitions, path):
     :return: Schema object.
     """
     if has_key(json_schema, "$ref"):
-        return __get_schema_from_ref(json_schema, whole_schema=whole_schema)
+        return __get_schema_from_ref(json_schema, whole_schema, definitions)
+    return build_schema_object(json_schema, whole_schema, definitions, path)
+
+
+def build_schema_object(json_schema, whole_schema, definitions, path):
+    """
+    Builds the schema object of a subschema according to its type.
+    :param json_schema: dict representing a json schema (without $ref).
+    :param whole_schema: the whole schema where the `json_schema` comes from.
+    :param definitions: Definitions object of the build.
+    :param path: if `json_schema` was retrieved from a reference, this parameter is the path used to get to it.
+    :return: Schema object.
+    """
+
     if "type" in json_schema:
         schema_type = json_schema["type"]
         if isinstance(schema_type, str):
@@ -1385,6 +1863,8 @@ def __get_corresponding_schema(json_schema, whole_schema, definitions, path):
                 return BooleanSchema(json_schema, whole_schema, definitions, path)
             elif schema_type == "null":
                 return NullSchema(json_schema, whole_schema, definitions, path)
+            else:
+                return Schema(json_schema, whole_schema, definitions, path)
         else:
             return MultipleSchema(json_schema, whole_schema, definitions, path)
     else:
@@ -1401,7 +1881,7 @@ def last_valid_schema_index(schema_array, document):
 
     last_valid_index = -1
     for i in range(0, len(schema_array)):
-        if schema_array[i].validate(document).is_valid:
+        if schema_array[i].validate_node(document).is_valid:
             last_valid_index = i
     return last_valid_index
 
@@ -1423,7 +1903,7 @@ def count_and_validate_schema_array(schema_array, document):
     last_invalid_index = -1
     for i in range(0, len(schema_array)):
         schema = schema_array[i]
-        schema_validate = schema.validate(document)
+        schema_validate = schema.validate_node(document)
         if schema_validate.is_valid:
             count += 1
         else:
@@ -1458,39 +1938,36 @@ def infer_type(json_schema):
         return r
 
 
-def validate_refs(d, traveled, full_schema=None):
-    if full_schema is None:
-        full_schema = d
-    if not isinstance(d, dict):
-        return True
-    if "$ref" in d:
-        if d["$ref"] not in traveled:
-            if isinstance(d["$ref"], str) and JSONPointer.is_json_pointer(d["$ref"]):
-                traveled.append(d["$ref"])
-                referred = JSONPointer(full_schema, JSONPointer.get_nodes_from_string(d["$ref"]))
-                if not validate_refs(referred.get_json(), traveled, full_schema):
-                    return False
-        else:
-            return False
-    for key in ["anyOf", "allOf", "oneOf"]:
-        if key in d:
-            for sch in d[key]:
-                if not validate_refs(sch, traveled, full_schema):
-                    return False
-    if "not" in d:
-        if not validate_refs(d["not"], traveled, full_schema):
-            return False
-    if "definitions" in d:
-        for sch in d["definitions"]:
-            if not validate_refs(sch, [], full_schema):
-                return False
-    # for key in d:
-    #     if isinstance(d, dict):
-    #         if not validate_refs(d[key], [], full_schema):
-    #             return False
-    #     elif isinstance(d, list):
-    #         for element in d:
-    #             if isinstance(element, dict):
-    #                 if not validate_refs(element, [], full_schema):
-    #                     return False
-    return True
+def walk_schema(schema):
+    """
+    Iterates over every schema object reachable from `schema`, visiting each one only once (schemas that come from the
+    same reference are shared).
+    :param schema: Schema object.
+    :return: Generator of tuples whose first element is the list of nodes from `schema` to the visited schema object and
+    whose second element is the visited schema object.
+    """
+
+    visited = set()
+    pending = [([], schema)]
+    while pending:
+        nodes, current = pending.pop()
+        if id(current) in visited:
+            continue
+        visited.add(id(current))
+        yield nodes, current
+        for child_nodes, child in reversed(current.get_children()):
+            pending.append((nodes + child_nodes, child))
+
+
+def validate_refs(json_schema, whole_schema=None):
+    """
+    Checks that the references of a schema don't make an unproductive cycle, that is a schema that requires itself to
+    validate the same instance (through $ref, allOf, anyOf, oneOf, not or dependencies), which would never end.
+    Recursive schemas whose cycles go through properties, items... are valid, since each step validates a smaller part
+    of the document.
+    :param json_schema: Dict object.
+    :param whole_schema: The whole schema the JSONPointers are resolved against (`json_schema` if it's None).
+    :return: bool.
+    """
+
+    return not ReferenceGraph(json_schema, whole_schema).get_cycles()
@@ -0,0 +1,281 @@
+'''
+Module providing the checkers of the `format` keyword and the registry where custom formats are added.
+
+The checkers of the draft 4 formats don't use regular expressions: they look at the string by index and with the
+methods of `str` (and `datetime` for the dates), which run in C, so they don't backtrack and allocate little more than
+the pieces of the string they split.
+'''
+import string as characters
+from datetime import datetime
+
+
+DIGITS = characters.digits
+HEXDIGITS = characters.hexdigits
+
+SCHEME_CHARACTERS = characters.ascii_letters + DIGITS + "+-."
+"""Characters of the scheme of a uri, after its first letter."""
+
+ATOM_CHARACTERS = characters.ascii_letters + DIGITS + "!#$%&'*+-/=?^_`{|}~."
+"""Characters of the local part of an email address that's not quoted (its dots are checked apart)."""
+
+URI_CHARACTERS = characters.ascii_letters + DIGITS + "-._~:/?#[]@!$&'()*+,;=%"
+"""Unreserved and reserved characters of a uri, and the `%` of the percent-encoded ones (RFC 3986)."""
+
+MAX_HOSTNAME_LENGTH = 253
+MAX_LABEL_LENGTH = 63
+MAX_LOCAL_PART_LENGTH = 64
+
+
+def is_date_time(string):
+    """
+    :param string: Any string.
+    :return: True if it's a date-time of RFC 3339, like "2020-02-29T23:59:60.5+01:00".
+    """
+
+    if len(string) < 20 or string[10] not in "Tt" or string[4] != "-" or string[7] != "-" or string[13] != ":" or \
+            string[16] != ":":
+        return False
+    second = string[17:19]
+    try:
+        # The date and the time are checked by datetime (that also checks the days of February), which only reads
+        # ASCII digits.
+        moment = datetime.fromisoformat(string[:17] + "59" if second == "60" else string[:19])
+    except ValueError:
+        return False
+    offset = string[19:]
+    if offset[0] == ".":
+        offset = offset[1:].lstrip(DIGITS)
+        if len(offset) == len(string) - 20:
+            return False
+    if offset == "Z" or offset == "z":
+        minutes = 0
+    elif len(offset) == 6 and offset[0] in "+-" and offset[3] == ":":
+        offset_hour = get_number(offset, 1, 3)
+        offset_minute = get_number(offset, 4, 6)
+        if offset_hour < 0 or offset_hour > 23 or offset_minute < 0 or offset_minute > 59:
+            return False
+        minutes = offset_hour * 60 + offset_minute
+        if offset[0] == "-":
+            minutes = -minutes
+    else:
+        return False
+    # A leap second is the last second of a day in UTC.
+    return second != "60" or (moment.hour * 60 + moment.minute - minutes) % 1440 == 1439
+
+
+def is_email(string):
+    """
+    :param string: Any string.
+    :return: True if it's an email address of RFC 5322 (without comments nor folding whitespace), like
+    "someone@example.com", "\\"some one\\"@example.com" or "someone@[192.168.0.1]".
+    """
+
+    at = string.rfind("@")
+    if at < 1:
+        return False
+    local = string[:at]
+    domain = string[at + 1:]
+    if len(local) > MAX_LOCAL_PART_LENGTH:
+        return False
+    if local[0] == '"':
+        if not is_quoted_string(local):
+            return False
+    elif local[0] == "." or local[-1] == "." or ".." in local or local.strip(ATOM_CHARACTERS):
+        return False
+    if domain[:1] == "[" and domain[-1:] == "]":
+        if domain[1:6].lower() == "ipv6:":
+            return is_ipv6(domain[6:-1])
+        return is_ipv4(domain[1:-1])
+    return is_hostname(domain)
+
+
+def is_quoted_string(string):
+    """
+    :param string: Any string.
+    :return: True if it's a quoted string of printable ASCII characters where `"` and `\\` are escaped.
+    """
+
+    length = len(string)
+    if length < 2 or string[-1] != '"':
+        return False
+    index = 1
+    while index < length - 1:
+        char = string[index]
+        if char == "\\":
+            index += 1
+            if index == length - 1:
+                return False
+            char = string[index]
+        elif char == '"':
+            return False
+        if not " " <= char <= "~":
+            return False
+        index += 1
+    return True
+
+
+def is_hostname(string):
+    """
+    :param string: Any string.
+    :return: True if it's a host name of RFC 1034 and RFC 1123, like "www.example.com".
+    """
+
+    length = len(string)
+    if not 0 < length <= MAX_HOSTNAME_LENGTH or not string.isascii() or \
+            not string.replace(".", "").replace("-", "").isalnum():
+        return False
+    # Labels are not empty and don't start nor end with a hyphen.
+    if string[0] in ".-" or string[-1] in ".-" or ".." in string or ".-" in string or "-." in string:
+        return False
+    return length <= MAX_LABEL_LENGTH or all(len(label) <= MAX_LABEL_LENGTH for label in string.split("."))
+
+
+def is_ipv4(string):
+    """
+    :param string: Any string.
+    :return: True if it's an IPv4 address in dotted-quad notation, like "192.168.0.1" (without leading zeros).
+    """
+
+    parts = string.split(".")
+    if len(parts) != 4 or not string.isascii() or not string.replace(".", "").isdigit():
+        return False
+    for part in parts:
+        length = len(part)
+        # Parts of three digits are compared as strings, since they have the same length as "255".
+        if length == 0 or length > 3 or (length > 1 and part[0] == "0") or (length == 3 and part > "255"):
+            return False
+    return True
+
+
+def is_ipv6(string):
+    """
+    :param string: Any string.
+    :return: True if it's an IPv6 address of RFC 4291, like "2001:db8::ff00:42:8329" or "::ffff:192.168.0.1".
+    """
+
+    if not 2 <= len(string) <= 45 or not string.isascii():
+        return False
+    double = string.find("::")
+    if double == -1:
+        return count_groups(string, True) == 8
+    if string.find("::", double + 1) != -1:
+        return False
+    head = count_groups(string[:double], False) if double > 0 else 0
+    tail = count_groups(string[double + 2:], True) if double + 2 < len(string) else 0
+    return head >= 0 and tail >= 0 and head + tail <= 7
+
+
+def count_groups(string, ipv4):
+    """
+    :param string: Part of an IPv6 address without `::`.
+    :param ipv4: Whether the part may end with an IPv4 address.
+    :return: Number of 16 bit groups of the part (an IPv4 address counts as two), or -1 if it's not valid.
+    """
+
+    groups = string.split(":")
+    count = len(groups)
+    if ipv4 and "." in groups[-1]:
+        if not is_ipv4(groups.pop()):
+            return -1
+        count += 1
+    for group in groups:
+        if not 0 < len(group) <= 4 or group.strip(HEXDIGITS):
+            return -1
+    return count
+
+
+def is_uri(string):
+    """
+    :param string: Any string.
+    :return: True if it's an absolute uri of RFC 3986 (with a scheme), like "https://example.com/a?b=c#d".
+    """
+
+    colon = string.find(":")
+    if colon < 1 or not ("a" <= string[0] <= "z" or "A" <= string[0] <= "Z") or \
+            string[1:colon].strip(SCHEME_CHARACTERS) or string.strip(URI_CHARACTERS):
+        return False
+    fragment = string.find("#")
+    if fragment != -1 and string.find("#", fragment + 1) != -1:
+        return False
+    percent = string.find("%")
+    while percent != -1:
+        if len(string) < percent + 3 or string[percent + 1:percent + 3].strip(HEXDIGITS):
+            return False
+        percent = string.find("%", percent + 3)
+    if "[" in string or "]" in string:
+        # Brackets only enclose an IP literal host.
+        if not string.startswith("//", colon + 1):
+            return False
+        start = colon + 3
+        end = len(string)
+        for delimiter in "/?#":
+            index = string.find(delimiter, start)
+            if index != -1 and index < end:
+                end = index
+        authority = string[start:end]
+        opening = authority.find("[")
+        closing = authority.find("]")
+        if opening == -1 or closing < opening or string.find("[", end) != -1 or string.find("]", end) != -1 or \
+                authority.find("[", opening + 1) != -1 or authority.find("]", closing + 1) != -1 or \
+                (opening > 0 and authority[opening - 1] != "@") or \
+                (closing + 1 < len(authority) and authority[closing + 1] != ":"):
+            return False
+        host = authority[opening + 1:closing]
+        if not is_ipv6(host) and not (host[:1] in "vV" and len(host) > 1):
+            return False
+    return True
+
+
+def get_number(string, start, end):
+    """
+    :param string: Any string.
+    :param start: Index of the first digit.
+    :param end: Index after the last digit.
+    :return: The number written with ASCII digits between both indexes, or -1 if there's another character.
+    """
+
+    part = string[start:end]
+    if not part.isascii() or not part.isdigit():
+        return -1
+    return int(part)
+
+
+FORMATS = {
+    "date-time": is_date_time,
+    "email": is_email,
+    "hostname": is_hostname,
+    "ipv4": is_ipv4,
+    "ipv6": is_ipv6,
+    "uri": is_uri,
+}
+"""Dict where each format holds its checker, a function that receives a string and returns True if it has the format.
+Schemas look up their checker when they are built, and formats that are not here are not checked."""
+
+
+def register_format(name, checker):
+    """
+    Adds a format, or replaces the checker of a format. Schemas built before keep the checker they had.
+    :param name: Name of the format, the value of the format keyword.
+    :param checker: Function that receives a string and returns True if it has the format.
+    """
+
+    FORMATS[name] = checker
+
+
+def get_format_checker(name):
+    """
+    :param name: Name of a format.
+    :return: Its checker, or None if the format is not registered.
+    """
+
+    return FORMATS.get(name)
+
+
+def get_formats_signature():
+    """
+    :return: List of the registered formats, each one a list with its name and the qualified name of its checker, so
+    the schemas built with other formats (like the cached ones, see `validator.cache`) can be told apart.
+    """
+
+    return sorted([name, "{}.{}".format(getattr(checker, "__module__", None), getattr(checker, "__qualname__", None))]
+                  for name, checker in FORMATS.items())
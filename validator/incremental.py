@@ -0,0 +1,263 @@
+'''
+Module providing the incremental build of a schema that was edited: the new version reuses the schema objects of the
+previous one that didn't change, instead of building, validating against the meta schema and checking the references
+of the whole document again.
+
+A document is split into units: each entry of its `definitions` and the root (everything else). A unit is built again
+when its dict changed or when it references, through JSONPointers, a unit that's built again; the root is always built
+again. The other units keep their schema objects, which are taken from the previous build.
+'''
+import weakref
+from .classes import Definitions, build_schema_object, freeze_schema, get_meta_schema, get_schema
+from .exceptions import CircularSchemaException, InvalidSchemaException
+from .patch import apply_patch, same_json
+from .refs import ReferenceGraph
+from .utils import JSONPointer, has_key
+
+
+ROOT = None
+"""Unit of the root of a document: every subschema that's not inside an entry of its `definitions`."""
+
+DEFINITIONS_PREFIX = "#/definitions/"
+
+REFERENCE_INDEXES = weakref.WeakKeyDictionary()
+"""Dict where each schema object that was updated or returned by `update_schema` holds the ReferenceIndex of its
+document, so the next update only scans the units that changed."""
+
+
+class ReferenceIndex:
+    """
+    Index of the JSONPointer references between the units of a document, in both directions. It's not modified once
+    it's built, so each version of a document has its own and they share the sets of the units that didn't change.
+    """
+
+    def __init__(self, references=None, referrers=None, pointers=None):
+        self.references = {} if references is None else references
+        """Dict where each unit holds the set of the units its references point into."""
+
+        self.pointers = {} if pointers is None else pointers
+        """Dict where each unit holds a dict with the unit each of its JSONPointer references points into."""
+
+        self.referrers = {} if referrers is None else referrers
+        """Dict where each unit holds the set of the units that reference it."""
+
+    def update(self, units, removed=()):
+        """
+        :param units: Dict where each unit that's new or changed holds its dict.
+        :param removed: Units that were removed.
+        :return: ReferenceIndex object of the new version. Only the given units are scanned.
+        :raise WholeDefinitions: If a unit references the whole `definitions`.
+        """
+
+        references = dict(self.references)
+        referrers = dict(self.referrers)
+        pointers = dict(self.pointers)
+        copied = set()
+
+        def get_referrers(target):
+            # The sets are copied before they are modified, since the previous index shares them.
+            if target not in copied:
+                copied.add(target)
+                referrers[target] = set(referrers.get(target, ()))
+            return referrers[target]
+
+        for unit in list(units) + list(removed):
+            pointers.pop(unit, None)
+            for target in references.pop(unit, ()):
+                get_referrers(target).discard(unit)
+        for unit, json_schema in units.items():
+            pointers[unit] = get_references(json_schema)
+            targets = references[unit] = set(pointers[unit].values())
+            for target in targets:
+                get_referrers(target).add(unit)
+        return ReferenceIndex(references, referrers, pointers)
+
+    def get_rebuilt_units(self, changed):
+        """
+        :param changed: Set of the units that changed or were removed.
+        :return: Set of the units that are built again: the ones that changed, the root and every unit that references
+        one of them, directly or through other units.
+        """
+
+        rebuilt = set(changed)
+        rebuilt.add(ROOT)
+        pending = list(rebuilt)
+        while pending:
+            for referrer in self.referrers.get(pending.pop(), ()):
+                if referrer not in rebuilt:
+                    rebuilt.add(referrer)
+                    pending.append(referrer)
+        return rebuilt
+
+
+class WholeDefinitions(Exception):
+    """
+    Raised while indexing a document with a reference to its whole `definitions`, whose units can't be told apart.
+    """
+
+
+def update_schema(schema, json_schema=None, patch=None):
+    """
+    Returns the schema object of a new version of the document a schema was built from, building only the units that
+    changed and the ones that reference them. The new version is validated against the meta schema and checked for
+    unproductive reference cycles, but only in the units that changed.
+
+    The schema objects that are reused keep pointing to the previous dict, whose content in their place is the same,
+    and the previous schema object is still valid.
+    :param schema: Schema object built from a whole document with `get_schema` (or returned by this function). It must
+    keep its dicts (not lean).
+    :param json_schema: Dict of the new version. Unchanged parts may be the same objects as in the previous dict, which
+    is never modified.
+    :param patch: JSON Patch (RFC 6902), a list of operations to apply to the previous dict instead of `json_schema`.
+    :return: Schema object.
+    """
+
+    old = schema.dict_schema
+    if old is None:
+        raise ValueError("A lean schema can't be updated, since it doesn't keep the dict it was built from.")
+    if (json_schema is None) == (patch is None):
+        raise ValueError("Either a new dict or a patch must be given.")
+    if patch is not None:
+        json_schema = apply_patch(old, patch)
+    definitions = schema.definitions
+    if old is not schema.whole_schema or has_key(old, "$ref") or has_key(json_schema, "$ref") or \
+            not isinstance(json_schema, dict):
+        # Schemas of a part of a document, and documents whose root is a reference, are built as a whole.
+        return get_schema(json_schema, registry=definitions.registry, lazy=definitions.lazy)
+
+    old_units = get_units(old)
+    new_units = get_units(json_schema)
+    changed = {unit for unit in new_units if unit not in old_units or not same_json(new_units[unit], old_units[unit])}
+    removed = {unit for unit in old_units if unit not in new_units}
+    try:
+        index = REFERENCE_INDEXES.get(schema)
+        if index is None:
+            index = REFERENCE_INDEXES[schema] = ReferenceIndex().update(old_units)
+        index = index.update({unit: new_units[unit] for unit in changed}, removed)
+    except WholeDefinitions:
+        return get_schema(json_schema, registry=definitions.registry, lazy=definitions.lazy)
+
+    check_units(json_schema, new_units, changed)
+    check_referrers(json_schema, new_units, index, changed, removed)
+    rebuilt = index.get_rebuilt_units(changed | removed)
+    reused = Definitions(definitions.registry, definitions.lazy)
+    for path, child in list(definitions.items()):
+        unit = get_path_unit(path)
+        if unit is not ROOT and unit in new_units and unit not in rebuilt:
+            reused[path] = child
+    new_schema = freeze_schema(build_schema_object(json_schema, json_schema, reused, "#"))
+    REFERENCE_INDEXES[new_schema] = index
+    return new_schema
+
+
+def get_units(json_schema):
+    """
+    :param json_schema: Dict of a whole document.
+    :return: Dict where each unit (the name of a definition, or ROOT) holds its dict. The root is the document without
+    its definitions.
+    """
+
+    units = {}
+    definitions = json_schema.get("definitions")
+    if isinstance(definitions, dict):
+        units.update(definitions)
+        units[ROOT] = {key: value for key, value in json_schema.items() if key != "definitions"}
+    else:
+        units[ROOT] = json_schema
+    return units
+
+
+def get_unit(nodes):
+    """
+    :param nodes: Nodes of a JSONPointer, from the root of the document.
+    :return: The unit it points into.
+    """
+
+    if nodes[:1] == ["#"]:
+        nodes = nodes[1:]
+    if nodes[:1] != ["definitions"]:
+        return ROOT
+    if len(nodes) == 1:
+        raise WholeDefinitions()
+    return nodes[1]
+
+
+def get_path_unit(path):
+    """
+    :param path: Normalized JSONPointer string, like the keys of Definitions.
+    :return: The unit it points into.
+    """
+
+    if not path.startswith(DEFINITIONS_PREFIX):
+        return ROOT
+    return path[len(DEFINITIONS_PREFIX):].partition("/")[0].replace("~1", "/").replace("~0", "~")
+
+
+def get_references(json_schema):
+    """
+    :param json_schema: Dict of a unit.
+    :return: Dict with the unit each of its JSONPointer references points into.
+    """
+
+    references = {}
+    pending = [json_schema]
+    while pending:
+        current = pending.pop()
+        if isinstance(current, dict):
+            reference = current.get("$ref")
+            if isinstance(reference, str) and JSONPointer.is_json_pointer(reference) and reference not in references:
+                references[reference] = get_unit(JSONPointer.get_nodes_from_string(reference))
+            pending.extend(current.values())
+        elif isinstance(current, list):
+            pending.extend(current)
+    return references
+
+
+def check_units(json_schema, units, changed):
+    """
+    Validates the units that changed against the meta schema and checks that they don't make an unproductive reference
+    cycle (a cycle made only of units that didn't change was already there). Raises InvalidSchemaException or
+    CircularSchemaException like `get_schema`.
+    :param json_schema: Dict of the whole new document.
+    :param units: Dict where each unit of the new document holds its dict.
+    :param changed: Set of the units that changed.
+    """
+
+    meta_schema = get_meta_schema()
+    for unit in changed:
+        # The root is validated without its definitions, which are validated one by one as the units they are.
+        if not meta_schema.validate_node(units[unit]):
+            raise InvalidSchemaException()
+    for unit in changed:
+        # The graph of a definition starts from its dict inside the document, so the references to it are resolved
+        # to the same vertex. The one of the root doesn't go through the definitions unless they are referenced.
+        graph = ReferenceGraph(units[unit], json_schema, [] if unit is ROOT else ["definitions", unit])
+        cycles = graph.get_cycles()
+        if cycles:
+            raise CircularSchemaException("Unproductive reference cycle: " + " -> ".join(
+                graph.get_pointer(vertex) for vertex in cycles[0] + cycles[0][:1]))
+
+
+def check_referrers(json_schema, units, index, changed, removed):
+    """
+    Resolves the references of the units that didn't change into the units that changed or were removed, which may
+    point to something that's not there anymore. A unit that no other reaches is not built, so this raises the error
+    the reference check of `get_schema` raises (the units that changed were checked by `check_units`).
+    :param json_schema: Dict of the whole new document.
+    :param units: Dict where each unit of the new document holds its dict.
+    :param index: ReferenceIndex object of the new document.
+    :param changed: Set of the units that changed.
+    :param removed: Set of the units that were removed.
+    :raise KeyError: If a reference points to a key that's not there anymore (IndexError or ValueError for items).
+    """
+
+    targets = changed | removed
+    referrers = set()
+    for unit in targets:
+        referrers.update(index.referrers.get(unit, ()))
+    for unit in referrers:
+        if unit in changed or unit not in units:
+            continue
+        for reference, target in index.pointers[unit].items():
+            if target in targets:
+                JSONPointer(json_schema, reference).get_json()
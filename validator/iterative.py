@@ -0,0 +1,547 @@
+'''
+Module providing a validation engine that walks the document and the schema with an explicit stack instead of
+recursion, so documents can be nested as deep as they want.
+'''
+import time
+from .budget import CLOCK_INTERVAL, BudgetExceededResponse
+from .classes import Schema, ObjectSchema, ArraySchema, IntegerSchema, NumberSchema, StringSchema, BooleanSchema, \
+    NullSchema, MultipleSchema, LazySchema
+from .utils import JSONPointer, Response, NONE, check_pattern
+from .vectorized import VECTORIZE_SIZE, find_invalid_number, is_ndarray
+
+
+def validate_iteratively(schema, document, budget=None):
+    """
+    Validates a document against a schema without recursion. Each schema object that validates parts of the document
+    (or the document through anyOf, allOf, oneOf or not) is a frame of the stack, and schemas that only check the value
+    they get (strings, numbers, booleans and nulls without anyOf, allOf, oneOf or not) are checked right away by their
+    parent. The response is the same one `schema.validate_node` returns.
+
+    Schema classes that are not part of this module (like `OptimizedSchema`) validate their node with their own
+    `validate_node`, and the methods replaced by the profiler or an adaptive ordering are not used.
+    :param schema: Schema object.
+    :param document: document to validate.
+    :param budget: Budget object that limits the validation (optional, see `validate_with_budget`).
+    :return: Response object.
+    """
+
+    if budget is not None:
+        return validate_with_budget(schema, document, budget)
+    check = get_leaf_check(schema)
+    if check is not None:
+        response = check(schema, document)
+    else:
+        response = None
+        stack = [get_frame(schema, document, get_leaf_check)]
+        while stack:
+            try:
+                child, value, _, _ = stack[-1].send(response)
+            except StopIteration as stop:
+                stack.pop()
+                response = stop.value
+                continue
+            stack.append(get_frame(child, value, get_leaf_check))
+            response = None
+    return finish(response)
+
+
+def validate_with_budget(schema, document, budget):
+    """
+    Same as `validate_iteratively`, but every schema object visits its node in a frame of its own, so the limits of
+    the budget are checked before each node: the nodes visited, the depth of the node in the document, the bytes of the
+    strings visited and (every `CLOCK_INTERVAL` nodes) the time.
+    :param schema: Schema object.
+    :param document: document to validate.
+    :param budget: Budget object.
+    :return: Response object, or a BudgetExceededResponse pointing to the node that would have exceeded the budget.
+    """
+
+    deadline = None if budget.seconds is None else time.perf_counter() + budget.seconds
+    visited = 0
+    string_bytes = 0
+    stack = []
+    # (document node, schema nodes, depth) of each frame of the stack.
+    entries = []
+
+    pending = (schema, document, None, ())
+    response = None
+    while True:
+        if pending is not None:
+            child, value, document_node, schema_nodes = pending
+            depth = (entries[-1][2] if entries else 0) + (document_node is not None)
+            visited += 1
+            if type(value) is str:
+                string_bytes += len(value) if value.isascii() else len(value.encode("utf-8"))
+            limit = None
+            if budget.nodes is not None and visited > budget.nodes:
+                limit = "nodes"
+            elif budget.depth is not None and depth > budget.depth:
+                limit = "depth"
+            elif budget.string_bytes is not None and string_bytes > budget.string_bytes:
+                limit = "string_bytes"
+            elif deadline is not None and visited % CLOCK_INTERVAL == 1 and time.perf_counter() > deadline:
+                limit = "seconds"
+            if limit is not None:
+                entries.append((document_node, schema_nodes, depth))
+                return BudgetExceededResponse(limit, JSONPointer(document, [entry[0] for entry in entries
+                                                                            if entry[0] is not None]),
+                                              JSONPointer(schema.whole_schema, [node for entry in entries
+                                                                                for node in entry[1]]))
+            stack.append(get_frame(child, value, get_no_check))
+            entries.append((document_node, schema_nodes, depth))
+            response = None
+        try:
+            pending = stack[-1].send(response)
+        except StopIteration as stop:
+            stack.pop()
+            entries.pop()
+            response = stop.value
+            pending = None
+            if not stack:
+                return finish(response)
+
+
+def finish(response):
+    """
+    :param response: None or the Response of a failure that went up the stack.
+    :return: Response object.
+    """
+
+    if response is None:
+        return Response(True, None, None)
+    if vars(response).pop("backwards", False):
+        response.document_pointer.nodes.reverse()
+        response.schema_pointer.nodes.reverse()
+    return response
+
+
+def get_frame(schema, document, get_check):
+    """
+    :param schema: Schema object.
+    :param document: document to validate.
+    :param get_check: `get_leaf_check`, or `get_no_check` so every schema object gets a frame.
+    :return: Generator that yields a tuple (schema, document, document node, schema nodes) for each schema object its
+    result depends on (the nodes lead from its schema and document to them), receives their results (None if it's
+    valid or the Response of the failure) and returns its own.
+    """
+
+    if type(schema) is LazySchema:
+        LazySchema.build(schema)
+    return FRAMES.get(type(schema), validate_other)(schema, document, get_check)
+
+
+def get_leaf_check(schema):
+    """
+    :param schema: Schema object.
+    :return: The function that checks a value against the schema without a frame, or None if the schema validates
+    other schemas.
+    """
+
+    if type(schema) not in LEAF_KEYWORDS or has_combinators(schema):
+        return None
+    return check_leaf
+
+
+def get_no_check(schema):
+    return None
+
+
+def as_failure(response):
+    """
+    :param response: Response object returned by `validate_node`.
+    :return: `response` if it's a failure, None otherwise.
+    """
+
+    if response is None or response.is_valid:
+        return None
+    return response
+
+
+def add_upward_nodes(response, document_nodes, schema_nodes):
+    """
+    Same as `response.add_upward_document_and_schema_nodes`, but the nodes of the responses that go up the stack are
+    kept backwards (`validate_iteratively` puts them in order at the end), since inserting them at the beginning of
+    the lists at every level would take quadratic time on deep documents.
+    :param response: Response object of a failure.
+    :param document_nodes: Upward nodes of the document pointer.
+    :param schema_nodes: Upward nodes of the schema pointer.
+    """
+
+    if "backwards" not in vars(response):
+        response.document_pointer.nodes.reverse()
+        response.schema_pointer.nodes.reverse()
+        response.backwards = True
+    response.document_pointer.nodes.extend(reversed(document_nodes))
+    response.schema_pointer.nodes.extend(reversed(schema_nodes))
+
+
+def validate_other(schema, document, get_check):
+    return as_failure(schema.validate_node(document))
+    yield
+
+
+def validate_combinators(schema, document, get_check):
+    """
+    Validates a document against the anyOf, oneOf, allOf, not and enum keywords of a schema, in the order
+    `Schema.validate_node` does. anyOf stops at the first branch that matches, oneOf at the second one and allOf goes
+    from its last branch to its first, since it reports the last one that fails.
+    :param schema: Schema object.
+    :param document: document to validate.
+    :return: Generator (see `get_frame`).
+    """
+
+    if schema.anyOf:
+        branches = schema.anyOf
+        for i in range(len(branches)):
+            check = get_check(branches[i])
+            if check is not None:
+                response = check(branches[i], document)
+            else:
+                response = yield branches[i], document, None, ("anyOf", i)
+            if response is None:
+                break
+            last_invalid, last_invalid_index = response, i
+        else:
+            add_upward_nodes(last_invalid, [], [last_invalid_index])
+            add_upward_nodes(last_invalid, [], schema.build_nodes(["anyOf"]))
+            return last_invalid
+    if schema.oneOf:
+        branches = schema.oneOf
+        count = 0
+        for i in range(len(branches)):
+            check = get_check(branches[i])
+            if check is not None:
+                response = check(branches[i], document)
+            else:
+                response = yield branches[i], document, None, ("oneOf", i)
+            if response is None:
+                count += 1
+                if count > 1:
+                    return Response(False, JSONPointer(document, []), JSONPointer(schema.whole_schema,
+                                                                                  schema.build_nodes(["oneOf"])))
+            else:
+                last_invalid, last_invalid_index = response, i
+        if count == 0:
+            add_upward_nodes(last_invalid, [], [last_invalid_index])
+            add_upward_nodes(last_invalid, [], schema.build_nodes(["oneOf"]))
+            return last_invalid
+    if schema.allOf:
+        branches = schema.allOf
+        for i in range(len(branches) - 1, -1, -1):
+            check = get_check(branches[i])
+            if check is not None:
+                response = check(branches[i], document)
+            else:
+                response = yield branches[i], document, None, ("allOf", i)
+            if response is not None:
+                add_upward_nodes(response, [], [i])
+                add_upward_nodes(response, [], schema.build_nodes(["allOf"]))
+                return response
+    if schema._not is not None:
+        check = get_check(schema._not)
+        if check is not None:
+            response = check(schema._not, document)
+        else:
+            response = yield schema._not, document, None, ("not",)
+        if response is None:
+            return Response(False, JSONPointer(document, []), JSONPointer(schema.whole_schema,
+                                                                          schema.build_nodes(["not"])))
+    if schema.enum:
+        return check_enum(schema, document)
+    return None
+
+
+def has_combinators(schema):
+    return schema.anyOf or schema.oneOf or schema.allOf or schema._not is not None
+
+
+def validate_object(schema, document, get_check):
+    """
+    Frame of an ObjectSchema (see `get_frame`). Its keywords are checked in the order of `ObjectSchema.validate_node`.
+    """
+
+    if has_combinators(schema):
+        response = yield from validate_combinators(schema, document, get_check)
+        if response is not None:
+            return response
+    elif schema.enum:
+        response = check_enum(schema, document)
+        if response is not None:
+            return response
+    if not isinstance(document, dict):
+        return schema.validate_type(document)
+    if schema.required:
+        response = as_failure(schema.validate_required_properties(document))
+        if response is not None:
+            return response
+    properties = schema.properties
+    if properties:
+        failed_key = None
+        failed_response = None
+        if len(document) < len(properties):
+            # The property that's declared first is reported, like `ObjectSchema.validate_properties` does.
+            property_order = schema.property_order
+            for key in document:
+                child = properties.get(key)
+                if child is None or (failed_key is not None and property_order[key] > property_order[failed_key]):
+                    continue
+                check = get_check(child)
+                if check is not None:
+                    response = check(child, document[key])
+                else:
+                    response = yield child, document[key], key, ("properties", key)
+                if response is not None:
+                    failed_key = key
+                    failed_response = response
+        else:
+            for key, child in properties.items():
+                if key in document:
+                    check = get_check(child)
+                    if check is not None:
+                        response = check(child, document[key])
+                    else:
+                        response = yield child, document[key], key, ("properties", key)
+                    if response is not None:
+                        failed_key = key
+                        failed_response = response
+                        break
+        if failed_response is not None:
+            failed_response.set_document(document)
+            add_upward_nodes(failed_response, [failed_key], schema.build_nodes(["properties", failed_key]))
+            return failed_response
+    if schema.minProperties is not None or schema.maxProperties is not None or schema.property_dependency_keys:
+        for validate in (schema.validate_min_properties, schema.validate_max_properties,
+                         schema.validate_property_dependencies):
+            response = as_failure(validate(document))
+            if response is not None:
+                return response
+    for key, child in schema.schema_dependencies.items():
+        if key in document:
+            check = get_check(child)
+            if check is not None:
+                response = check(child, document)
+            else:
+                response = yield child, document, None, ("dependencies", key)
+            if response is not None:
+                response.set_document(document)
+                add_upward_nodes(response, [key], schema.build_nodes(["dependencies", key]))
+                return response
+    additional_properties = schema.additionalProperties
+    if additional_properties is not True and not document.keys() <= schema.declared_keys:
+        if additional_properties is False:
+            for key in document:
+                if schema.key_is_additional_property(key):
+                    return Response(False, JSONPointer(document, [key]), JSONPointer(
+                        schema.whole_schema, schema.build_nodes(["additionalProperties"])))
+        else:
+            check = get_check(additional_properties)
+            for key in document:
+                if schema.key_is_additional_property(key):
+                    if check is not None:
+                        response = check(additional_properties, document[key])
+                    else:
+                        response = yield additional_properties, document[key], key, ("additionalProperties",)
+                    if response is not None:
+                        response.set_document(document)
+                        add_upward_nodes(response, [key], schema.build_nodes(["additionalProperties", key]))
+                        return response
+    if schema.patternProperties:
+        for key in document:
+            for pattern, child in schema.patternProperties.items():
+                if check_pattern(pattern, key):
+                    check = get_check(child)
+                    if check is not None:
+                        response = check(child, document[key])
+                    else:
+                        response = yield child, document[key], key, ("patternProperties", pattern)
+                    if response is not None:
+                        add_upward_nodes(response, [key], ["patternProperties", pattern])
+                        return response
+    return None
+
+
+def validate_array(schema, document, get_check):
+    """
+    Frame of an ArraySchema (see `get_frame`). Its keywords are checked in the order of `ArraySchema.validate_node`.
+    NumPy arrays are validated by `ArraySchema.validate_node`, since their items are numbers.
+    """
+
+    if type(document) is not list and is_ndarray(document):
+        return as_failure(schema.validate_node(document))
+    if has_combinators(schema):
+        response = yield from validate_combinators(schema, document, get_check)
+        if response is not None:
+            return response
+    elif schema.enum:
+        response = check_enum(schema, document)
+        if response is not None:
+            return response
+    if not isinstance(document, list):
+        return schema.validate_type(document)
+    items = schema.items
+    if isinstance(items, list):
+        for i in range(min(len(document), len(items))):
+            check = get_check(items[i])
+            if check is not None:
+                response = check(items[i], document[i])
+            else:
+                response = yield items[i], document[i], i, ("items", i)
+            if response is not None:
+                response.set_document(document)
+                add_upward_nodes(response, [i], schema.build_nodes(["items", i]))
+                return response
+        additional_items = schema.additionalItems
+        if additional_items is False:
+            response = as_failure(schema.validate_additional_items(document))
+            if response is not None:
+                return response
+        elif isinstance(additional_items, Schema):
+            check = get_check(additional_items)
+            for i in range(len(items), len(document)):
+                if check is not None:
+                    response = check(additional_items, document[i])
+                else:
+                    response = yield additional_items, document[i], i, ("additionalItems",)
+                if response is not None:
+                    add_upward_nodes(response, [document.index(document[i])], ["additionalItems"])
+                    return response
+    else:
+        start = 0
+        if len(document) >= VECTORIZE_SIZE and type(items) in NUMBER_CLASSES and not items.enum and \
+                not has_combinators(items):
+            start = find_invalid_number(items, type(items) is IntegerSchema, document)
+            if start is None:
+                start = 0
+            elif start == NONE:
+                start = len(document)
+        check = get_check(items)
+        for i in range(start, len(document)):
+            if check is not None:
+                response = check(items, document[i])
+            else:
+                response = yield items, document[i], i, ("items",)
+            if response is not None:
+                response.set_document(document)
+                add_upward_nodes(response, [i], schema.build_nodes(["items"]))
+                return response
+    if schema.minItems is not None or schema.maxItems is not None or schema.uniqueItems:
+        for validate in (schema.validate_min_items, schema.validate_max_items, schema.validate_unique_items):
+            response = as_failure(validate(document))
+            if response is not None:
+                return response
+    return None
+
+
+def validate_multiple(schema, document, get_check):
+    """
+    Frame of a MultipleSchema (see `get_frame`): its own combinators and then the schema of the type of the document,
+    like `MultipleSchema.validate_node`.
+    """
+
+    if type(document) is not list and is_ndarray(document):
+        # NumPy arrays only hold numbers, so they are validated without frames.
+        return as_failure(MultipleSchema.validate_node(schema, document))
+    if has_combinators(schema):
+        response = yield from validate_combinators(schema, document, get_check)
+        if response is not None:
+            return response
+    elif schema.enum:
+        response = check_enum(schema, document)
+        if response is not None:
+            return response
+    document_type = type(document)
+    if document_type is bool or document is None:
+        schema_type = "boolean" if document_type is bool else "null"
+        if schema_type in schema.schemas or schema.validates_any:
+            return None
+        return Response(False, JSONPointer(document, []), JSONPointer(schema.whole_schema, ["type"]))
+    if isinstance(document, str):
+        types = ["string"]
+    elif isinstance(document, int):
+        types = ["integer", "number"]
+    elif isinstance(document, dict):
+        types = ["object"]
+    elif isinstance(document, list):
+        types = ["array"]
+    elif isinstance(document, float):
+        types = ["number", "integer"]
+    else:
+        return as_failure(MultipleSchema.validate_node(schema, document))
+    for schema_type in types:
+        child = schema.schemas.get(schema_type)
+        if child is not None:
+            check = get_check(child)
+            if check is not None:
+                return check(child, document)
+            return (yield child, document, None, ())
+    if schema.validates_any:
+        return None
+    return Response(False, JSONPointer(document, []), JSONPointer(schema.whole_schema, ["type"]))
+
+
+def validate_leaf(schema, document, get_check):
+    """
+    Frame of a schema that only checks the value it gets but has anyOf, allOf, oneOf or not (see `get_frame`).
+    """
+
+    response = yield from validate_combinators(schema, document, get_check)
+    if response is not None:
+        return response
+    return check_keywords(schema, document)
+
+
+def check_enum(schema, document):
+    return as_failure(schema.validate_enum(document))
+
+
+def check_leaf(schema, document):
+    """
+    Checks a value against a schema that only checks the value it gets, with the `validate_*` methods its
+    `validate_node` calls (see `LEAF_KEYWORDS`).
+    :param schema: Schema object without anyOf, allOf, oneOf or not.
+    :param document: document to validate.
+    :return: None if it's valid or the Response of the failure.
+    """
+
+    if schema.enum:
+        response = schema.validate_enum(document)
+        if not response.is_valid:
+            return response
+    return check_keywords(schema, document)
+
+
+def check_keywords(schema, document):
+    """
+    Same as `check_leaf` without the enum, which `validate_combinators` has already checked.
+    """
+
+    for keyword, name in LEAF_KEYWORDS[type(schema)]:
+        if keyword is None or getattr(schema, keyword) is not None:
+            response = getattr(schema, name)(document)
+            if not response.is_valid:
+                return response
+    return None
+
+
+NUMBER_CLASSES = (IntegerSchema, NumberSchema)
+
+FRAMES = {ObjectSchema: validate_object, ArraySchema: validate_array, MultipleSchema: validate_multiple,
+          Schema: validate_leaf, StringSchema: validate_leaf, IntegerSchema: validate_leaf, NumberSchema: validate_leaf,
+          BooleanSchema: validate_leaf, NullSchema: validate_leaf}
+"""Dict where each schema class holds the function that builds its frame."""
+
+NUMBER_KEYWORDS = ((None, "validate_type"), ("multipleOf", "validate_multiple_of"), ("minimum", "validate_minimum"),
+                   ("maximum", "validate_maximum"))
+
+LEAF_KEYWORDS = {
+    Schema: (),
+    StringSchema: ((None, "validate_type"), ("minLength", "validate_min_len"), ("maxLength", "validate_max_len"),
+                   ("pattern", "validate_pattern"), ("format_checker", "validate_format")),
+    IntegerSchema: NUMBER_KEYWORDS,
+    NumberSchema: NUMBER_KEYWORDS,
+    BooleanSchema: ((None, "validate_type"),),
+    NullSchema: ((None, "validate_type"),)
+}
+"""Dict where each schema class that only checks the value it gets holds the methods its `validate_node` calls after
+the ones of `Schema.validate_node`, in the same order. Each one is a tuple (attribute of its keyword, name of the
+method), and the method is skipped when the attribute is None (the type is always checked)."""
@@ -0,0 +1,270 @@
+'''
+Module providing the validation of a value at a JSON Pointer of a document against the subschemas that govern that
+location (see `Schema.validate_at`), without the rest of the document.
+
+The schema is walked down the nodes of the pointer with the same descent as `ObjectSchema` and `ArraySchema`
+(properties, patternProperties, additionalProperties, items, additionalItems, and the schemas of `$ref`, which are
+already resolved in the built objects). allOf applies to the same value, so its subschemas are walked down too. anyOf,
+oneOf, not and dependencies choose between subschemas according to the whole container, which is not known, so they are
+not walked down. Neither is a schema that allows both arrays and objects (or doesn't set its type) at an index, since
+the container may be either of them. The subschemas found for each pointer are kept in the LocationIndex of the
+schema, so a pointer that was already used is resolved with a dict lookup.
+'''
+import weakref
+from .classes import Schema, ObjectSchema, ArraySchema, MultipleSchema, LazySchema
+from .optimizer import OptimizedSchema
+from .patch import get_patch_nodes
+from .utils import JSONPointer, Response
+
+MAX_LOCATIONS = 10000
+"""Maximum number of pointers a LocationIndex keeps. When it's full it's emptied, so pointers with many different
+array indexes can't make it grow without limit."""
+
+LOCATION_INDEXES = weakref.WeakKeyDictionary()
+"""Dict where each schema object that validated a value at a pointer holds its LocationIndex."""
+
+
+class Location:
+    """
+    Subschemas that govern the values at a location of the documents of a schema.
+    """
+
+    def __init__(self, nodes, schemas, rejected=None):
+        self.nodes = nodes
+        """Nodes of the location, from the root of the document."""
+
+        self.schemas = schemas
+        """List of tuples (schema object, nodes from the root schema to it) that the value must be valid against."""
+
+        self.rejected = rejected
+        """Tuple (schema object, nodes from the root schema to its keyword) of the keyword that doesn't allow any value
+        at this location (additionalProperties or additionalItems set to False, or a type that isn't a container on the
+        way), or None."""
+
+    def validate(self, value):
+        """
+        :param value: Json value at this location.
+        :return: Response object. Its document pointer holds the nodes from the root of the document, which is not
+        known, so its document is None.
+        """
+
+        if self.rejected is not None:
+            schema, schema_nodes = self.rejected
+            return Response(False, JSONPointer(None, list(self.nodes)),
+                            JSONPointer(schema.whole_schema, list(schema_nodes)))
+        for schema, schema_nodes in self.schemas:
+            response = schema.validate_node(value)
+            if not response.is_valid:
+                response.set_document(None)
+                response.add_upward_document_and_schema_nodes(self.nodes, schema_nodes)
+                return response
+        return Response(True, None, None)
+
+    def get_child(self, node):
+        """
+        :param node: Key or index (a string, like in JSON Pointers) of a child of the values at this location.
+        :return: Location object of the child.
+        :raise ValueError: If an array schema on the way can't resolve the node.
+        """
+
+        nodes = self.nodes + [node]
+        if self.rejected is not None:
+            return Location(nodes, [], self.rejected)
+        schemas = []
+        seen = set()
+        for schema, schema_nodes in self.schemas:
+            for child, child_nodes in get_children(schema, schema_nodes, node):
+                if child is None:
+                    return Location(nodes, [], (schema, child_nodes))
+                if id(child) not in seen and not is_empty(child):
+                    seen.add(id(child))
+                    schemas.append((child, child_nodes))
+        return Location(nodes, schemas)
+
+
+class LocationIndex:
+    """
+    Index of the Location of each pointer used with a schema. It's filled on demand, since recursive schemas,
+    patternProperties, additionalProperties and items govern unbounded sets of pointers, and each new pointer is
+    resolved from the Location of its parent.
+    """
+
+    def __init__(self, schema):
+        self.root = Location([], [] if is_empty(schema) else [(schema, [])])
+        """Location object of the whole document."""
+
+        self.locations = {}
+        """Dict where each pointer string (as it was given, and in its RFC 6901 form) holds its Location object."""
+
+    def get_location(self, pointer):
+        """
+        :param pointer: JSON Pointer string, of RFC 6901 ("" or "/a/0") or a URI fragment ("#" or "#/a/0").
+        :return: Location object.
+        """
+
+        location = self.locations.get(pointer)
+        if location is not None:
+            return location
+        nodes = get_location_nodes(pointer)
+        # The longest prefix that's already indexed is walked down, indexing every pointer on the way.
+        keys = [get_location_pointer(nodes[:i]) for i in range(len(nodes) + 1)]
+        depth = len(nodes)
+        location = self.locations.get(keys[depth])
+        while location is None and depth > 0:
+            depth -= 1
+            location = self.locations.get(keys[depth])
+        if location is None:
+            location = self.root
+        if len(self.locations) + len(nodes) - depth + 1 > MAX_LOCATIONS:
+            self.locations.clear()
+        for i in range(depth, len(nodes)):
+            location = location.get_child(nodes[i])
+            self.locations[keys[i + 1]] = location
+        self.locations[pointer] = location
+        return location
+
+
+def validate_at(schema, pointer, value):
+    """
+    Validates a value against the subschemas that govern a location of the documents of a schema.
+    :param schema: Schema object.
+    :param pointer: JSON Pointer string of the location.
+    :param value: Json value.
+    :return: Response object.
+    :raise ValueError: If the pointer is not a JSON Pointer, or an array schema on the way can't resolve it.
+    """
+
+    index = LOCATION_INDEXES.get(schema)
+    if index is None:
+        index = LOCATION_INDEXES.setdefault(schema, LocationIndex(schema))
+    return index.get_location(pointer).validate(value)
+
+
+def get_location_nodes(pointer):
+    """
+    :param pointer: JSON Pointer string, of RFC 6901 or a URI fragment.
+    :return: List of nodes, from the root of the document.
+    :raise ValueError: If it's not a JSON Pointer.
+    """
+
+    if not isinstance(pointer, str):
+        raise ValueError("Not a JSON Pointer: {!r}".format(pointer))
+    if JSONPointer.is_json_pointer(pointer):
+        nodes = JSONPointer.get_nodes_from_string(pointer)
+        return nodes[1:] if nodes[0] == "#" else nodes
+    return get_patch_nodes(pointer)
+
+
+def get_location_pointer(nodes):
+    """
+    :param nodes: List of nodes.
+    :return: JSON Pointer string of RFC 6901.
+    """
+
+    return "".join("/" + node.replace("~", "~0").replace("/", "~1") for node in nodes)
+
+
+def is_empty(schema):
+    """
+    :param schema: Schema object.
+    :return: True if the schema is valid against any value, like the default of items and additionalProperties.
+    """
+
+    return type(schema) is Schema and not (schema.enum or schema.anyOf or schema.allOf or schema.oneOf or schema._not)
+
+
+def get_children(schema, nodes, node):
+    """
+    :param schema: Schema object.
+    :param nodes: Nodes from the root schema to it.
+    :param node: Key or index of a child of its values.
+    :return: List of tuples (schema object, nodes from the root schema to it) of the subschemas that govern the child.
+    A tuple whose schema is None means no child is allowed at that node, and its nodes point to the keyword.
+    :raise ValueError: If the node is "-" and the schema has a list of items.
+    """
+
+    if type(schema) is LazySchema:
+        LazySchema.build(schema)
+    if type(schema) is OptimizedSchema:
+        schema = schema.original
+        if type(schema) is LazySchema:
+            LazySchema.build(schema)
+    children = []
+    # Like `Schema.validate_node`, allOf comes before the keywords of the type.
+    for i, child in enumerate(schema.allOf):
+        children.extend(get_children(child, nodes + schema.build_nodes(["allOf", i]), node))
+    schema_type = type(schema)
+    if schema_type is MultipleSchema:
+        array_schema = schema.schemas.get("array")
+        object_schema = schema.schemas.get("object")
+        may_be_array = (is_index(node) or node == "-") and (array_schema is not None or schema.validates_any)
+        may_be_object = object_schema is not None or schema.validates_any
+        if may_be_array and may_be_object:
+            # An index of an array is also a key of an object, and each type governs it with other subschemas, so
+            # neither is used.
+            pass
+        elif may_be_array:
+            if array_schema is not None:
+                children.extend(get_children(array_schema, nodes, node))
+        elif may_be_object:
+            if object_schema is not None:
+                children.extend(get_children(object_schema, nodes, node))
+        else:
+            children.append((None, nodes + ["type"]))
+    elif schema_type is ObjectSchema:
+        children.extend(get_object_children(schema, nodes, node))
+    elif schema_type is ArraySchema:
+        children.extend(get_array_children(schema, nodes, node))
+    elif schema_type is not Schema:
+        # Strings, numbers, booleans and null have no children.
+        children.append((None, nodes + schema.build_nodes(["type"])))
+    return children
+
+
+def get_object_children(schema, nodes, key):
+    """
+    :return: Subschemas of an ObjectSchema that govern the value of a key, like in `get_children`.
+    """
+
+    children = []
+    if key in schema.properties:
+        children.append((schema.properties[key], nodes + schema.build_nodes(["properties", key])))
+    for pattern in schema.get_key_patterns(key):
+        children.append((schema.patternProperties[pattern], nodes + ["patternProperties", pattern]))
+    if schema.key_is_additional_property(key):
+        additional_properties = schema.additionalProperties
+        if isinstance(additional_properties, bool):
+            if not additional_properties:
+                children.append((None, nodes + schema.build_nodes(["additionalProperties"])))
+        else:
+            children.append((additional_properties, nodes + schema.build_nodes(["additionalProperties", key])))
+    return children
+
+
+def get_array_children(schema, nodes, index):
+    """
+    :return: Subschemas of an ArraySchema that govern an item, like in `get_children`. The index "-" (past the end of
+    the array) is only resolved when every item has the same schema.
+    """
+
+    if not is_index(index) and index != "-":
+        return [(None, nodes + schema.build_nodes(["type"]))]
+    if not isinstance(schema.items, list):
+        return [(schema.items, nodes + schema.build_nodes(["items"]))]
+    if index == "-":
+        raise ValueError("The index \"-\" can't be resolved against a list of items.")
+    i = int(index)
+    if i < len(schema.items):
+        return [(schema.items[i], nodes + schema.build_nodes(["items", i]))]
+    if isinstance(schema.additionalItems, bool):
+        return [] if schema.additionalItems else [(None, nodes + ["additionalItems"])]
+    return [(schema.additionalItems, nodes + ["additionalItems"])]
+
+
+def is_index(node):
+    """
+    :param node: Node of a JSON Pointer.
+    :return: True if it's an array index of RFC 6901 (digits without leading zeros).
+    """
+
+    return node.isdigit() and node.isascii() and (node == "0" or node[0] != "0")
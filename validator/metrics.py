@@ -0,0 +1,433 @@
+'''
+Module providing the lightweight counters that the validator keeps about the documents it validates.
+'''
+import bisect
+import threading
+import weakref
+from .utils import JSONPointer, SchemaSource, get_json_hash
+
+
+DEFAULT_BUCKETS = [0.00001, 0.00005, 0.0001, 0.0005, 0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1.0, 5.0]
+"""Upper bounds (in seconds) of the latency histogram buckets."""
+
+NAME_KEYWORDS = ["properties", "patternProperties", "dependencies", "definitions"]
+"""Keywords whose next node in a schema pointer is a property name."""
+
+INDEX_KEYWORDS = ["anyOf", "allOf", "oneOf"]
+"""Keywords whose next node in a schema pointer is an index."""
+
+
+class Histogram:
+    """
+    Cumulative latency histogram.
+    """
+
+    def __init__(self, buckets):
+        """
+        :param buckets: Sorted list of the upper bounds of the buckets.
+        :return: None.
+        """
+
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        """Observations per bucket (not cumulative). The last one holds the observations larger than every bound."""
+
+        self.count = 0
+        self.sum = 0.0
+
+    def observe(self, value):
+        self.counts[bisect.bisect_left(self.buckets, value)] += 1
+        self.count += 1
+        self.sum += value
+
+    def add(self, histogram):
+        """
+        Adds the observations of another histogram with the same buckets.
+        :param histogram: Histogram object.
+        """
+
+        for i, count in enumerate(list(histogram.counts)):
+            self.counts[i] += count
+        self.count += histogram.count
+        self.sum += histogram.sum
+
+    def cumulative_counts(self):
+        """
+        :return: List of tuples (upper bound, observations lower or equal than it), ending with infinity.
+        """
+
+        cumulative = []
+        total = 0
+        for bound, count in zip(self.buckets + [float("inf")], self.counts):
+            total += count
+            cumulative.append((bound, total))
+        return cumulative
+
+
+class MetricsShard:
+    """
+    Counters recorded by one thread. Each thread writes only into its own shard, so recording needs no lock.
+    """
+
+    def __init__(self):
+        self.documents = {}
+        self.valid = {}
+        self.invalid = {}
+        self.failures = {}
+        self.latency = {}
+        self.remote_fetches = {}
+
+    def add(self, shard, buckets):
+        """
+        Adds the counters of another shard to this one.
+        :param shard: MetricsShard object.
+        :param buckets: Upper bounds of the latency histograms.
+        """
+
+        for name in ["documents", "valid", "invalid", "failures", "remote_fetches"]:
+            counter = getattr(self, name)
+            for key, count in list(getattr(shard, name).items()):
+                counter[key] = counter.get(key, 0) + count
+        for label, histogram in list(shard.latency.items()):
+            if label not in self.latency:
+                self.latency[label] = Histogram(buckets)
+            self.latency[label].add(histogram)
+
+
+class ShardOwner:
+    """
+    Object kept by a thread next to its MetricsShard. It's released when the thread ends, which retires the shard (see
+    `Metrics.get_shard`).
+    """
+
+
+class Metrics:
+    """
+    Counters of the validations performed through `Schema.validate`.
+
+    Threads record into their own MetricsShard and the counters are added up when they are read, so validating from
+    many threads neither loses counts nor contends on a lock. When a thread ends its shard is added to the one of the
+    threads that ended and dropped, so creating threads all the time doesn't make the shards grow.
+    """
+
+    def __init__(self, buckets=None):
+        """
+        :param buckets: Upper bounds of the latency histograms. `DEFAULT_BUCKETS` if it's None.
+        :return: None.
+        """
+
+        self.enabled = True
+        """If it's False `Schema.validate` does not record anything."""
+
+        self.buckets = sorted(buckets) if buckets is not None else DEFAULT_BUCKETS
+        self.__labels = weakref.WeakKeyDictionary()
+        # Reentrant, since releasing a thread-local storage while the lock is held (like `self.reset` does) retires
+        # its shards.
+        self.__lock = threading.RLock()
+        self.reset()
+
+    def reset(self):
+        """
+        Sets every counter to zero. Validations that are being recorded while the counters are reset may be lost.
+        """
+
+        with self.__lock:
+            self.__shards = []
+            self.__retired = MetricsShard()
+            self.__local = threading.local()
+
+    def get_shard(self):
+        """
+        :return: MetricsShard of the current thread.
+        """
+
+        local = self.__local
+        shard = getattr(local, "shard", None)
+        if shard is None:
+            shard = MetricsShard()
+            with self.__lock:
+                self.__shards.append(shard)
+            # The thread-local storage of a thread is released when it ends, and the owner with it.
+            local.owner = ShardOwner()
+            weakref.finalize(local.owner, self.__retire, shard)
+            local.shard = shard
+        return shard
+
+    def __retire(self, shard):
+        """
+        Adds the shard of a thread that ended to `self.__retired` and drops it. Shards from before a reset are only
+        dropped.
+        :param shard: MetricsShard object.
+        """
+
+        with self.__lock:
+            if shard in self.__shards:
+                self.__shards.remove(shard)
+                self.__retired.add(shard, self.buckets)
+
+    @property
+    def shards(self):
+        """Number of shards that are added up when the counters are read: one per live thread that recorded something
+        and the one of the threads that ended."""
+        return len(self.__shards) + 1
+
+    def __add_counters(self, name):
+        """
+        :param name: Name of a counter dict of the shards.
+        :return: Dict with the counter of every shard added up.
+        """
+
+        total = {}
+        # The lock keeps a shard from being counted twice while it's retired.
+        with self.__lock:
+            for shard in self.__shards + [self.__retired]:
+                for key, count in list(getattr(shard, name).items()):
+                    total[key] = total.get(key, 0) + count
+        return total
+
+    @property
+    def documents(self):
+        """Dict where each schema label holds how many documents were validated against it."""
+        return self.__add_counters("documents")
+
+    @property
+    def valid(self):
+        """Dict where each schema label holds how many valid documents were validated against it."""
+        return self.__add_counters("valid")
+
+    @property
+    def invalid(self):
+        """Dict where each schema label holds how many invalid documents were validated against it."""
+        return self.__add_counters("invalid")
+
+    @property
+    def failures(self):
+        """Dict where each (schema label, tuple of schema pointer nodes) key holds how many documents failed there. The
+        document keys that follow additionalProperties are not in the nodes, which are split into a pointer and a
+        keyword when the metrics are read (see `self.get_failures`)."""
+        return self.__add_counters("failures")
+
+    @property
+    def remote_fetches(self):
+        """Dict where each url holds how many times it was fetched."""
+        return self.__add_counters("remote_fetches")
+
+    @property
+    def latency(self):
+        """Dict where each schema label holds the Histogram of its validation times."""
+        latency = {}
+        with self.__lock:
+            for shard in self.__shards + [self.__retired]:
+                for label, histogram in list(shard.latency.items()):
+                    if label not in latency:
+                        latency[label] = Histogram(self.buckets)
+                    latency[label].add(histogram)
+        return latency
+
+    def get_label(self, schema):
+        """
+        Returns the label that identifies a top level schema: its id if it has one or the hash of its content.
+        :param schema: Schema object.
+        :return: string.
+        """
+
+        label = self.__labels.get(schema)
+        if label is None:
+            if schema.dict_schema is None and type(schema.whole_schema) is SchemaSource:
+                # Lean schemas don't keep their dicts, the label was computed when they were built.
+                label = schema.whole_schema.label
+            else:
+                label = get_json_label(schema.dict_schema)
+            with self.__lock:
+                self.__labels[schema] = label
+        return label
+
+    def record_validation(self, schema, response, elapsed):
+        """
+        Records a document validation.
+        :param schema: Schema object the document was validated against.
+        :param response: Response object of the validation.
+        :param elapsed: Seconds the validation took.
+        """
+
+        label = self.get_label(schema)
+        shard = self.get_shard()
+        shard.documents[label] = shard.documents.get(label, 0) + 1
+        if response.is_valid:
+            shard.valid[label] = shard.valid.get(label, 0) + 1
+        else:
+            shard.invalid[label] = shard.invalid.get(label, 0) + 1
+            nodes = response.schema_pointer.nodes
+            if "additionalProperties" in nodes:
+                nodes = strip_document_keys(nodes)
+            key = (label, tuple(nodes))
+            shard.failures[key] = shard.failures.get(key, 0) + 1
+        histogram = shard.latency.get(label)
+        if histogram is None:
+            histogram = shard.latency[label] = Histogram(self.buckets)
+        histogram.observe(elapsed)
+
+    def record_remote_fetch(self, url):
+        """
+        Records that a remote schema was fetched.
+        :param url: url of the schema.
+        """
+
+        shard = self.get_shard()
+        shard.remote_fetches[url] = shard.remote_fetches.get(url, 0) + 1
+
+    def get_failures(self):
+        """
+        :return: Dict where each (schema label, schema pointer, keyword) key holds how many documents failed there.
+        """
+
+        failures = {}
+        for (label, nodes), count in self.failures.items():
+            key = (label,) + split_schema_nodes(list(nodes))
+            failures[key] = failures.get(key, 0) + count
+        return failures
+
+    def as_dict(self):
+        """
+        :return: Dict with every counter.
+        """
+
+        return {
+            "documents": dict(self.documents),
+            "valid": dict(self.valid),
+            "invalid": dict(self.invalid),
+            "failures": [{"schema": label, "pointer": pointer, "keyword": keyword, "count": count}
+                         for (label, pointer, keyword), count in self.get_failures().items()],
+            "latency": {label: {"buckets": histogram.cumulative_counts(), "count": histogram.count,
+                                "sum": histogram.sum}
+                        for label, histogram in self.latency.items()},
+            "remote_fetches": dict(self.remote_fetches),
+        }
+
+    def to_prometheus(self):
+        """
+        Renders every counter in the Prometheus text exposition format.
+        :return: string.
+        """
+
+        lines = []
+        counters = [("validator_documents_total", "Documents validated.", self.documents),
+                    ("validator_documents_valid_total", "Valid documents.", self.valid),
+                    ("validator_documents_invalid_total", "Invalid documents.", self.invalid)]
+        for name, description, counter in counters:
+            lines.append("# HELP " + name + " " + description)
+            lines.append("# TYPE " + name + " counter")
+            for label, count in sorted(counter.items()):
+                lines.append(name + format_labels(schema=label) + " " + str(count))
+
+        lines.append("# HELP validator_failures_total Documents that failed per schema pointer and keyword.")
+        lines.append("# TYPE validator_failures_total counter")
+        for (label, pointer, keyword), count in sorted(self.get_failures().items()):
+            lines.append("validator_failures_total" + format_labels(schema=label, pointer=pointer, keyword=keyword) +
+                         " " + str(count))
+
+        lines.append("# HELP validator_validation_seconds Time spent validating documents.")
+        lines.append("# TYPE validator_validation_seconds histogram")
+        for label, histogram in sorted(self.latency.items()):
+            for bound, count in histogram.cumulative_counts():
+                le = "+Inf" if bound == float("inf") else repr(bound)
+                lines.append("validator_validation_seconds_bucket" + format_labels(schema=label, le=le) + " " +
+                             str(count))
+            lines.append("validator_validation_seconds_sum" + format_labels(schema=label) + " " + repr(histogram.sum))
+            lines.append("validator_validation_seconds_count" + format_labels(schema=label) + " " +
+                         str(histogram.count))
+
+        lines.append("# HELP validator_remote_fetches_total Remote schemas fetched.")
+        lines.append("# TYPE validator_remote_fetches_total counter")
+        for url, count in sorted(self.remote_fetches.items()):
+            lines.append("validator_remote_fetches_total" + format_labels(url=url) + " " + str(count))
+        return "\n".join(lines) + "\n"
+
+
+def get_json_label(json_schema):
+    """
+    Returns the label that identifies a top level schema dict in the metrics.
+    :param json_schema: Dict object.
+    :return: Its id if it has one, or the hash of its content.
+    """
+
+    schema_id = json_schema.get("id") if isinstance(json_schema, dict) else None
+    if isinstance(schema_id, str) and schema_id != "":
+        return schema_id
+    return "sha1:" + get_json_hash(json_schema)[:12]
+
+
+def format_labels(**labels):
+    """
+    :param labels: Label names and their values.
+    :return: Prometheus label set string.
+    """
+
+    pairs = []
+    for name, value in labels.items():
+        value = str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+        pairs.append(name + '="' + value + '"')
+    return "{" + ",".join(pairs) + "}"
+
+
+def split_schema_nodes(nodes):
+    """
+    Splits the nodes of the schema pointer of a failed Response into the pointer of the schema that failed and the
+    keyword that was not satisfied.
+    :param nodes: List of nodes of a schema pointer, without document keys (see `strip_document_keys`).
+    :return: Tuple (JSONPointer string, keyword).
+    """
+
+    keyword_index = None
+    i = 0
+    while i < len(nodes):
+        keyword_index = i
+        length = get_subschema_length(nodes, i)
+        if length == 0:
+            break
+        i += length
+    if keyword_index is None:
+        return "#", ""
+    return JSONPointer.get_string_from_nodes(nodes[:keyword_index]), str(nodes[keyword_index])
+
+
+def strip_document_keys(nodes):
+    """
+    Removes the keys of the document that follow additionalProperties in the nodes of a schema pointer. They are not
+    part of the schema, and each key of the documents would be counted as another failure.
+    :param nodes: List of nodes of a schema pointer.
+    :return: List of nodes.
+    """
+
+    stripped = []
+    i = 0
+    while i < len(nodes):
+        length = get_subschema_length(nodes, i)
+        if length == 0:
+            break
+        stripped.extend(nodes[i:i + length])
+        i += length + 1 if nodes[i] == "additionalProperties" else length
+    return stripped + nodes[i:]
+
+
+def get_subschema_length(nodes, i):
+    """
+    :param nodes: List of nodes of a schema pointer.
+    :param i: Index of a keyword in them.
+    :return: Number of nodes from the keyword to its subschema (2 for properties and a name, 1 for not), or 0 if the
+    keyword has no subschema.
+    """
+
+    node = nodes[i]
+    if node in NAME_KEYWORDS or node in INDEX_KEYWORDS:
+        return 2
+    if node == "items" and i + 1 < len(nodes) and isinstance(nodes[i + 1], int):
+        return 2
+    if node in ["not", "items", "additionalItems", "additionalProperties"]:
+        return 1
+    # Keywords like required are followed by the value that failed, not by a schema.
+    return 0
+
+
+METRICS = Metrics()
+"""Metrics that `Schema.validate` records into."""
@@ -0,0 +1,408 @@
+'''
+Module providing the optimizer that rewrites a built schema into an equivalent schema that's cheaper to validate.
+'''
+from .classes import Schema, ObjectSchema, ArraySchema, StringSchema, IntegerSchema, MultipleSchema, \
+    SOURCE_ATTRIBUTES, build_all, freeze_schema, walk_schema
+from .utils import JSONPointer, Response, FrozenList, FrozenDict
+
+
+SCALAR_TYPES = (str, int, float, bool, type(None))
+"""Types of the enum values that are folded. Containers are compared by `==`, which doesn't tell 1 from True inside
+them, so enums with containers are left as they are."""
+
+
+class OptimizedSchema(Schema):
+    """
+    Schema returned by `optimize`. Documents are validated against the optimized graph, and the ones that are not valid
+    are validated again against the original schema, so their Response is the same one the original schema returns.
+    """
+
+    def __init__(self, schema, optimized, unsatisfiable):
+        """
+        :param schema: Original Schema object.
+        :param optimized: Root of the optimized graph.
+        :param unsatisfiable: List of the JSONPointer strings of the subschemas that no document is valid against.
+        :return: None.
+        """
+
+        self.original = schema
+        self.optimized = optimized
+
+        self.unsatisfiable = unsatisfiable
+        """List of the JSONPointer strings (from the root of the original schema) of the subschemas that no document
+        is valid against."""
+
+        self.dict_schema = schema.dict_schema
+        self.whole_schema = schema.whole_schema
+        self.definitions = schema.definitions
+        self.path = schema.path
+        self.type = schema.type
+        self.enum = []
+        self.anyOf = []
+        self.allOf = []
+        self.oneOf = []
+        self._not = None
+
+    def get_children(self):
+        """
+        :return: List with the root of the optimized graph, which lies in the same place as this schema.
+        """
+
+        return [([], self.optimized)]
+
+    def validate_node(self, document):
+        """
+        Validates a document against the optimized graph, and against the original schema if it's not valid.
+        :param document: document to validate.
+        :return: Response object with pointers to the document and corresponding schema that failed (if it fails).
+        """
+
+        if self.optimized.validate_node(document).is_valid:
+            return Response(True, None, None)
+        return self.original.validate_node(document)
+
+
+class Optimizer:
+    """
+    Rewrites a copy of a schema graph until nothing else can be simplified:
+
+    * allOf members that are themselves only an allOf are flattened, and single member allOf, anyOf and oneOf schemas
+      are replaced by their member.
+    * Subschemas that every document is valid against (`{}`...) are dropped from allOf, properties,
+      additionalProperties... and an anyOf with one of them is dropped entirely.
+    * The checks of a schema whose enum only has scalars are folded into its enum: the values that fail them are
+      removed and the schema becomes a plain enum.
+    * Subschemas that no document is valid against (contradictory bounds, an empty folded enum, a required property
+      that can't be valid, an allOf with one of them...) are replaced by a schema that rejects everything, and they are
+      dropped from anyOf and oneOf.
+    * Schemas built for each type of a schema without `type` don't check the anyOf, allOf, oneOf, not and enum of
+      their parent again.
+
+    The original graph is not modified (it's immutable).
+    """
+
+    def __init__(self, schema):
+        """
+        :param schema: Schema object (lazy schemas are built entirely).
+        :return: None.
+        """
+
+        build_all(schema)
+        self.schema = schema
+        self.originals = {}
+        """Dict where the id of each copy holds the schema object it was copied from."""
+
+        self.replacements = {}
+        """Dict where the id of a replaced copy holds the schema object that replaces it."""
+
+        self.false = None
+        """Schema object that no document is valid against. Every unsatisfiable subschema is replaced by it."""
+
+        self.unsatisfiable = []
+        self.changed = False
+        self.__copies = {}
+        self.__pointers = {}
+
+    def run(self):
+        """
+        :return: Root of the optimized graph (frozen).
+        """
+
+        nodes = []
+        for schema_nodes, schema in walk_schema(self.schema):
+            nodes.append(self.__copy(schema))
+            self.__pointers.setdefault(id(schema), JSONPointer.get_string_from_nodes(schema_nodes))
+        self.false = self.__get_false_schema()
+        for node in nodes:
+            map_children(node, lambda child: self.__copies.get(id(child), child))
+            if type(node) is MultipleSchema:
+                for schema in node.schemas.values():
+                    # The schemas built for each type are only reached through their parent, which already checked
+                    # these keywords.
+                    schema.__dict__.update(anyOf=[], allOf=[], oneOf=[], enum=[], _not=None)
+        # Children come after their parents in `nodes`, so going backwards simplifies them first.
+        nodes.reverse()
+        self.changed = True
+        while self.changed:
+            self.changed = False
+            for node in nodes:
+                if id(node) not in self.replacements:
+                    self.__simplify(node)
+        root = self.resolve(nodes[-1])
+        return freeze_schema(root)
+
+    def resolve(self, node):
+        """
+        :param node: Copy of a schema object.
+        :return: The schema object that replaces it (itself if it was not replaced).
+        """
+
+        while id(node) in self.replacements:
+            node = self.replacements[id(node)]
+        return node
+
+    def is_true(self, node):
+        """
+        :return: True if every document is valid against the schema object.
+        """
+
+        return not has_combinators(node) and (type(node) is Schema or (type(node) is MultipleSchema and
+                                                                        node.validates_any and not node.schemas))
+
+    def is_false(self, node):
+        """
+        :return: True if the schema object is the one that no document is valid against.
+        """
+
+        return node is self.false
+
+    def __copy(self, schema):
+        copy = object.__new__(type(schema))
+        attributes = {}
+        for name, value in schema.__dict__.items():
+            if name == "frozen":
+                continue
+            if isinstance(value, FrozenList):
+                value = list(value)
+            elif isinstance(value, FrozenDict):
+                value = dict(value)
+            attributes[name] = value
+        copy.__dict__.update(attributes)
+        self.__copies[id(schema)] = copy
+        self.originals[id(copy)] = schema
+        return copy
+
+    def __get_false_schema(self):
+        false = object.__new__(Schema)
+        false.__dict__.update(dict_schema={"not": {}}, whole_schema=self.schema.whole_schema,
+                              definitions=self.schema.definitions, path="", type="", enum=[], anyOf=[], allOf=[],
+                              oneOf=[], _not=None)
+        true = object.__new__(Schema)
+        true.__dict__.update(false.__dict__, dict_schema={})
+        false.__dict__["_not"] = true
+        return false
+
+    def __replace(self, node, replacement):
+        original = self.originals.get(id(node))
+        if replacement is self.false and original is not None and id(original) in self.__pointers:
+            self.unsatisfiable.append(self.__pointers[id(original)])
+        self.replacements[id(node)] = replacement
+        self.changed = True
+
+    def __set(self, node, name, value):
+        if node.__dict__[name] != value:
+            node.__dict__[name] = value
+            self.changed = True
+
+    def __simplify(self, node):
+        """
+        Applies every rule to a schema object, replacing it if it becomes another schema.
+        """
+
+        map_children(node, self.resolve)
+        replacement = self.__fold_enum(node) or self.__simplify_combinators(node) or self.__simplify_type(node)
+        if replacement is not None:
+            self.__replace(node, replacement)
+
+    def __fold_enum(self, node):
+        if not node.enum or not all(isinstance(value, SCALAR_TYPES) for value in node.enum):
+            return None
+        if type(node) is Schema and not has_combinators(node, enum=False):
+            return None
+        original = self.originals.get(id(node))
+        if original is None:
+            return None
+        values = [value for value in node.enum if original.validate_node(value).is_valid]
+        if not values:
+            return self.false
+        folded = object.__new__(Schema)
+        folded.__dict__.update(dict_schema=node.dict_schema, whole_schema=node.whole_schema,
+                               definitions=node.definitions, path=node.path, type="", enum=values, anyOf=[], allOf=[],
+                               oneOf=[], _not=None)
+        self.originals[id(folded)] = original
+        return folded
+
+    def __simplify_combinators(self, node):
+        if node.allOf:
+            members = []
+            pending = list(reversed(node.allOf))
+            while pending:
+                member = pending.pop()
+                if self.is_false(member):
+                    return self.false
+                if is_only_all_of(member) and member is not node:
+                    pending.extend(reversed(member.allOf))
+                elif not self.is_true(member):
+                    members.append(member)
+            self.__set(node, "allOf", members)
+        if node.anyOf:
+            members = [member for member in node.anyOf if not self.is_false(member)]
+            if not members:
+                return self.false
+            if any(self.is_true(member) for member in members):
+                members = []
+            self.__set(node, "anyOf", members)
+        if node.oneOf:
+            members = [member for member in node.oneOf if not self.is_false(member)]
+            if not members:
+                return self.false
+            self.__set(node, "oneOf", members)
+        if node._not is not None:
+            if self.is_true(node._not):
+                return self.false
+            if self.is_false(node._not):
+                self.__set(node, "_not", None)
+        if is_combinator(node) and not node.enum and node._not is None:
+            keywords = [keyword for keyword in [node.allOf, node.anyOf, node.oneOf] if keyword]
+            if len(keywords) == 1 and len(keywords[0]) == 1 and keywords[0][0] is not node:
+                return keywords[0][0]
+        return None
+
+    def __simplify_type(self, node):
+        node_type = type(node)
+        if issubclass(node_type, IntegerSchema):
+            if has_empty_range(node.minimum, node.maximum, node.exclusiveMinimum or node.exclusiveMaximum):
+                return self.false
+        elif node_type is StringSchema:
+            if has_empty_range(node.minLength, node.maxLength, False):
+                return self.false
+        elif node_type is ArraySchema:
+            if has_empty_range(node.minItems, node.maxItems, False):
+                return self.false
+            if isinstance(node.additionalItems, Schema) and self.is_true(node.additionalItems):
+                self.__set(node, "additionalItems", True)
+        elif node_type is ObjectSchema:
+            return self.__simplify_object(node)
+        elif node_type is MultipleSchema:
+            return self.__simplify_multiple(node)
+        return None
+
+    def __simplify_object(self, node):
+        if has_empty_range(node.minProperties, node.maxProperties, False):
+            return self.false
+        if node.maxProperties is not None and len(set(node.required)) > node.maxProperties:
+            return self.false
+        for key in node.required:
+            if key in node.properties and self.is_false(node.properties[key]):
+                return self.false
+        if isinstance(node.additionalProperties, Schema) and self.is_true(node.additionalProperties):
+            self.__set(node, "additionalProperties", True)
+        self.__set(node, "schema_dependencies", {key: schema for key, schema in node.schema_dependencies.items()
+                                                 if not self.is_true(schema)})
+        if node.additionalProperties is True:
+            # Keys that are not declared are valid, so declaring them with a schema that accepts anything is useless.
+            self.__set(node, "properties", {key: schema for key, schema in node.properties.items()
+                                            if not self.is_true(schema)})
+            self.__set(node, "patternProperties", {key: schema for key, schema in node.patternProperties.items()
+                                                   if not self.is_true(schema)})
+        return None
+
+    def __simplify_multiple(self, node):
+        schemas = {schema_type: schema for schema_type, schema in node.schemas.items()
+                   if not (node.validates_any and accepts_its_type(schema))}
+        self.__set(node, "schemas", schemas)
+        if not node.validates_any and schemas and all(self.is_false(schema) for schema in schemas.values()) and \
+                "boolean" not in schemas and "null" not in schemas:
+            return self.false
+        return None
+
+
+def optimize(schema):
+    """
+    Rewrites a schema into an equivalent one that's cheaper to validate (see `Optimizer`). Every document is valid
+    against the optimized schema if and only if it's valid against `schema`, and the responses of the invalid ones are
+    the same.
+    :param schema: Schema object.
+    :return: OptimizedSchema object. Its `unsatisfiable` attribute lists the subschemas no document is valid against.
+    """
+
+    optimizer = Optimizer(schema)
+    optimized = optimizer.run()
+    return freeze_schema(OptimizedSchema(schema, optimized, optimizer.unsatisfiable))
+
+
+def map_children(node, function):
+    """
+    Replaces every schema object that a schema object holds (directly or inside a list or a dict) by the result of a
+    function.
+    :param node: Schema object that's not frozen.
+    :param function: Function that receives a schema object and returns a schema object.
+    """
+
+    for name, value in list(node.__dict__.items()):
+        if name in SOURCE_ATTRIBUTES or name == "definitions":
+            continue
+        if isinstance(value, Schema):
+            node.__dict__[name] = function(value)
+        elif isinstance(value, list):
+            node.__dict__[name] = [function(item) if isinstance(item, Schema) else item for item in value]
+        elif isinstance(value, dict):
+            node.__dict__[name] = {key: function(item) if isinstance(item, Schema) else item
+                                   for key, item in value.items()}
+
+
+def has_combinators(node, enum=True):
+    """
+    :param node: Schema object.
+    :param enum: Whether an enum counts.
+    :return: True if the schema has anyOf, allOf, oneOf, not (or enum).
+    """
+
+    return bool(node.anyOf or node.allOf or node.oneOf or node._not is not None or (enum and node.enum))
+
+
+def is_combinator(node):
+    """
+    :param node: Schema object.
+    :return: True if the schema has no keyword besides anyOf, allOf, oneOf, not and enum.
+    """
+
+    return type(node) is Schema or (type(node) is MultipleSchema and node.validates_any and not node.schemas)
+
+
+def is_only_all_of(node):
+    """
+    :param node: Schema object.
+    :return: True if allOf is the only keyword of the schema, so its members can be moved to the allOf of its parent.
+    """
+
+    return is_combinator(node) and bool(node.allOf) and not node.anyOf and not node.oneOf and node._not is None and \
+        not node.enum
+
+
+def accepts_its_type(schema):
+    """
+    :param schema: Schema object built for one of the types of a schema without `type`.
+    :return: True if every document of its type is valid against it.
+    """
+
+    if has_combinators(schema):
+        return False
+    schema_type = type(schema)
+    if schema_type is ObjectSchema:
+        return not schema.required and not schema.properties and schema.minProperties is None and \
+            schema.maxProperties is None and not schema.property_dependencies and not schema.schema_dependencies and \
+            schema.additionalProperties is True and not schema.patternProperties
+    if schema_type is ArraySchema:
+        return not isinstance(schema.items, list) and type(schema.items) is Schema and \
+            not has_combinators(schema.items) and schema.minItems is None and schema.maxItems is None and \
+            not schema.uniqueItems
+    if schema_type is StringSchema:
+        return schema.minLength is None and schema.maxLength is None and schema.pattern is None and \
+            schema.format_checker is None
+    if issubclass(schema_type, IntegerSchema):
+        return schema.multipleOf is None and schema.minimum is None and schema.maximum is None
+    return False
+
+
+def has_empty_range(minimum, maximum, exclusive):
+    """
+    :param minimum: Lower bound or None.
+    :param maximum: Upper bound or None.
+    :param exclusive: Whether one of the bounds is exclusive.
+    :return: True if no value is within the bounds.
+    """
+
+    if minimum is None or maximum is None:
+        return False
+    return minimum > maximum or (exclusive and minimum == maximum)
@@ -0,0 +1,199 @@
+'''
+Module providing JSON Patch (RFC 6902), which applies a list of operations to a json document, copying only the
+containers the operations go through so the new document shares the rest with the old one.
+'''
+import copy
+
+
+OPERATIONS = ["add", "remove", "replace", "move", "copy", "test"]
+"""Operations of JSON Patch."""
+
+
+def apply_patch(document, patch, in_place=False):
+    """
+    Applies a JSON Patch. By default the document is not modified: the containers on the path of each operation are
+    copied, and the rest of the new document is shared with the old one.
+    :param document: Any json object.
+    :param patch: List of operations, dicts with "op", "path" and "value" or "from".
+    :param in_place: If it's True the containers of the document are modified instead of copied, which doesn't cost
+    the size of the containers on the paths. If an operation fails, the ones before it are already applied.
+    :return: The new json object (the same one if it's modified in place, unless the root is replaced).
+    :raise ValueError: If an operation is not valid, its path doesn't exist or a test fails.
+    """
+
+    copied = None if in_place else set()
+    for operation in patch:
+        document = apply_operation(document, operation, copied)
+    return document
+
+
+def get_operation(operation):
+    """
+    :param operation: Operation of a JSON Patch.
+    :return: Tuple (name of the operation, nodes of its path, nodes of its from path or None).
+    :raise ValueError: If the operation is not valid.
+    """
+
+    if not isinstance(operation, dict) or not isinstance(operation.get("path"), str):
+        raise ValueError("Not a JSON Patch operation: {!r}".format(operation))
+    op = operation.get("op")
+    if op not in OPERATIONS:
+        raise ValueError("Unknown JSON Patch operation: {!r}".format(op))
+    if op in ("add", "replace", "test") and "value" not in operation:
+        raise ValueError("The {} operation needs a value.".format(op))
+    path = get_patch_nodes(operation["path"])
+    source = None
+    if op == "move" or op == "copy":
+        if not isinstance(operation.get("from"), str):
+            raise ValueError("The {} operation needs a from path.".format(op))
+        source = get_patch_nodes(operation["from"])
+        if op == "move" and path[:len(source)] == source and len(path) > len(source):
+            raise ValueError("A value can't be moved into itself.")
+    return op, path, source
+
+
+def apply_operation(document, operation, copied=None):
+    """
+    :param document: Any json object.
+    :param operation: Operation of a JSON Patch.
+    :param copied: Set of the ids of the containers this patch already copied, or None to modify them in place.
+    :return: The new json object.
+    """
+
+    op, path, source = get_operation(operation)
+    if op == "add":
+        document = set_patch_value(document, path, copy.deepcopy(operation["value"]), copied, True)
+    elif op == "remove":
+        document = remove_patch_value(document, path, copied)[0]
+    elif op == "replace":
+        get_patch_value(document, path)
+        document = set_patch_value(document, path, copy.deepcopy(operation["value"]), copied, False)
+    elif op == "move":
+        document, value = remove_patch_value(document, source, copied)
+        document = set_patch_value(document, path, value, copied, True)
+    elif op == "copy":
+        value = copy.deepcopy(get_patch_value(document, source))
+        document = set_patch_value(document, path, value, copied, True)
+    elif not same_json(get_patch_value(document, path), operation["value"]):
+        raise ValueError("Test failed at {}.".format(operation["path"]))
+    return document
+
+
+def get_patch_nodes(path):
+    """
+    :param path: JSON Pointer of RFC 6901 ("" or "/a/b").
+    :return: List of nodes.
+    """
+
+    if path == "":
+        return []
+    if path[0] != "/":
+        raise ValueError("Not a JSON Pointer: {!r}".format(path))
+    return [node.replace("~1", "/").replace("~0", "~") for node in path[1:].split("/")]
+
+
+def get_patch_value(document, nodes):
+    """
+    :param document: Any json object.
+    :param nodes: List of nodes.
+    :return: The value the nodes point to.
+    """
+
+    for node in nodes:
+        document = document[get_patch_key(document, node, False)]
+    return document
+
+
+def get_patch_key(container, node, adding):
+    """
+    :param container: Dict or list.
+    :param node: Node of a JSON Pointer.
+    :param adding: True if the key is the place of an add, where the end of a list ("-" or its length) is valid.
+    :return: The key or index of the container the node refers to.
+    """
+
+    if isinstance(container, dict):
+        if not adding and node not in container:
+            raise ValueError("The path doesn't exist: {!r} is not a key.".format(node))
+        return node
+    if isinstance(container, list):
+        if adding and node == "-":
+            return len(container)
+        if not node.isdigit() or (node != "0" and node[0] == "0"):
+            raise ValueError("Not an index of a list: {!r}.".format(node))
+        index = int(node)
+        if index > len(container) or (index == len(container) and not adding):
+            raise ValueError("Index out of range: {}.".format(index))
+        return index
+    raise ValueError("The path doesn't exist: {!r} is not in a container.".format(node))
+
+
+def copy_patch_path(document, nodes, copied):
+    """
+    Copies the containers from the root to the parent of the last node, reusing the ones this patch already copied.
+    If `copied` is None nothing is copied.
+    :return: Tuple (new document, parent container).
+    """
+
+    if copied is not None and id(document) not in copied:
+        document = copy.copy(document)
+        copied.add(id(document))
+    parent = document
+    for node in nodes[:-1]:
+        key = get_patch_key(parent, node, False)
+        child = parent[key]
+        if not isinstance(child, (dict, list)):
+            raise ValueError("The path doesn't exist: {!r} is not a container.".format(node))
+        if copied is not None and id(child) not in copied:
+            child = parent[key] = copy.copy(child)
+            copied.add(id(child))
+        parent = child
+    return document, parent
+
+
+def set_patch_value(document, nodes, value, copied, adding):
+    """
+    :return: The new document, with `value` in the place of the nodes (inserted in lists if `adding` is True).
+    """
+
+    if not nodes:
+        return value
+    document, parent = copy_patch_path(document, nodes, copied)
+    key = get_patch_key(parent, nodes[-1], adding)
+    if isinstance(parent, list) and adding:
+        parent.insert(key, value)
+    else:
+        parent[key] = value
+    return document
+
+
+def remove_patch_value(document, nodes, copied):
+    """
+    :return: Tuple (new document without the value the nodes point to, removed value).
+    """
+
+    if not nodes:
+        raise ValueError("The root of a document can't be removed.")
+    document, parent = copy_patch_path(document, nodes, copied)
+    key = get_patch_key(parent, nodes[-1], False)
+    value = parent.pop(key)
+    return document, value
+
+
+def same_json(json_object, other):
+    """
+    :param json_object: Any json object.
+    :param other: Any json object.
+    :return: True if both are the same object or equal json (the type of the numbers matters: 1 is not True).
+    """
+
+    if json_object is other:
+        return True
+    if type(json_object) is not type(other):
+        return False
+    if isinstance(json_object, dict):
+        return json_object.keys() == other.keys() and all(same_json(value, other[key])
+                                                          for key, value in json_object.items())
+    if isinstance(json_object, list):
+        return len(json_object) == len(other) and all(same_json(a, b) for a, b in zip(json_object, other))
+    return json_object == other
@@ -0,0 +1,248 @@
+'''
+Module providing an opt-in profiler that reports where the time of a validation is spent.
+'''
+import time
+from .classes import Schema, ObjectSchema, ArraySchema, IntegerSchema, NumberSchema, StringSchema, BooleanSchema, \
+    NullSchema, MultipleSchema, walk_schema
+from .utils import JSONPointer
+
+
+PROFILED_CLASSES = [Schema, ObjectSchema, ArraySchema, IntegerSchema, NumberSchema, StringSchema, BooleanSchema,
+                    NullSchema, MultipleSchema]
+"""Classes whose `validate_*` methods are wrapped while a profiler is enabled."""
+
+KEYWORDS = {
+    "validate_node": "validate",
+    "validate_any_of": "anyOf",
+    "validate_one_of": "oneOf",
+    "validate_all_of": "allOf",
+    "validate_not": "not",
+    "validate_enum": "enum",
+    "validate_type": "type",
+    "validate_required_properties": "required",
+    "validate_properties": "properties",
+    "validate_min_properties": "minProperties",
+    "validate_max_properties": "maxProperties",
+    "validate_dependencies": "dependencies",
+    "validate_additional_properties": "additionalProperties",
+    "validate_pattern_properties": "patternProperties",
+    "validate_items": "items",
+    "validate_additional_items": "additionalItems",
+    "validate_min_items": "minItems",
+    "validate_max_items": "maxItems",
+    "validate_unique_items": "uniqueItems",
+    "validate_multiple_of": "multipleOf",
+    "validate_minimum": "minimum",
+    "validate_maximum": "maximum",
+    "validate_min_len": "minLength",
+    "validate_max_len": "maxLength",
+    "validate_pattern": "pattern",
+    "validate_format": "format",
+}
+"""Keyword reported for each profiled method. Methods that are not listed are reported with their own name."""
+
+UNPROFILED_METHODS = {"validate_property_dependencies", "validate_schema_dependencies"}
+"""Methods that are not wrapped because they are parts of the check of another method (validate_dependencies), which
+is the one reported for their keyword."""
+
+CALLS = 0
+TOTAL = 1
+SELF = 2
+
+
+class Profiler:
+    """
+    Profiler that measures the cumulative time and the number of calls of each (schema pointer, keyword) pair.
+
+    While it is not enabled the schema classes are left untouched, so it has no overhead. It can be used as a context
+    manager:
+
+        with Profiler(schema) as profiler:
+            schema.validate(document)
+        print(profiler.table())
+    """
+
+    active = None
+    """Profiler that is currently enabled (only one can be enabled at a time)."""
+
+    def __init__(self, schema=None):
+        """
+        :param schema: Schema object whose nodes are going to be reported by their pointer. More schemas can be added
+        with `self.add_schema`.
+        :return: None.
+        """
+
+        self.stats = {}
+        """Dict where each (pointer, keyword) key holds a list with its calls, total time and self time."""
+
+        self.stacks = {}
+        """Dict where each collapsed stack holds the self time spent on it."""
+
+        self.__pointers = {}
+        self.__frames = []
+        self.__children_time = []
+        self.__originals = []
+        if schema is not None:
+            self.add_schema(schema)
+
+    def add_schema(self, schema):
+        """
+        Registers the pointer of every schema object reachable from `schema`.
+        :param schema: Schema object.
+        """
+
+        for nodes, node in walk_schema(schema):
+            if id(node) not in self.__pointers:
+                self.__pointers[id(node)] = (node, JSONPointer.get_string_from_nodes(nodes))
+
+    def get_pointer(self, schema):
+        """
+        :param schema: Schema object.
+        :return: JSONPointer string of the schema object. If it was not registered its reference path is used instead.
+        """
+
+        if id(schema) in self.__pointers:
+            return self.__pointers[id(schema)][1]
+        if not schema.path_is_empty():
+            return schema.path
+        return "?"
+
+    def enable(self):
+        """
+        Wraps the `validate_*` methods of the schema classes so their calls are measured.
+        """
+
+        if Profiler.active is not None:
+            raise RuntimeError("Another profiler is already enabled.")
+        Profiler.active = self
+        for schema_class in PROFILED_CLASSES:
+            for name, function in list(vars(schema_class).items()):
+                if name.startswith("validate_") and name not in UNPROFILED_METHODS and callable(function):
+                    self.__originals.append((schema_class, name, function))
+                    setattr(schema_class, name, self.__wrap(name, function))
+
+    def disable(self):
+        """
+        Restores the original methods of the schema classes.
+        """
+
+        for schema_class, name, function in self.__originals:
+            setattr(schema_class, name, function)
+        self.__originals = []
+        if Profiler.active is self:
+            Profiler.active = None
+
+    def __enter__(self):
+        self.enable()
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.disable()
+
+    def __wrap(self, name, function):
+        keyword = KEYWORDS.get(name, name)
+        profiler = self
+
+        def wrapper(schema, *args, **kwargs):
+            # `super().validate_node` is accounted for in the frame of the subclass' validate_node. A subclass that
+            # inherits the method (NumberSchema) gets its frame from the wrapper of the class that defines it.
+            if name == "validate_node" and type(schema).validate_node is not wrapper:
+                return function(schema, *args, **kwargs)
+            profiler.__frames.append((profiler.get_pointer(schema), keyword))
+            profiler.__children_time.append(0.0)
+            start = time.perf_counter()
+            try:
+                return function(schema, *args, **kwargs)
+            finally:
+                profiler.__record(time.perf_counter() - start)
+
+        wrapper.__name__ = function.__name__
+        wrapper.__doc__ = function.__doc__
+        return wrapper
+
+    def __record(self, elapsed):
+        """
+        Records the time of the innermost frame and removes it from the current stack.
+        :param elapsed: Seconds spent on the frame.
+        """
+
+        stack_key = ";".join(self.__frame_label(frame) for frame in self.__frames)
+        frame = self.__frames.pop()
+        self_time = elapsed - self.__children_time.pop()
+        if self.__children_time:
+            self.__children_time[-1] += elapsed
+        if frame not in self.stats:
+            self.stats[frame] = [0, 0.0, 0.0]
+        stat = self.stats[frame]
+        stat[CALLS] += 1
+        stat[SELF] += self_time
+        # Recursive frames are only counted once in the total time.
+        if frame not in self.__frames:
+            stat[TOTAL] += elapsed
+        self.stacks[stack_key] = self.stacks.get(stack_key, 0.0) + self_time
+
+    @staticmethod
+    def __frame_label(frame):
+        pointer, keyword = frame
+        label = pointer if keyword == "validate" else pointer + " " + keyword
+        return label.replace(";", ":")
+
+    def reset(self):
+        """
+        Clears every measure taken so far.
+        """
+
+        self.stats = {}
+        self.stacks = {}
+
+    def sorted_stats(self, sort_by=TOTAL):
+        """
+        :param sort_by: `CALLS`, `TOTAL` or `SELF`.
+        :return: List of tuples (pointer, keyword, calls, total time, self time) sorted in descending order.
+        """
+
+        rows = [(pointer, keyword, stat[CALLS], stat[TOTAL], stat[SELF])
+                for (pointer, keyword), stat in self.stats.items()]
+        rows.sort(key=lambda row: row[2 + sort_by], reverse=True)
+        return rows
+
+    def table(self, sort_by=TOTAL, limit=None):
+        """
+        Builds a table with the measures taken so far.
+        :param sort_by: `CALLS`, `TOTAL` or `SELF`.
+        :param limit: Maximum number of rows. None means every row.
+        :return: string.
+        """
+
+        rows = self.sorted_stats(sort_by)
+        if limit is not None:
+            rows = rows[:limit]
+        lines = ["{:>10} {:>12} {:>12} {:>12}  {}".format("calls", "total (ms)", "self (ms)", "per call (us)",
+                                                         "schema pointer / keyword")]
+        for pointer, keyword, calls, total, self_time in rows:
+            lines.append("{:>10} {:>12.3f} {:>12.3f} {:>12.3f}  {} {}".format(calls, total * 1e3, self_time * 1e3,
+                                                                             total * 1e6 / calls, pointer, keyword))
+        return "\n".join(lines)
+
+    def collapsed_stacks(self):
+        """
+        Builds the measures in the collapsed stack format used by flamegraph tools (one stack per line followed by its
+        self time in microseconds).
+        :return: string.
+        """
+
+        lines = []
+        for stack, self_time in sorted(self.stacks.items()):
+            microseconds = int(round(self_time * 1e6))
+            if microseconds > 0:
+                lines.append(stack + " " + str(microseconds))
+        return "\n".join(lines) + "\n"
+
+    def write_collapsed_stacks(self, path):
+        """
+        Writes `self.collapsed_stacks()` into a file.
+        :param path: Path of the file.
+        """
+
+        with open(path, "w", encoding="utf-8") as f:
+            f.write(self.collapsed_stacks())
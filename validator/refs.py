@@ -0,0 +1,262 @@
+'''
+Module providing the graph of the subschemas of a schema that's used to find unproductive $ref cycles.
+'''
+from .utils import JSONPointer
+
+
+SUBSCHEMA_KEYWORDS = {
+    "anyOf": (True, list),
+    "allOf": (True, list),
+    "oneOf": (True, list),
+    "not": (True, None),
+    "dependencies": (True, dict),
+    "properties": (False, dict),
+    "patternProperties": (False, dict),
+    "definitions": (False, dict),
+    "additionalProperties": (False, None),
+    "additionalItems": (False, None),
+    "items": (False, list),
+}
+"""Keywords that hold subschemas. Each one holds whether its subschemas are applied to the same instance as their schema
+and the container of its subschemas (a list, a dict or None if the value is the subschema). A value of another type is
+taken as a single subschema."""
+
+
+class ReferenceGraph:
+    """
+    Graph whose vertices are every subschema location of a schema (including the targets of its JSONPointer
+    references) and whose edges go from a schema to the subschemas that are applied to the same instance: the target of
+    its $ref and its allOf, anyOf, oneOf, not and dependencies subschemas.
+
+    A cycle in this graph is a schema that requires itself to validate the same instance, so its validation would never
+    end. Cycles that go through properties, items... validate a smaller part of the document on each step, so they are
+    not edges of the graph. The graph is built and searched in O(V + E).
+
+    With a registry, references to other files or urls are followed too, so cycles across documents are found. Only the
+    subschemas of the other documents that are applied to the same instance as a reference target are vertices: a cycle
+    that goes through this schema only has those, and the other cycles are found when their documents are built.
+    """
+
+    def __init__(self, json_schema, whole_schema=None, nodes=None, registry=None):
+        """
+        :param json_schema: Dict object.
+        :param whole_schema: The whole schema the JSONPointers are resolved against (`json_schema` if it's None).
+        :param nodes: Nodes from the whole schema to `json_schema`, which locate it in the pointers of the vertices.
+        :param registry: SchemaRegistry object whose documents the references to other files or urls are resolved
+        against. If it's None those references are not followed.
+        :return: None.
+        """
+
+        self.whole_schema = whole_schema if whole_schema is not None else json_schema
+
+        self.registry = registry
+        """SchemaRegistry object or None."""
+
+        self.pointers = {}
+        """Dict where each JSONPointer reference holds the subschema it resolves to."""
+
+        self.vertices = []
+        """List of the subschema dicts. A vertex is identified by its index in this list."""
+
+        self.edges = []
+        """List where each vertex index holds the list of vertex indexes applied to the same instance."""
+
+        self.parents = []
+        """List where each vertex index holds a tuple (parent vertex index, nodes from the parent) that locates it. The
+        parent index is None for the root and for the targets of references, whose nodes are their JSONPointer
+        string (preceded by the uri of their document if it's another one)."""
+
+        self.documents = []
+        """List where each vertex index holds None if it's a subschema of the whole schema, or a tuple (uri, dict) of
+        the other document it belongs to."""
+
+        self.__indexes = {}
+        self.__targets = {}
+        self.__build(json_schema, nodes or [])
+
+    def resolve(self, reference):
+        """
+        :param reference: JSONPointer string.
+        :return: Subschema of `self.whole_schema` it points to. Pointers are resolved once.
+        """
+
+        target = self.pointers.get(reference)
+        if target is None:
+            target = self.pointers[reference] = JSONPointer(self.whole_schema, reference).get_json()
+        return target
+
+    def get_cycles(self):
+        """
+        Finds the strongly connected components of the graph that contain a cycle (Tarjan's algorithm, without
+        recursion so long chains of references don't reach the recursion limit).
+        :return: List of cycles, each one a list of vertex indexes.
+        """
+
+        size = len(self.vertices)
+        order = [-1] * size
+        low = [0] * size
+        on_stack = [False] * size
+        stack = []
+        cycles = []
+        counter = 0
+        for root in range(size):
+            if order[root] != -1:
+                continue
+            work = [(root, 0)]
+            while work:
+                vertex, edge = work[-1]
+                if edge == 0:
+                    order[vertex] = low[vertex] = counter
+                    counter += 1
+                    stack.append(vertex)
+                    on_stack[vertex] = True
+                edges = self.edges[vertex]
+                if edge < len(edges):
+                    work[-1] = (vertex, edge + 1)
+                    child = edges[edge]
+                    if order[child] == -1:
+                        work.append((child, 0))
+                    elif on_stack[child] and order[child] < low[vertex]:
+                        low[vertex] = order[child]
+                    continue
+                work.pop()
+                if work:
+                    parent = work[-1][0]
+                    if low[vertex] < low[parent]:
+                        low[parent] = low[vertex]
+                if low[vertex] == order[vertex]:
+                    component = []
+                    while True:
+                        member = stack.pop()
+                        on_stack[member] = False
+                        component.append(member)
+                        if member == vertex:
+                            break
+                    if len(component) > 1 or vertex in edges:
+                        component.reverse()
+                        cycles.append(component)
+        return cycles
+
+    def get_pointer(self, vertex):
+        """
+        :param vertex: Vertex index.
+        :return: JSONPointer string of the vertex.
+        """
+
+        nodes = []
+        uri = ""
+        while vertex is not None:
+            parent, parent_nodes = self.parents[vertex]
+            if isinstance(parent_nodes, str):
+                uri, _, fragment = parent_nodes.partition("#")
+                parent_nodes = JSONPointer.get_nodes_from_string("#" + fragment)
+            nodes = parent_nodes + nodes
+            vertex = parent
+        return uri + JSONPointer.get_string_from_nodes(nodes)
+
+    def __get_vertex(self, json_schema, parent, nodes, pending, document=None):
+        """
+        Returns the index of a subschema, adding it to the graph (and to `pending`) if it was not there.
+        """
+
+        index = self.__indexes.get(id(json_schema))
+        if index is None:
+            index = self.__indexes[id(json_schema)] = len(self.vertices)
+            self.vertices.append(json_schema)
+            self.edges.append([])
+            self.parents.append((parent, nodes))
+            self.documents.append(document)
+            pending.append(index)
+        return index
+
+    def __get_target(self, reference, document):
+        """
+        :param reference: $ref string of a vertex.
+        :param document: None or tuple (uri, dict) of the other document the vertex belongs to.
+        :return: Tuple (subschema the reference points to or None if it's not followed, its document like `document`,
+        string that locates it).
+        """
+
+        if JSONPointer.is_json_pointer(reference):
+            if document is None:
+                return self.resolve(reference), None, reference
+            uri, other_document = document
+            return JSONPointer(other_document, reference).get_json(), document, uri + reference
+        if self.registry is None:
+            return None, None, reference
+        resolved = self.__targets.get(reference)
+        if resolved is None:
+            uri, other_document, target = self.registry.resolve(reference)
+            resolved = self.__targets[reference] = (target, (uri, other_document), reference)
+        return resolved
+
+    def __build(self, json_schema, nodes):
+        if not isinstance(json_schema, dict):
+            return
+        pending = []
+        self.__get_vertex(json_schema, None, nodes, pending)
+        while pending:
+            index = pending.pop()
+            current = self.vertices[index]
+            document = self.documents[index]
+            edges = self.edges[index]
+            for nodes, subschema, in_place in get_subschemas(current):
+                if in_place == "$ref":
+                    target, target_document, location = self.__get_target(subschema, document)
+                    if isinstance(target, dict):
+                        edges.append(self.__get_vertex(target, None, location, pending, target_document))
+                elif isinstance(subschema, dict) and (in_place or document is None):
+                    child = self.__get_vertex(subschema, index, nodes, pending, document)
+                    if in_place:
+                        edges.append(child)
+
+
+def get_subschemas(json_schema):
+    """
+    Returns the subschemas of a schema.
+    :param json_schema: Dict object.
+    :return: List of tuples (nodes from the schema, subschema, whether it's applied to the same instance). A $ref is
+    returned as its string with "$ref" in the last element. Values that are not dicts are not filtered out.
+    """
+
+    if "$ref" in json_schema:
+        # The other keywords of a schema with a $ref are ignored.
+        reference = json_schema["$ref"]
+        return [(["$ref"], reference, "$ref")] if isinstance(reference, str) else []
+    subschemas = []
+    for keyword, value in json_schema.items():
+        kind = SUBSCHEMA_KEYWORDS.get(keyword)
+        if kind is None:
+            continue
+        in_place, container = kind
+        if isinstance(value, list) and container is list:
+            subschemas.extend(([keyword, i], subschema, in_place) for i, subschema in enumerate(value))
+        elif isinstance(value, dict) and container is dict:
+            subschemas.extend(([keyword, key], subschema, in_place) for key, subschema in value.items())
+        elif container is not dict:
+            subschemas.append(([keyword], value, in_place))
+    return subschemas
+
+
+def get_external_references(json_schema):
+    """
+    Returns the references of a document that point to other files or urls (the documents they point to are not
+    read).
+    :param json_schema: Dict object.
+    :return: List of strings, without repetitions.
+    """
+
+    references = []
+    seen = set()
+    pending = [json_schema]
+    while pending:
+        current = pending.pop()
+        if isinstance(current, dict):
+            reference = current.get("$ref")
+            if isinstance(reference, str) and not JSONPointer.is_json_pointer(reference) and reference not in seen:
+                seen.add(reference)
+                references.append(reference)
+            pending.extend(current.values())
+        elif isinstance(current, list):
+            pending.extend(current)
+    return references
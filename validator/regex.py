@@ -0,0 +1,375 @@
+'''
+Module providing a regular expression matcher that runs in linear time, for the patterns of `pattern` and
+`patternProperties`.
+
+Python's `re` backtracks, so a pattern like `(a+)+$` takes exponential time on a string like "aaaaaaaaaaaaaaaaaaaa!".
+The patterns this module supports are compiled into a Thompson NFA, which is run as a DFA whose states are built the
+first time they are reached and then kept, so each character of the string costs a couple of dict lookups once the
+states the strings need are built, and never more than one step of every NFA state.
+
+Patterns are parsed with the parser of `re`, so they mean exactly the same as in `re`: literals, `.`, character classes
+(with ranges, `\\d`, `\\w`, `\\s` and their negations), the anchors `^`, `$`, `\\A` and `\\Z`, groups, alternation and
+the greedy and lazy quantifiers `*`, `+`, `?` and `{m,n}`. Backreferences, lookarounds, word boundaries, possessive
+quantifiers, atomic groups and flags are not supported, and `compile_linear` returns None for them.
+'''
+try:
+    from re import _parser as sre_parse, _constants as sre_constants
+except ImportError:  # Python < 3.11
+    import sre_parse
+    import sre_constants
+
+
+MAX_NFA_STATES = 10000
+"""Maximum number of NFA states of a pattern (counted repetitions are unrolled), bigger patterns are not compiled."""
+
+MAX_DFA_STATES = 10000
+"""Maximum number of DFA states a pattern keeps, the cache is emptied when it has more."""
+
+SUPPORTED_FLAGS = sre_constants.SRE_FLAG_UNICODE | sre_constants.SRE_FLAG_VERBOSE
+"""Flags that don't change what a parsed pattern matches."""
+
+CHAR = 0
+SPLIT = 1
+ASSERT = 2
+MATCH = 3
+
+ACCEPT = 0
+"""The MATCH state, the first state of every NFA."""
+
+LINE_TERMINATOR = "\n"
+
+BEGINNING = {sre_constants.AT_BEGINNING, sre_constants.AT_BEGINNING_STRING}
+"""Anchors that only match at the beginning of the string."""
+
+
+class UnsupportedPattern(Exception):
+    """
+    Raised while compiling a pattern that uses a feature the linear matcher doesn't support.
+    """
+
+
+class DFAState(dict):
+    """
+    State of the DFA of a LinearPattern: a dict where each character that has been read in this state holds the next
+    DFAState, or ACCEPTED if a match ends after it.
+    """
+
+    __slots__ = ["states"]
+
+    def __init__(self, states):
+        """
+        :param states: Frozenset of the NFA states of the DFA state.
+        """
+
+        super().__init__()
+        self.states = states
+
+
+ACCEPTED = object()
+"""Transition to a DFA state where a match ends, the matcher returns as soon as it reaches one."""
+
+
+class LinearPattern:
+    """
+    Compiled pattern that matches strings in linear time.
+    """
+
+    def __init__(self, pattern, nfa):
+        """
+        :param pattern: Regular expression.
+        :param nfa: NFA object.
+        """
+
+        self.pattern = pattern
+        self.nfa = nfa
+        self.start = nfa.closure([nfa.start], False, False, False)
+        """NFA states where a match can start, in the positions that are not the first nor the last ones."""
+
+        self.dfa = {}
+        """Dict where each frozenset of NFA states holds its DFAState."""
+
+        self.closures = {}
+        """Dict where the keys of `get_closure` hold the NFA states of the beginning and the end of the strings."""
+
+    def matches(self, string):
+        """
+        Same as `check_pattern` with `re`: checks whether a match of the pattern starts at some index of the string,
+        so the empty string never matches.
+        :param string: Any string.
+        :return: True if the string matches the pattern.
+        """
+
+        length = len(string)
+        if length == 0:
+            return False
+        if len(self.dfa) > MAX_DFA_STATES or len(self.closures) > MAX_DFA_STATES:
+            self.dfa.clear()
+            self.closures.clear()
+        states = self.get_closure(None, None, string, 0)
+        if ACCEPT in states:
+            return True
+        # The states of positions 1 to `last` only depend on the ones of the previous position and its character, so
+        # they go through the DFA. The ones of the beginning, the end and the position before a final newline (where
+        # `$` matches) also depend on the position, and are kept in `closures`.
+        last = length - 2 if string[-1] == LINE_TERMINATOR else length - 1
+        if last > 0:
+            state = self.get_state(states)
+            for char in string[:last]:
+                following = state.get(char)
+                if following is None:
+                    following = self.add_transition(state, char)
+                if following is ACCEPTED:
+                    return True
+                state = following
+            states = state.states
+        for i in range(max(last, 0), length):
+            states = self.get_closure(states, string[i], string, i + 1)
+            if ACCEPT in states:
+                return True
+        return False
+
+    def get_state(self, states):
+        """
+        :param states: Frozenset of NFA states.
+        :return: Its DFAState.
+        """
+
+        state = self.dfa.get(states)
+        if state is None:
+            state = self.dfa.setdefault(states, DFAState(states))
+        return state
+
+    def add_transition(self, state, char):
+        """
+        :param state: DFAState.
+        :param char: Character that has not been read in the state yet.
+        :return: The next DFAState, or ACCEPTED.
+        """
+
+        nfa = self.nfa
+        states = nfa.closure(nfa.step(state.states, char), False, False, False) | self.start
+        following = ACCEPTED if ACCEPT in states else self.get_state(states)
+        state[char] = following
+        return following
+
+    def get_closure(self, states, char, string, position):
+        """
+        :param states: Frozenset of the NFA states of the previous position, or None at the beginning of the string.
+        :param char: Character of the previous position, or None at the beginning of the string.
+        :param string: String being matched.
+        :param position: Position of the string.
+        :return: Frozenset of the NFA states at the position.
+        """
+
+        length = len(string)
+        key = (states, char, position == length, position == length - 1 and string[-1] == LINE_TERMINATOR)
+        closure = self.closures.get(key)
+        if closure is None:
+            nfa = self.nfa
+            following = [nfa.start] if states is None else nfa.step(states, char)
+            if states is not None and position < length:
+                following.append(nfa.start)
+            closure = self.closures.setdefault(key, nfa.closure(following, states is None, key[2], key[3]))
+        return closure
+
+    def __repr__(self):
+        return "LinearPattern({!r})".format(self.pattern)
+
+
+class NFA:
+    """
+    Thompson NFA. State `i` is described by `kinds[i]`, `arguments[i]` and `outs[i]`: CHAR states consume a character
+    that `arguments[i]` accepts and go to `outs[i]`, SPLIT states go to every state of `outs[i]` without consuming,
+    ASSERT states go to `outs[i]` if the anchor `arguments[i]` matches at the position and the MATCH state ends a match.
+    """
+
+    def __init__(self):
+        self.kinds = [MATCH]
+        self.arguments = [None]
+        self.outs = [None]
+        self.start = 0
+
+    def add(self, kind, argument, out):
+        """
+        :param kind: CHAR, SPLIT or ASSERT.
+        :param argument: Function that receives a character (CHAR), or anchor code (ASSERT).
+        :param out: Next state, or list of next states (SPLIT).
+        :return: The new state.
+        """
+
+        if len(self.kinds) >= MAX_NFA_STATES:
+            raise UnsupportedPattern("The pattern has more than {} states.".format(MAX_NFA_STATES))
+        self.kinds.append(kind)
+        self.arguments.append(argument)
+        self.outs.append(out)
+        return len(self.kinds) - 1
+
+    def closure(self, states, beginning, end, before_newline):
+        """
+        :param states: Iterable of NFA states.
+        :param beginning: True at the beginning of the string.
+        :param end: True at the end of the string.
+        :param before_newline: True before a newline that ends the string.
+        :return: Frozenset of the CHAR and MATCH states reachable from the states without consuming characters.
+        """
+
+        kinds = self.kinds
+        outs = self.outs
+        reached = set()
+        seen = set()
+        pending = list(states)
+        while pending:
+            state = pending.pop()
+            if state in seen:
+                continue
+            seen.add(state)
+            kind = kinds[state]
+            if kind == SPLIT:
+                pending.extend(outs[state])
+            elif kind == ASSERT:
+                anchor = self.arguments[state]
+                if anchor in BEGINNING:
+                    if beginning:
+                        pending.append(outs[state])
+                elif anchor is sre_constants.AT_END_STRING:
+                    if end:
+                        pending.append(outs[state])
+                elif end or before_newline:
+                    pending.append(outs[state])
+            else:
+                reached.add(state)
+        return frozenset(reached)
+
+    def step(self, states, char):
+        """
+        :param states: Frozenset of CHAR and MATCH states.
+        :param char: Character.
+        :return: List of the states reached by consuming the character (before their epsilon closure, which depends on
+        the position).
+        """
+
+        kinds = self.kinds
+        arguments = self.arguments
+        outs = self.outs
+        return [outs[state] for state in states if kinds[state] == CHAR and arguments[state](char)]
+
+
+def compile_linear(pattern):
+    """
+    :param pattern: Regular expression.
+    :return: LinearPattern object, or None if the pattern uses a feature the linear matcher doesn't support (or is not
+    a valid pattern, so `re` reports the error).
+    """
+
+    try:
+        parsed = sre_parse.parse(pattern)
+        if parsed.state.flags & ~SUPPORTED_FLAGS:
+            return None
+        nfa = NFA()
+        nfa.start = build(nfa, parsed, 0)
+    except (UnsupportedPattern, sre_constants.error, RecursionError):
+        return None
+    return LinearPattern(pattern, nfa)
+
+
+def build(nfa, subpattern, out):
+    """
+    Adds the states of a parsed pattern to an NFA, from the last item to the first one.
+    :param nfa: NFA object.
+    :param subpattern: Parsed pattern (list of (opcode, argument) tuples).
+    :param out: State that follows the pattern.
+    :return: First state of the pattern.
+    """
+
+    for opcode, argument in reversed(list(subpattern)):
+        out = build_item(nfa, opcode, argument, out)
+    return out
+
+
+def build_item(nfa, opcode, argument, out):
+    """
+    :param nfa: NFA object.
+    :param opcode: Opcode of the parsed item.
+    :param argument: Argument of the parsed item.
+    :param out: State that follows the item.
+    :return: First state of the item.
+    """
+
+    if opcode is sre_constants.LITERAL:
+        return nfa.add(CHAR, chr(argument).__eq__, out)
+    if opcode is sre_constants.NOT_LITERAL:
+        return nfa.add(CHAR, chr(argument).__ne__, out)
+    if opcode is sre_constants.ANY:
+        return nfa.add(CHAR, LINE_TERMINATOR.__ne__, out)
+    if opcode is sre_constants.IN:
+        return nfa.add(CHAR, get_class_test(argument), out)
+    if opcode is sre_constants.SUBPATTERN:
+        group, add_flags, del_flags, subpattern = argument
+        if add_flags or del_flags:
+            raise UnsupportedPattern("Flags are not supported.")
+        return build(nfa, subpattern, out)
+    if opcode is sre_constants.BRANCH:
+        return nfa.add(SPLIT, None, [build(nfa, branch, out) for branch in argument[1]])
+    if opcode is sre_constants.MAX_REPEAT or opcode is sre_constants.MIN_REPEAT:
+        # Lazy and greedy quantifiers find a match for the same strings.
+        minimum, maximum, subpattern = argument
+        if maximum is sre_constants.MAXREPEAT or maximum == sre_constants.MAXREPEAT:
+            loop = nfa.add(SPLIT, None, None)
+            nfa.outs[loop] = [build(nfa, subpattern, loop), out]
+            out = loop
+        else:
+            following = out
+            for _ in range(maximum - minimum):
+                out = nfa.add(SPLIT, None, [build(nfa, subpattern, out), following])
+        for _ in range(minimum):
+            out = build(nfa, subpattern, out)
+        return out
+    if opcode is sre_constants.AT and (argument in BEGINNING or argument is sre_constants.AT_END or
+                                       argument is sre_constants.AT_END_STRING):
+        return nfa.add(ASSERT, argument, out)
+    raise UnsupportedPattern("{} is not supported.".format(opcode))
+
+
+def get_class_test(items):
+    """
+    :param items: Parsed items of a character class.
+    :return: Function that receives a character and returns True if it's in the class.
+    """
+
+    negated = False
+    chars = set()
+    ranges = []
+    categories = []
+    for opcode, argument in items:
+        if opcode is sre_constants.NEGATE:
+            negated = True
+        elif opcode is sre_constants.LITERAL:
+            chars.add(chr(argument))
+        elif opcode is sre_constants.RANGE:
+            ranges.append((chr(argument[0]), chr(argument[1])))
+        elif opcode is sre_constants.CATEGORY and argument in CATEGORIES:
+            categories.append(CATEGORIES[argument])
+        else:
+            raise UnsupportedPattern("{} is not supported in a character class.".format(opcode))
+
+    def test(char):
+        found = char in chars or any(low <= char <= high for low, high in ranges) or \
+            any(category(char) for category in categories)
+        return found is not negated
+
+    return test
+
+
+def is_word(char):
+    return char.isalnum() or char == "_"
+
+
+CATEGORIES = {
+    sre_constants.CATEGORY_DIGIT: str.isdecimal,
+    sre_constants.CATEGORY_NOT_DIGIT: lambda char: not char.isdecimal(),
+    sre_constants.CATEGORY_SPACE: str.isspace,
+    sre_constants.CATEGORY_NOT_SPACE: lambda char: not char.isspace(),
+    sre_constants.CATEGORY_WORD: is_word,
+    sre_constants.CATEGORY_NOT_WORD: lambda char: not is_word(char),
+}
+"""Dict where each category of a character class holds its test, the one `re` uses for str patterns."""
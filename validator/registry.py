@@ -0,0 +1,271 @@
+'''
+Module providing the registry that shares compiled schemas between the references that point to them.
+'''
+import os
+import threading
+from .classes import Definitions, LazySchema, get_schema
+from .utils import JSONPointer, get_json_hash, get_json_from_file, get_json_from_url, is_valid_url
+
+
+class SchemaRegistry:
+    """
+    Registry that owns the compiled schemas of other files and urls, so a schema that's referenced from many places is
+    fetched, validated and built only once.
+
+    Schemas are found by the canonical uri of their document (the absolute path for files) plus the fragment of the
+    reference, by their draft-04 `id` and by the hash of their content (two documents with the same content share the
+    same schema object).
+
+    It can be used from many threads without locking: reads are plain dict lookups and when two threads build the same
+    schema at once both get the one that was stored first.
+    """
+
+    def __init__(self):
+        self.documents = {}
+        """Dict where each canonical uri holds the dict of its document."""
+
+        self.schemas = {}
+        """Dict where each canonical reference (uri and fragment) holds its schema object."""
+
+        self.ids = {}
+        """Dict where each draft-04 id holds the schema object of the document that declares it."""
+
+        self.hashes = {}
+        """Dict where each content hash holds the schema object built from that content."""
+
+        self.__local = threading.local()
+
+    def get_schema_from_reference(self, reference):
+        """
+        Returns the schema object a $ref to another file or url points to, building it if it's not in the registry.
+        :param reference: url or path, optionally followed by a JSONPointer fragment.
+        :return: Schema object.
+        """
+
+        uri, fragment = split_reference(reference)
+        key = uri + "#" + fragment
+        schema = self.schemas.get(key)
+        if schema is not None:
+            return schema
+        building = self.__get_building()
+        if key in building:
+            # The document refers back to a schema that is still being built (recursion across files). Like the
+            # references inside a document, it gets that schema, which is looked up when it's first used. Cycles that
+            # would never end were rejected by the reference graph of `get_schema`.
+            return LazySchema({"$ref": reference}, None, Definitions(self), "")
+
+        building.add(key)
+        try:
+            document = self.get_document(uri)
+            if fragment == "":
+                schema = self.__build(document)
+            else:
+                schema = get_schema(JSONPointer(document, "#" + fragment).get_json(), whole_schema=document,
+                                    registry=self)
+        finally:
+            building.discard(key)
+        return self.schemas.setdefault(key, schema)
+
+    def resolve(self, reference):
+        """
+        Finds the part of a document a reference points to, without building it.
+        :param reference: url or path, optionally followed by a JSONPointer fragment.
+        :return: Tuple (canonical uri, dict of the document, json object the reference points to). The json object is
+        None if the schema was already built, since its reference cycles were checked then.
+        """
+
+        uri, fragment = split_reference(reference)
+        if uri + "#" + fragment in self.schemas:
+            return uri, None, None
+        document = self.get_document(uri)
+        if fragment == "":
+            return uri, document, document
+        return uri, document, JSONPointer(document, "#" + fragment).get_json()
+
+    def get_schema(self, json_schema, uri=None):
+        """
+        Registers a document and returns its schema object.
+        :param json_schema: Dict object.
+        :param uri: url or path the document is known by. Its `id` (if it has one) is registered too.
+        :return: Schema object.
+        """
+
+        names = self.add_document(json_schema, uri)
+        schema = self.__build(json_schema)
+        for name in names:
+            self.schemas[name + "#"] = schema
+        if isinstance(json_schema.get("id"), str):
+            self.ids[json_schema["id"]] = schema
+        return schema
+
+    def get_schema_from_file(self, file):
+        """
+        :param file: path to the schema.
+        :return: Schema object of the file, built once per registry.
+        """
+
+        return self.get_schema_from_reference(canonicalize_uri(file))
+
+    def get_schema_from_url(self, url):
+        """
+        :param url: url pointing a schema.
+        :return: Schema object of the url, fetched once per registry.
+        """
+
+        return self.get_schema_from_reference(url)
+
+    def get_schema_by_id(self, schema_id):
+        """
+        :param schema_id: draft-04 id of a registered schema.
+        :return: Schema object or None if there's no schema with that id.
+        """
+
+        return self.ids.get(schema_id)
+
+    def register_many(self, json_schemas):
+        """
+        Pre-populates the registry with a family of schemas. Every document is added before any of them is built, so
+        they can reference each other without reading the file system or the network.
+        :param json_schemas: Dict where each uri holds its document, or list of documents identified by their `id`.
+        :return: List of schema objects, in the same order as the documents.
+        """
+
+        if isinstance(json_schemas, dict):
+            items = list(json_schemas.items())
+        else:
+            items = [(None, json_schema) for json_schema in json_schemas]
+        for uri, json_schema in items:
+            self.add_document(json_schema, uri)
+        return [self.get_schema(json_schema, uri) for uri, json_schema in items]
+
+    def register_files(self, files):
+        """
+        Pre-populates the registry with schema files.
+        :param files: List of paths.
+        :return: List of schema objects.
+        """
+
+        return self.register_many({canonicalize_uri(file): get_json_from_file(file) for file in files})
+
+    def get_document(self, uri):
+        """
+        :param uri: Canonical uri.
+        :return: Dict of the document, read or fetched if it's not in the registry.
+        """
+
+        document = self.documents.get(uri)
+        if document is None:
+            if is_valid_url(uri):
+                document = get_json_from_url(uri)
+            else:
+                document = get_json_from_file(uri)
+            document = self.documents.setdefault(uri, document)
+        return document
+
+    def remove(self, uri):
+        """
+        Removes a document and every schema built from it, so the next reference reads it again. Schemas already built
+        with a reference to it keep their old child.
+        :param uri: url or path.
+        """
+
+        uri = canonicalize_uri(uri)
+        document = self.documents.pop(uri, None)
+        for key in [key for key in list(self.schemas) if key.split("#", 1)[0] == uri]:
+            self.schemas.pop(key, None)
+        if isinstance(document, dict):
+            self.hashes.pop(get_json_hash(document), None)
+            self.ids.pop(document.get("id"), None)
+
+    def clear(self):
+        """
+        Removes every document and schema.
+        """
+
+        self.documents.clear()
+        self.schemas.clear()
+        self.ids.clear()
+        self.hashes.clear()
+
+    def __getstate__(self):
+        # The builds in progress of each thread are not pickled.
+        state = self.__dict__.copy()
+        del state["_SchemaRegistry__local"]
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self.__local = threading.local()
+
+    def __get_building(self):
+        """
+        :return: Set of the references the current thread is building.
+        """
+
+        building = getattr(self.__local, "building", None)
+        if building is None:
+            building = self.__local.building = set()
+        return building
+
+    def add_document(self, json_schema, uri=None):
+        """
+        Adds a document under its uri and its id without building it, so references to it don't read it again.
+        :param json_schema: Dict object.
+        :param uri: url or path the document is known by.
+        :return: List of canonical uris the document was added under.
+        """
+
+        names = []
+        if uri is not None:
+            names.append(canonicalize_uri(uri))
+        schema_id = json_schema.get("id")
+        if isinstance(schema_id, str) and schema_id != "":
+            name = canonicalize_uri(schema_id)
+            if name not in names:
+                names.append(name)
+        for name in names:
+            self.documents[name] = json_schema
+        return names
+
+    def __build(self, json_schema):
+        """
+        Builds a whole document, reusing the schema object of an equal document if there's one.
+        """
+
+        content_hash = get_json_hash(json_schema)
+        schema = self.hashes.get(content_hash)
+        if schema is None:
+            schema = self.hashes.setdefault(content_hash, get_schema(json_schema, registry=self))
+        return schema
+
+
+def split_reference(reference):
+    """
+    :param reference: url or path, optionally followed by a fragment.
+    :return: Tuple (canonical uri, JSONPointer fragment without the "#").
+    """
+
+    uri, _, fragment = reference.partition("#")
+    return canonicalize_uri(uri), fragment
+
+
+def canonicalize_uri(uri):
+    """
+    Returns the form of a uri that's used as key of the registry: urls with lowercase scheme and host and without
+    fragment, and absolute normalized paths for files.
+    :param uri: url or path.
+    :return: string.
+    """
+
+    uri = uri.partition("#")[0]
+    if is_valid_url(uri):
+        from urllib.parse import urlparse, urlunparse
+
+        parsed = urlparse(uri)
+        return urlunparse((parsed.scheme.lower(), parsed.netloc.lower(), parsed.path or "/", parsed.params,
+                           parsed.query, ""))
+    return os.path.abspath(uri)
+
+
+REGISTRY = SchemaRegistry()
+"""Registry used when no other registry is given."""
@@ -0,0 +1,169 @@
+'''
+Module providing a watcher that builds schema files again when they change, so a long running process picks up new
+versions of its schemas without restarting.
+'''
+import os
+import threading
+from .classes import get_schema_from_file
+from .exceptions import InvalidSchemaException
+from .registry import SchemaRegistry, canonicalize_uri
+from .utils import is_valid_url
+
+
+POLL_INTERVAL = 1.0
+"""Seconds between two checks of the files."""
+
+
+class SchemaWatcher:
+    """
+    Keeps the schema objects of some files up to date. It polls the files and every file they reference with $ref
+    (directly or through other files), and when one of them changes it builds again the schemas that were built from it
+    and swaps them into `self.schemas`. Files are compared by their modification time, inode and size, so a file that's
+    replaced by a rename is noticed too. Only the standard library is used.
+
+    A schema is swapped by assigning the new object to its name in `self.schemas`, which is atomic: a validation that
+    already got the old object finishes with it and the next lookup gets the new one, so validations never wait for a
+    build. When a file changes, the schemas that depend on it are swapped one by one, each one once it's built. If the
+    new version can't be read or it's not a valid schema, the old schema stays and the error is kept in `self.errors`
+    until a later version builds.
+    """
+
+    def __init__(self, files, interval=POLL_INTERVAL, lean=False, registry=None, schemas=None):
+        """
+        Builds the schemas of the files. An error here is raised, like the one of `get_schema_from_file`.
+        :param files: Dict where each name holds the path of its schema file.
+        :param interval: Seconds between two checks of the files in the thread of `self.start`.
+        :param lean: If it's True the schema objects don't keep the dicts they were built from.
+        :param registry: SchemaRegistry object that must forget the files that change (see `SchemaRegistry.remove`),
+        so the references it resolves later read them again. The watcher builds its schemas with registries of its own.
+        :param schemas: Dict where the schema objects are stored, which can be shared with the code that validates. A
+        new dict by default.
+        """
+
+        self.files = dict(files)
+        self.interval = interval
+        self.lean = lean
+        self.registry = registry
+
+        self.schemas = {} if schemas is None else schemas
+        """Dict where each name holds its current schema object."""
+
+        self.dependencies = {}
+        """Dict where each name holds the set of canonical paths of the files its schema was built from."""
+
+        self.signatures = {}
+        """Dict where each watched path holds its signature when it was last read (see `get_signature`)."""
+
+        self.errors = {}
+        """Dict where each name whose last version couldn't be built holds the message of the error."""
+
+        self.reloads = 0
+        """Number of schemas swapped since the watcher was created."""
+
+        self.__lock = threading.Lock()
+        self.__stop = threading.Event()
+        self.__thread = None
+        for name in self.files:
+            self.__load(name)
+
+    def check(self):
+        """
+        Checks the watched files once, and builds and swaps the schemas of the ones that changed.
+        :return: List of the names whose schemas were swapped.
+        """
+
+        with self.__lock:
+            changed = {path for path, signature in list(self.signatures.items()) if get_signature(path) != signature}
+            if not changed:
+                return []
+            if self.registry is not None:
+                for path in changed:
+                    self.registry.remove(path)
+            swapped = []
+            for name, dependencies in list(self.dependencies.items()):
+                if not dependencies & changed:
+                    continue
+                try:
+                    self.__load(name)
+                except (Exception, InvalidSchemaException) as error:
+                    # Any error of the new version (a $ref to an index that's not there raises IndexError...) keeps the
+                    # old schema, and the thread of `self.start` keeps watching.
+                    self.errors[name] = "{}: {}".format(type(error).__name__, error)
+                else:
+                    swapped.append(name)
+            watched = set().union(*self.dependencies.values())
+            for path in list(self.signatures):
+                if path not in watched:
+                    del self.signatures[path]
+            self.reloads += len(swapped)
+            return swapped
+
+    def start(self):
+        """
+        Starts a daemon thread that checks the files every `self.interval` seconds until `self.stop` is called.
+        """
+
+        if self.__thread is None:
+            self.__stop.clear()
+            self.__thread = threading.Thread(target=self.__watch, name="schema-watcher", daemon=True)
+            self.__thread.start()
+
+    def stop(self):
+        """
+        Stops the thread of `self.start` and waits for the build it's running, if there's one.
+        """
+
+        if self.__thread is not None:
+            self.__stop.set()
+            self.__thread.join()
+            self.__thread = None
+
+    def get_schema(self, name):
+        """
+        :param name: Name of a watched file.
+        :return: Its current schema object.
+        """
+
+        return self.schemas[name]
+
+    def __watch(self):
+        while not self.__stop.wait(self.interval):
+            self.check()
+
+    def __load(self, name):
+        """
+        Builds the schema of a name and swaps it. The signatures of the files are taken before they are read, so a
+        change made while the schema is built is noticed by the next check.
+        """
+
+        path = canonicalize_uri(self.files[name])
+        for dependency in self.dependencies.get(name, {path}):
+            self.signatures[dependency] = get_signature(dependency)
+        # A registry of its own, so no schema object of the old versions of the files is reused.
+        registry = SchemaRegistry()
+        try:
+            schema = get_schema_from_file(path, registry=registry, lean=self.lean)
+        finally:
+            # The files read before an error are watched too, so fixing any of them builds the schema again.
+            dependencies = {path}
+            dependencies.update(uri for uri in registry.documents if not is_valid_url(uri))
+            for dependency in dependencies:
+                if dependency not in self.signatures:
+                    self.signatures[dependency] = get_signature(dependency)
+            self.dependencies[name] = dependencies | self.dependencies.get(name, set())
+        self.dependencies[name] = dependencies
+        self.schemas[name] = schema
+        self.errors.pop(name, None)
+
+
+def get_signature(path):
+    """
+    :param path: Path of a file.
+    :return: Tuple (device, inode, modification time in nanoseconds, size), or None if the file doesn't exist.
+    """
+
+    try:
+        stat = os.stat(path)
+    except OSError:
+        return None
+    return stat.st_dev, stat.st_ino, stat.st_mtime_ns, stat.st_size
@@ -0,0 +1,322 @@
+'''
+Module providing the validation of a patched document that only checks what the patch changed (see
+`Schema.revalidate`).
+
+The document before the patch must be valid against the schema. The operations are recorded in a tree of the places
+they changed, and the schema is walked down that tree with the same descent as `ObjectSchema` and `ArraySchema`
+(properties, patternProperties, additionalProperties, items, additionalItems): the values that were replaced are
+validated as a whole, and the containers on the way are checked against the keywords that look at the whole container
+(required, minProperties, maxProperties, dependencies, minItems, maxItems, uniqueItems, enum, anyOf, oneOf and not).
+allOf, and the dependency schemas of keys that were already there, are applied to the same value, so they are walked
+down the same tree.
+'''
+from .classes import Schema, ObjectSchema, ArraySchema, MultipleSchema, LazySchema
+from .patch import apply_operation, get_operation, get_patch_value
+from .utils import JSONPointer, Response, get_size_of_smaller
+
+
+REVALIDATED_CLASSES = {Schema, ObjectSchema, ArraySchema, MultipleSchema}
+"""Schema classes that are walked down the changes. Values of the other classes are not containers (or they are
+validated in their own way, like optimized schemas), so they are validated as a whole."""
+
+
+class Change:
+    """
+    Node of the tree of the places a patch changed, from the root of the new document.
+    """
+
+    def __init__(self):
+        self.replaced = False
+        """True if the whole value is new, so it's validated as a whole."""
+
+        self.children = {}
+        """Dict where each key or index (a string, like in JSON Pointers) of the value holds the Change of a child that
+        changed. A container with children, or without children but with keys or items that were removed, is checked
+        against the keywords that look at the whole container."""
+
+    def get(self, nodes, create=True):
+        """
+        :param nodes: Nodes from this change.
+        :param create: If it's True the changes that are missing are created.
+        :return: Change object of the nodes, or None if it's inside a replaced value (or missing and not created).
+        """
+
+        change = self
+        for node in nodes:
+            if change.replaced:
+                return None
+            child = change.children.get(node)
+            if child is None:
+                if not create:
+                    return None
+                child = change.children[node] = Change()
+            change = child
+        return None if change.replaced else change
+
+    def replace(self, nodes):
+        """
+        Records that the value of the nodes is new.
+        """
+
+        change = self.get(nodes)
+        if change is not None:
+            change.replaced = True
+            change.children = {}
+
+    def remove(self, nodes):
+        """
+        Records that the value of the nodes was removed from its container.
+        """
+
+        parent = self.get(nodes[:-1])
+        if parent is not None:
+            parent.children.pop(nodes[-1], None)
+
+
+def revalidate(schema, document, patch, in_place=False):
+    """
+    Applies a JSON Patch to a document that's valid against a schema and validates the new document, checking only the
+    places the patch changed.
+    :param schema: Schema object.
+    :param document: Json document that's valid against the schema.
+    :param patch: List of JSON Patch (RFC 6902) operations.
+    :param in_place: If it's True the document is modified instead of copied (see `validator.patch.apply_patch`).
+    :return: Tuple (new document, Response object).
+    :raise ValueError: If the patch can't be applied to the document.
+    """
+
+    copied = None if in_place else set()
+    root = Change()
+    for operation in patch:
+        op, path, source = get_operation(operation)
+        if op == "move":
+            # A move is a removal followed by an addition to the document without the value.
+            steps = [{"op": "remove", "path": operation["from"]},
+                     {"op": "add", "path": operation["path"], "value": get_patch_value(document, source)}]
+        else:
+            steps = [operation]
+        for step in steps:
+            record_operation(root, document, step)
+            document = apply_operation(document, step, copied)
+    return document, revalidate_node(schema, document, root)
+
+
+def record_operation(root, document, operation):
+    """
+    Records the places an operation changes, before it's applied. An item that's inserted or removed anywhere but at the
+    end of a list moves the items after it, so the list is recorded as replaced.
+    :param root: Change object of the document.
+    :param document: Document the operation is applied to.
+    :param operation: Operation of a JSON Patch that's not a move.
+    """
+
+    op, path, _ = get_operation(operation)
+    if op == "test":
+        return
+    if op == "replace" or not path:
+        root.replace(path)
+    elif op == "add" or op == "copy":
+        parent = get_patch_value(document, path[:-1])
+        if isinstance(parent, list):
+            if path[-1] != "-" and path[-1] != str(len(parent)):
+                root.replace(path[:-1])
+                return
+            path = path[:-1] + [str(len(parent))]
+        root.replace(path)
+    elif op == "remove":
+        parent = get_patch_value(document, path[:-1])
+        if isinstance(parent, list) and path[-1] != str(len(parent) - 1):
+            root.replace(path[:-1])
+        else:
+            root.remove(path)
+
+
+def revalidate_node(schema, document, change):
+    """
+    :param schema: Schema object the value was valid against before the patch.
+    :param document: Value after the patch.
+    :param change: Change object of the value.
+    :return: Response object, like the one of `schema.validate_node`. If more than one change fails it may report
+    another one than `schema.validate_node`.
+    """
+
+    if type(schema) is LazySchema:
+        LazySchema.build(schema)
+    schema_type = type(schema)
+    if change.replaced or schema_type not in REVALIDATED_CLASSES or \
+            (schema_type is ArraySchema and type(document) is not list):
+        return schema.validate_node(document)
+    response = revalidate_combinators(schema, document, change)
+    if not response.is_valid:
+        return response
+    if schema_type is ObjectSchema:
+        return revalidate_object(schema, document, change)
+    if schema_type is ArraySchema:
+        return revalidate_array(schema, document, change)
+    if schema_type is MultipleSchema:
+        return revalidate_multiple(schema, document, change)
+    return response
+
+
+def revalidate_combinators(schema, document, change):
+    """
+    Checks the keywords of `Schema.validate_node`. allOf is walked down the changes, since every subschema was valid
+    against the value; anyOf, oneOf, not and enum are checked against the whole value.
+    """
+
+    if schema.has_any_of():
+        response = schema.validate_any_of(document)
+        if not response.is_valid:
+            return response
+    if schema.has_one_of():
+        response = schema.validate_one_of(document)
+        if not response.is_valid:
+            return response
+    if schema.has_all_of():
+        # Like `count_and_validate_schema_array`, the last subschema that fails is reported.
+        failed_index = None
+        failed_response = None
+        for i, child in enumerate(schema.allOf):
+            response = revalidate_node(child, document, change)
+            if not response.is_valid:
+                failed_index = i
+                failed_response = response
+        if failed_response is not None:
+            failed_response.add_upward_document_and_schema_nodes([], [failed_index])
+            failed_response.add_upward_document_and_schema_nodes([], schema.build_nodes(["allOf"]))
+            return failed_response
+    if schema.has_not():
+        response = schema.validate_not(document)
+        if not response.is_valid:
+            return response
+    if schema.has_enum():
+        response = schema.validate_enum(document)
+        if not response.is_valid:
+            return response
+    return Response(True, None, None)
+
+
+def revalidate_object(schema, document, change):
+    """
+    Checks the keywords of `ObjectSchema.validate_node` in the same order, validating only the keys that changed.
+    """
+
+    response = schema.validate_type(document)
+    if not response.is_valid:
+        return response
+    response = schema.validate_required_properties(document)
+    if not response.is_valid:
+        return response
+    keys = [key for key in change.children if key in document]
+    # Like `ObjectSchema.validate_properties`, the property that's declared first is reported.
+    for key in sorted((key for key in keys if key in schema.properties), key=schema.property_order.get):
+        response = revalidate_node(schema.properties[key], document[key], change.children[key])
+        if not response.is_valid:
+            response.set_document(document)
+            response.add_upward_document_and_schema_nodes([key], schema.build_nodes(["properties", key]))
+            return response
+    response = schema.validate_min_properties(document)
+    if not response.is_valid:
+        return response
+    response = schema.validate_max_properties(document)
+    if not response.is_valid:
+        return response
+    response = schema.validate_property_dependencies(document)
+    if not response.is_valid:
+        return response
+    for key, dependency in schema.schema_dependencies.items():
+        if key in document:
+            # A key that changed may be new, so its dependency is applied to the whole value.
+            if key in change.children:
+                response = dependency.validate_node(document)
+            else:
+                response = revalidate_node(dependency, document, change)
+            if not response.is_valid:
+                response.set_document(document)
+                response.add_upward_document_and_schema_nodes([key], schema.build_nodes(["dependencies", key]))
+                return response
+    additional_properties = schema.additionalProperties
+    for key in keys:
+        if not schema.key_is_additional_property(key):
+            continue
+        if isinstance(additional_properties, bool):
+            if not additional_properties:
+                return Response(False, JSONPointer(document, [key]),
+                                JSONPointer(schema.whole_schema, schema.build_nodes(["additionalProperties"])))
+            continue
+        response = revalidate_node(additional_properties, document[key], change.children[key])
+        if not response.is_valid:
+            response.set_document(document)
+            response.add_upward_document_and_schema_nodes([key], schema.build_nodes(["additionalProperties", key]))
+            return response
+    if schema.patternProperties:
+        for key in keys:
+            for pattern in schema.get_key_patterns(key):
+                response = revalidate_node(schema.patternProperties[pattern], document[key], change.children[key])
+                if not response.is_valid:
+                    response.add_upward_document_and_schema_nodes([key], ["patternProperties", pattern])
+                    return response
+    return Response(True, None, None)
+
+
+def revalidate_array(schema, document, change):
+    """
+    Checks the keywords of `ArraySchema.validate_node` in the same order, validating only the items that changed.
+    """
+
+    response = schema.validate_type(document)
+    if not response.is_valid:
+        return response
+    indexes = sorted(int(index) for index in change.children)
+    if isinstance(schema.items, list):
+        for i in indexes:
+            if i < get_size_of_smaller(document, schema.items):
+                response = revalidate_node(schema.items[i], document[i], change.children[str(i)])
+                if not response.is_valid:
+                    response.set_document(document)
+                    response.add_upward_document_and_schema_nodes([i], schema.build_nodes(["items", i]))
+                    return response
+    else:
+        for i in indexes:
+            response = revalidate_node(schema.items, document[i], change.children[str(i)])
+            if not response.is_valid:
+                response.set_document(document)
+                response.add_upward_document_and_schema_nodes([i], schema.build_nodes(["items"]))
+                return response
+    if isinstance(schema.additionalItems, bool):
+        response = schema.validate_additional_items(document)
+        if not response.is_valid:
+            return response
+    elif isinstance(schema.items, list):
+        for i in indexes:
+            if i >= len(schema.items):
+                response = revalidate_node(schema.additionalItems, document[i], change.children[str(i)])
+                if not response.is_valid:
+                    response.add_upward_document_and_schema_nodes([i], ["additionalItems"])
+                    return response
+    response = schema.validate_min_items(document)
+    if not response.is_valid:
+        return response
+    response = schema.validate_max_items(document)
+    if not response.is_valid:
+        return response
+    return schema.validate_unique_items(document)
+
+
+def revalidate_multiple(schema, document, change):
+    """
+    Walks down the schema `MultipleSchema.validate_node` picks for the value, which is a container (the others have no
+    changes inside).
+    """
+
+    if isinstance(document, dict):
+        type_schema = schema.schemas.get("object")
+    elif isinstance(document, list):
+        type_schema = schema.schemas.get("array")
+    else:
+        return schema.validate_node(document)
+    if type_schema is None:
+        if schema.validates_any:
+            return Response(True, None, None)
+        return Response(False, JSONPointer(document, []), JSONPointer(schema.whole_schema, ["type"]))
+    return revalidate_node(type_schema, document, change)
@@ -0,0 +1,433 @@
+'''
+Module providing a validation server (`python -m validator serve`) that keeps compiled schemas in memory and validates
+the documents of HTTP requests, over TCP or a Unix socket.
+
+    GET  /health              {"status": "ok"}
+    GET  /schemas             {"schemas": [names]}
+    GET  /metrics             Prometheus text of `validator.metrics.METRICS`
+    POST /validate/<name>     body with one json document, answered with one result
+                              (or, with `Content-Type: application/x-ndjson`, one document per line, answered with one
+                              result per line in the same order)
+
+A result is {"valid": true}, or {"valid": false, "document_pointer": "#/...", "schema_pointer": "#/..."}.
+
+The documents of concurrent requests are validated in micro-batches: they are queued, and while every worker of the
+pool is busy they keep being queued, so a worker that gets free takes up to `MAX_BATCH_SIZE` of them at once instead of
+one task per document.
+
+With a reload interval the schema files are watched (see `validator.reload.SchemaWatcher`): a file that changes is
+built again in the background and swapped in, while the requests that already got the old schema finish with it.
+'''
+import asyncio
+import concurrent.futures
+import functools
+import json
+import os
+from http import HTTPStatus
+from urllib.parse import unquote
+from .metrics import METRICS
+from .registry import SchemaRegistry
+from .reload import SchemaWatcher
+from .utils import JSONPointer
+
+
+MAX_BATCH_SIZE = 256
+"""Maximum number of documents a worker validates in one batch."""
+
+BATCH_DELAY = 0
+"""Seconds the first document of a batch waits for others when a worker is free. With 0 it waits for the documents
+that arrive in the same iteration of the event loop (asyncio timers have a resolution of about a millisecond, so any
+other delay is at least that long)."""
+
+MAX_BODY_SIZE = 64 * 1024 * 1024
+"""Maximum size in bytes of the body of a request."""
+
+MAX_HEADERS = 100
+"""Maximum number of header lines of a request."""
+
+NDJSON = "application/x-ndjson"
+
+WORKER_SCHEMAS = {}
+"""Dict where each schema name holds its schema object, in the worker processes of a server."""
+
+
+class HTTPError(Exception):
+    """
+    Raised while handling a request that gets an error response.
+    """
+
+    def __init__(self, status, message=None):
+        """
+        :param status: HTTPStatus.
+        :param message: Description of the error (the status phrase by default).
+        """
+
+        super().__init__(message or status.phrase)
+        self.status = status
+
+
+class MicroBatcher:
+    """
+    Queue of documents that are validated in batches by a pool of workers.
+    """
+
+    def __init__(self, executor, function, workers, batch_size=MAX_BATCH_SIZE, delay=BATCH_DELAY):
+        """
+        :param executor: concurrent.futures.Executor object.
+        :param function: Function that receives a list of (schema name, document) tuples and returns the list of their
+        results (see `validate_items`). It runs in the executor.
+        :param workers: Number of batches that are validated at the same time (the workers of the executor).
+        :param batch_size: Maximum number of documents of a batch.
+        :param delay: Seconds the first document of a batch waits for others when a worker is free.
+        """
+
+        self.executor = executor
+        self.function = function
+        self.workers = workers
+        self.batch_size = batch_size
+        self.delay = delay
+        self.pending = []
+        """List of (schema name, document, future) tuples that are not in a batch yet."""
+
+        self.running = 0
+        self.__timer = None
+
+    def submit(self, name, document):
+        """
+        :param name: Name of a schema.
+        :param document: Document to validate.
+        :return: asyncio.Future of the result of the document.
+        """
+
+        future = asyncio.get_running_loop().create_future()
+        self.pending.append((name, document, future))
+        if self.running < self.workers:
+            if len(self.pending) >= self.batch_size:
+                self.flush()
+            elif self.__timer is None:
+                loop = asyncio.get_running_loop()
+                self.__timer = loop.call_later(self.delay, self.flush) if self.delay > 0 else loop.call_soon(self.flush)
+        return future
+
+    def flush(self):
+        """
+        Hands the pending documents to the executor, in batches of up to `batch_size` documents while there are free
+        workers.
+        """
+
+        if self.__timer is not None:
+            self.__timer.cancel()
+            self.__timer = None
+        while self.pending and self.running < self.workers:
+            batch = self.pending[:self.batch_size]
+            del self.pending[:self.batch_size]
+            self.running += 1
+            task = asyncio.get_running_loop().run_in_executor(self.executor, self.function,
+                                                              [(name, document) for name, document, _ in batch])
+            task.add_done_callback(functools.partial(self.__finish, [future for _, _, future in batch]))
+
+    def __finish(self, futures, task):
+        self.running -= 1
+        error = task.exception() if not task.cancelled() else asyncio.CancelledError()
+        results = task.result() if error is None else [{"error": str(error)}] * len(futures)
+        for future, result in zip(futures, results):
+            if not future.done():
+                future.set_result(result)
+        # The documents that arrived while every worker was busy go in the next batch right away.
+        if self.pending:
+            self.flush()
+
+
+class ValidationServer:
+    """
+    HTTP server that validates documents against compiled schemas that stay in memory.
+    """
+
+    def __init__(self, schemas, executor=None, workers=1, batch_size=MAX_BATCH_SIZE, delay=BATCH_DELAY,
+                 function=None):
+        """
+        :param schemas: Dict where each name holds its schema object.
+        :param executor: concurrent.futures.Executor object. None means a ThreadPoolExecutor with `workers` threads.
+        :param workers: Number of workers of the executor.
+        :param batch_size: Maximum number of documents validated in one batch.
+        :param delay: Seconds the first document of a batch waits for others when a worker is free.
+        :param function: Function that validates a batch in the executor. None means `validate_items` with `schemas`
+        (a process pool needs `validate_items` without schemas, see `load_worker_schemas`).
+        """
+
+        self.schemas = schemas
+        self.executor = executor or concurrent.futures.ThreadPoolExecutor(workers)
+        self.batcher = MicroBatcher(self.executor, function or functools.partial(validate_items, schemas), workers,
+                                    batch_size, delay)
+
+    async def start(self, host="127.0.0.1", port=8080, path=None):
+        """
+        :param host: Host of the TCP socket.
+        :param port: Port of the TCP socket.
+        :param path: Path of a Unix socket. If it's given the server listens on it instead of the TCP socket.
+        :return: asyncio.Server object.
+        """
+
+        if path is not None:
+            return await asyncio.start_unix_server(self.handle, path)
+        return await asyncio.start_server(self.handle, host, port)
+
+    async def handle(self, reader, writer):
+        """
+        Serves the requests of a connection, which is kept alive until the client closes it or asks to.
+        :param reader: asyncio.StreamReader object.
+        :param writer: asyncio.StreamWriter object.
+        """
+
+        try:
+            while True:
+                # Requests that can't be read close the connection, the others keep it open.
+                keep_alive = False
+                try:
+                    request = await read_request(reader)
+                    if request is None:
+                        break
+                    method, path, headers, body = request
+                    keep_alive = headers.get("connection", "").lower() != "close"
+                    status, content_type, payload = await self.dispatch(method, path, headers, body)
+                except HTTPError as error:
+                    status, content_type, payload = error.status, "application/json", \
+                        json.dumps({"error": str(error)}).encode()
+                writer.write(get_response_head(status, content_type, len(payload), keep_alive) + payload)
+                await writer.drain()
+                if not keep_alive:
+                    break
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            writer.close()
+
+    async def dispatch(self, method, path, headers, body):
+        """
+        :param method: HTTP method.
+        :param path: Path of the request (without the query).
+        :param headers: Dict where each lowercase header name holds its value.
+        :param body: bytes.
+        :return: Tuple (HTTPStatus, content type, bytes of the body).
+        """
+
+        if path == "/health" and method == "GET":
+            return HTTPStatus.OK, "application/json", b'{"status": "ok"}'
+        if path == "/schemas" and method == "GET":
+            return HTTPStatus.OK, "application/json", json.dumps({"schemas": sorted(self.schemas)}).encode()
+        if path == "/metrics" and method == "GET":
+            return HTTPStatus.OK, "text/plain; version=0.0.4", METRICS.to_prometheus().encode()
+        if not path.startswith("/validate/"):
+            raise HTTPError(HTTPStatus.NOT_FOUND)
+        if method != "POST":
+            raise HTTPError(HTTPStatus.METHOD_NOT_ALLOWED)
+        name = unquote(path[len("/validate/"):])
+        if name not in self.schemas:
+            raise HTTPError(HTTPStatus.NOT_FOUND, "Unknown schema: " + name)
+        if NDJSON in headers.get("content-type", ""):
+            documents = [parse_json(line) for line in body.splitlines() if line.strip()]
+            results = await asyncio.gather(*[self.batcher.submit(name, document) for document in documents])
+            return HTTPStatus.OK, NDJSON, "".join(json.dumps(result) + "\n" for result in results).encode()
+        result = await self.batcher.submit(name, parse_json(body))
+        return HTTPStatus.OK, "application/json", json.dumps(result).encode()
+
+    def close(self):
+        """
+        Shuts the executor down.
+        """
+
+        self.executor.shutdown(wait=False)
+
+
+async def read_request(reader):
+    """
+    :param reader: asyncio.StreamReader object.
+    :return: Tuple (method, path, headers, body) or None if the connection was closed.
+    """
+
+    line = await read_line(reader)
+    if not line.strip():
+        return None
+    parts = line.decode("latin-1").split()
+    if len(parts) != 3 or not parts[2].startswith("HTTP/"):
+        raise HTTPError(HTTPStatus.BAD_REQUEST, "Malformed request line.")
+    method, target, _ = parts
+    headers = {}
+    for _ in range(MAX_HEADERS):
+        line = await read_line(reader)
+        if line in (b"\r\n", b"\n", b""):
+            break
+        name, _, value = line.decode("latin-1").partition(":")
+        headers[name.strip().lower()] = value.strip()
+    else:
+        raise HTTPError(HTTPStatus.REQUEST_HEADER_FIELDS_TOO_LARGE)
+    if "chunked" in headers.get("transfer-encoding", "").lower():
+        raise HTTPError(HTTPStatus.LENGTH_REQUIRED)
+    try:
+        length = int(headers.get("content-length", "0"))
+    except ValueError:
+        raise HTTPError(HTTPStatus.BAD_REQUEST, "Invalid Content-Length.")
+    if length > MAX_BODY_SIZE:
+        raise HTTPError(HTTPStatus.REQUEST_ENTITY_TOO_LARGE)
+    body = await reader.readexactly(length) if length > 0 else b""
+    return method, target.partition("?")[0], headers, body
+
+
+async def read_line(reader):
+    """
+    :param reader: asyncio.StreamReader object.
+    :return: bytes of the next line, with its line terminator.
+    :raise HTTPError: If the line is longer than the limit of the reader.
+    """
+
+    try:
+        return await reader.readline()
+    except (ValueError, asyncio.LimitOverrunError):
+        # `readline` raises ValueError when the line doesn't fit in the buffer of the reader.
+        raise HTTPError(HTTPStatus.REQUEST_HEADER_FIELDS_TOO_LARGE)
+
+
+def get_response_head(status, content_type, length, keep_alive):
+    """
+    :param status: HTTPStatus.
+    :param content_type: Content type of the body.
+    :param length: Length of the body in bytes.
+    :param keep_alive: Whether the connection stays open.
+    :return: bytes of the status line and the headers.
+    """
+
+    return ("HTTP/1.1 {} {}\r\nContent-Type: {}\r\nContent-Length: {}\r\nConnection: {}\r\n\r\n".format(
+        status.value, status.phrase, content_type, length, "keep-alive" if keep_alive else "close")).encode("latin-1")
+
+
+def parse_json(data):
+    """
+    :param data: bytes of a json document.
+    :return: The document.
+    """
+
+    try:
+        return json.loads(data)
+    except (ValueError, RecursionError):
+        raise HTTPError(HTTPStatus.BAD_REQUEST, "Invalid json document.")
+
+
+def get_result(response):
+    """
+    :param response: Response object.
+    :return: Dict that can be serialized to json.
+    """
+
+    if response.is_valid:
+        return {"valid": True}
+    result = {"valid": False, "document_pointer": JSONPointer.get_string_from_nodes(response.document_pointer.nodes),
+              "schema_pointer": JSONPointer.get_string_from_nodes(response.schema_pointer.nodes)}
+    limit = getattr(response, "limit", None)
+    if limit is not None:
+        result["limit"] = limit
+    return result
+
+
+def validate_items(schemas, items):
+    """
+    Validates a batch of documents. It runs in the workers of the server.
+    :param schemas: Dict where each name holds its schema object, or None for `WORKER_SCHEMAS`.
+    :param items: List of (schema name, document) tuples.
+    :return: List of results (see `get_result`), in the same order. A validation that raises gets {"error": message}.
+    """
+
+    if schemas is None:
+        schemas = WORKER_SCHEMAS
+    results = []
+    for name, document in items:
+        try:
+            results.append(get_result(schemas[name].validate(document)))
+        except Exception as error:
+            # Only this document fails, not the others of the batch, which may come from other requests.
+            results.append({"error": "{}: {}".format(type(error).__name__, error)})
+    return results
+
+
+def load_schemas(files, lean=False):
+    """
+    Builds the schemas of some files with a registry of their own, so files that reference each other share their
+    schema objects.
+    :param files: Dict where each name holds the path of its schema file.
+    :param lean: If it's True the schema objects don't keep the dicts they were built from.
+    :return: Dict where each name holds its schema object.
+    """
+
+    registry = SchemaRegistry()
+    registry.register_files(list(files.values()))
+    if not lean:
+        return {name: registry.get_schema_from_file(path) for name, path in files.items()}
+    from .classes import get_schema_from_file
+
+    return {name: get_schema_from_file(path, registry=registry, lean=True) for name, path in files.items()}
+
+
+def load_worker_schemas(files, lean=False, reload=None):
+    """
+    Initializer of the worker processes of a server: builds the schemas into `WORKER_SCHEMAS`.
+    :param files: Dict where each name holds the path of its schema file.
+    :param lean: If it's True the schema objects don't keep the dicts they were built from.
+    :param reload: Seconds between two checks of the files, or None to not watch them. Each process watches the
+    files on its own.
+    """
+
+    if reload is None:
+        WORKER_SCHEMAS.update(load_schemas(files, lean))
+    else:
+        SchemaWatcher(files, reload, lean, schemas=WORKER_SCHEMAS).start()
+
+
+def get_schema_name(path):
+    """
+    :param path: Path of a schema file.
+    :return: Name the server gives to its schema: the file name without its extension.
+    """
+
+    return os.path.basename(path).partition(".")[0]
+
+
+async def serve(files, host="127.0.0.1", port=8080, path=None, workers=1, processes=False,
+                batch_size=MAX_BATCH_SIZE, delay=BATCH_DELAY, lean=False, reload=None):
+    """
+    Builds the schemas of some files and serves them until the task is cancelled.
+    :param files: Dict where each name holds the path of its schema file.
+    :param host: Host of the TCP socket.
+    :param port: Port of the TCP socket.
+    :param path: Path of a Unix socket. If it's given the server listens on it instead of the TCP socket.
+    :param workers: Number of workers that validate batches at the same time.
+    :param processes: If it's True the workers are processes (each one builds the schemas), which validate in parallel
+    even with the GIL. Otherwise they are threads.
+    :param batch_size: Maximum number of documents validated in one batch.
+    :param delay: Seconds the first document of a batch waits for others when a worker is free.
+    :param lean: If it's True the schema objects don't keep the dicts they were built from.
+    :param reload: Seconds between two checks of the schema files, which are built again when they change. None means
+    the files are only read when the server starts.
+    """
+
+    watcher = None
+    if reload is not None and not processes:
+        watcher = SchemaWatcher(files, reload, lean)
+        schemas = watcher.schemas
+        watcher.start()
+    else:
+        # The names of the schemas are served from here, and it checks the schemas before any worker starts.
+        schemas = load_schemas(files, lean)
+    if processes:
+        executor = concurrent.futures.ProcessPoolExecutor(workers, initializer=load_worker_schemas,
+                                                          initargs=(files, lean, reload))
+        validation_server = ValidationServer(schemas, executor, workers, batch_size, delay,
+                                             functools.partial(validate_items, None))
+    else:
+        validation_server = ValidationServer(schemas, None, workers, batch_size, delay)
+    server = await validation_server.start(host, port, path)
+    try:
+        async with server:
+            await server.serve_forever()
+    finally:
+        validation_server.close()
+        if watcher is not None:
+            watcher.stop()
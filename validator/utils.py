@@ -1,13 +1,26 @@
 import re
 import json
-from urllib.parse import urlparse, unquote
-from urllib.request import urlopen
+from .regex import LinearPattern, compile_linear
 
 VALID_SCHEMES = ["http", "https", "ftp"]
 """List that contains the valid url schemes that a $ref keyword can have. """
 
 NONE = -1
 
+PATTERNS = {}
+"""Dict where each regular expression holds its compiled pattern (see `get_pattern`)."""
+
+MAX_PATTERNS = 1000
+"""Maximum number of compiled patterns `PATTERNS` keeps. When it's full it's emptied, so a process that builds schemas
+with many different patterns can't make it grow without limit."""
+
+LINEAR_PATTERNS = True
+"""Whether the patterns the linear time matcher of `validator.regex` supports are compiled with it instead of `re`."""
+
+LIST_START, LIST_END, DICT_START, DICT_END = object(), object(), object(), object()
+"""Markers of the start and the end of lists and dicts in the hashable objects of `get_hashable`. They are only equal
+to themselves, so they never match a value."""
+
 
 class JSONPointer:
     """
@@ -33,29 +46,38 @@ class JSONPointer:
         :param string: JSONPointer string.
         :return: List of nodes.
         """
+        from urllib.parse import unquote
+
         string = unquote(string)
         if string == "":
             return ["#"]
-        i = 0
-        nodes = []
-        s_to_add = ""
-        while i < len(string):
-            if string[i] == "/":
-                nodes.append(s_to_add)
-                s_to_add = ""
-                i += 1
-            elif string[i] == "~":
-                if i + 1 < len(string) and string[i + 1] == "1":
-                    s_to_add += "/"
-                    i += 2
-                elif i + 1 < len(string) and string[i + 1] == "0":
-                    s_to_add += "~"
-                    i += 2
-            else:
-                s_to_add += string[i]
-                i += 1
-        nodes.append(s_to_add)
-        return nodes
+        return [node.replace("~1", "/").replace("~0", "~") for node in string.split("/")]
+
+    @staticmethod
+    def get_string_from_nodes(nodes):
+        """
+        Builds a JSONPointer string from a list of nodes.
+        :param nodes: List of nodes (the root sign is optional).
+        :return: JSONPointer string.
+        """
+
+        string = "#"
+        for node in nodes:
+            if node == "#":
+                continue
+            string += "/" + str(node).replace("~", "~0").replace("/", "~1")
+        return string
+
+    @staticmethod
+    def normalize(string):
+        """
+        Returns the canonical form of a JSONPointer string, so equivalent pointers ("" and "#", escaped and unescaped
+        nodes...) are equal.
+        :param string: JSONPointer string.
+        :return: JSONPointer string.
+        """
+
+        return JSONPointer.get_string_from_nodes(JSONPointer.get_nodes_from_string(string))
 
     def add_upward_nodes(self, list_of_nodes):
         """
@@ -81,6 +103,8 @@ class JSONPointer:
         """
 
         ret = self.document
+        if type(ret) is SchemaSource:
+            ret = ret.load()
         for node in self.nodes:
             if node == "#":
                 continue
@@ -107,6 +131,37 @@ class JSONPointer:
         return "/".join(['#'] + self.nodes)
 
 
+class SchemaSource:
+    """
+    Stand-in for the whole schema dict of a schema built with `lean=True`. It keeps the schema serialized and
+    compressed, which takes a small part of the memory of the dicts, and loads it again when a JSONPointer into it is
+    resolved.
+    """
+
+    def __init__(self, json_schema, label):
+        """
+        :param json_schema: Whole schema dict.
+        :param label: Label that identifies the schema in the metrics.
+        """
+
+        import zlib
+
+        self.data = zlib.compress(json.dumps(json_schema, separators=(",", ":"), ensure_ascii=False).encode("utf-8"))
+        self.label = label
+
+    def load(self):
+        """
+        :return: A new copy of the whole schema dict.
+        """
+
+        import zlib
+
+        return json.loads(zlib.decompress(self.data).decode("utf-8"))
+
+    def __repr__(self):
+        return "SchemaSource({} compressed bytes)".format(len(self.data))
+
+
 class Response:
     """
     Response object that is return when validating a document against a schema object.
@@ -178,13 +233,36 @@ def check_pattern(pattern, string):
     :return:True if the string matches the patter.
     """
 
-    p = re.compile(pattern)
+    p = get_pattern(pattern)
+    if type(p) is LinearPattern:
+        return p.matches(string)
     for index in range(0, len(string)):
         if p.match(string, index):
             return True
     return False
 
 
+def get_pattern(pattern):
+    """
+    Returns the compiled pattern of a regular expression. Patterns are compiled once and shared by every thread: the
+    cache is read without locking and two threads compiling the same pattern at once keep the same result. Patterns that
+    the linear time matcher supports are compiled with it (unless `LINEAR_PATTERNS` is False), so they can't backtrack.
+    :param pattern: Regular expression.
+    :return: LinearPattern object or compiled `re` pattern.
+    """
+
+    compiled = PATTERNS.get(pattern)
+    if compiled is None:
+        if LINEAR_PATTERNS:
+            compiled = compile_linear(pattern)
+        if compiled is None:
+            compiled = re.compile(pattern)
+        if len(PATTERNS) >= MAX_PATTERNS:
+            PATTERNS.clear()
+        compiled = PATTERNS.setdefault(pattern, compiled)
+    return compiled
+
+
 def get_size_of_smaller(list1, list2):
     """
     Returns the size of the smaller list.
@@ -219,6 +297,10 @@ def find_repeated_item(a_list):
     :return: int.
     """
 
+    try:
+        return find_repeated_hashable_item(a_list)
+    except (TypeError, RecursionError):
+        pass
     for i in range(0, len(a_list)):
         for j in range(0, len(a_list)):
             if i != j and equals(a_list[i], a_list[j]):
@@ -226,6 +308,57 @@ def find_repeated_item(a_list):
     return -1
 
 
+def find_repeated_hashable_item(a_list):
+    """
+    Same as `find_repeated_item`, in linear time: the items are grouped by their type and a hashable copy (see
+    `get_hashable`), so large arrays under uniqueItems don't take quadratic time.
+    :param a_list: list object.
+    :return: int.
+    """
+
+    occurrences = {}
+    for index, item in enumerate(a_list):
+        if type(item) is float and item != item:
+            # NaN is not equal to itself.
+            continue
+        indexes = occurrences.setdefault((type(item), get_hashable(item)), [])
+        if len(indexes) < 2:
+            indexes.append(index)
+    repeated = [indexes for indexes in occurrences.values() if len(indexes) == 2]
+    if not repeated:
+        return -1
+    return min(repeated)[1]
+
+
+def get_hashable(item):
+    """
+    :param item: json object.
+    :return: Hashable object that's equal to the hashable object of another json object when both are equal. Lists and
+    dicts become a flat tuple of their values between markers (the keys of dicts are sorted), so it's built, hashed and
+    compared without recursion however deep they are.
+    """
+
+    if not isinstance(item, (list, dict)):
+        return item
+    tokens = []
+    pending = [item]
+    while pending:
+        current = pending.pop()
+        if isinstance(current, list):
+            tokens.append(LIST_START)
+            pending.append(LIST_END)
+            pending.extend(reversed(current))
+        elif isinstance(current, dict):
+            tokens.append(DICT_START)
+            pending.append(DICT_END)
+            for key in sorted(current, reverse=True):
+                pending.append(current[key])
+                pending.append(key)
+        else:
+            tokens.append(current)
+    return tuple(tokens)
+
+
 def list_has_repetition(a_list):
     """
     Checks if a list has a repeated item.
@@ -246,6 +379,8 @@ def is_valid_url(url):
     :return: bool.
     """
 
+    from urllib.parse import urlparse
+
     parsed = urlparse(url)
     if __is_valid_scheme(parsed.scheme):
         return True
@@ -270,6 +405,11 @@ def get_json_from_file(path):
 
 
 def get_json_from_url(url):
+    # urllib.request loads http.client, ssl and email, so it's only imported when a remote schema is needed.
+    from urllib.request import urlopen
+    from .metrics import METRICS
+
+    METRICS.record_remote_fetch(url)
     f = urlopen(url)
     json_string = f.read().decode("utf-8").replace("\n", "").replace("\t", "")
     return json.loads(json_string)
@@ -279,3 +419,44 @@ def equals(item1, item2):
     if type(item1) != type(item2):
         return False
     return item1 == item2
+
+
+def get_json_hash(json_object):
+    """
+    Returns the sha1 hash of the canonical serialization of a json object, so two equal objects have the same hash.
+    :param json_object: Any json object.
+    :return: Hexadecimal string.
+    """
+
+    import hashlib
+
+    serialized = json.dumps(json_object, sort_keys=True, separators=(",", ":"), ensure_ascii=False)
+    return hashlib.sha1(serialized.encode("utf-8")).hexdigest()
+
+
+def raise_immutable_error(*args, **kwargs):
+    raise TypeError("Schema objects can't be modified after they are built.")
+
+
+class FrozenList(list):
+    """
+    List that can't be modified. It's still a list, so reading it costs the same.
+    """
+
+    append = extend = insert = pop = remove = clear = sort = reverse = raise_immutable_error
+    __setitem__ = __delitem__ = __iadd__ = __imul__ = raise_immutable_error
+
+    def __reduce__(self):
+        return FrozenList, (list(self),)
+
+
+class FrozenDict(dict):
+    """
+    Dict that can't be modified. It's still a dict, so reading it costs the same.
+    """
+
+    update = setdefault = pop = popitem = clear = raise_immutable_error
+    __setitem__ = __delitem__ = __ior__ = raise_immutable_error
+
+    def __reduce__(self):
+        return FrozenDict, (dict(self),)
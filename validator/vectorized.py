@@ -0,0 +1,125 @@
+'''
+Module providing the optional NumPy path that checks large arrays of numbers with vectorized operations.
+'''
+from .utils import NONE
+
+
+VECTORIZE_SIZE = 32
+"""Minimum number of items of an array for it to be checked with NumPy. Smaller arrays are faster in pure Python."""
+
+EXACT_INTEGER = 2 ** 53
+"""Largest magnitude up to which every integer is exactly representable as a float. Arrays or bounds beyond it are
+left to the pure Python path, which compares them exactly."""
+
+NUMPY = None
+"""NumPy module, False if it's not installed or None if it was not imported yet."""
+
+
+def get_numpy():
+    """
+    Imports NumPy the first time it's needed, so it doesn't slow down importing the validator.
+    :return: numpy module or None if it's not installed.
+    """
+
+    global NUMPY
+    if NUMPY is None:
+        try:
+            import numpy
+            NUMPY = numpy
+        except ImportError:
+            NUMPY = False
+    return NUMPY or None
+
+
+def is_ndarray(document):
+    """
+    Checks if a document is a NumPy array without importing NumPy.
+    :param document: Any object.
+    :return: bool.
+    """
+
+    document_type = type(document)
+    return document_type.__name__ == "ndarray" and document_type.__module__ == "numpy"
+
+
+def find_invalid_number(schema, integer, values):
+    """
+    Finds the first item of an array that's not valid against an integer or number schema.
+    :param schema: IntegerSchema or NumberSchema object without enum nor anyOf, allOf, oneOf or not.
+    :param integer: True for an integer schema and False for a number schema.
+    :param values: List or one dimensional ndarray.
+    :return: Index of the first invalid item, `NONE` if every item is valid or None if the array can't be checked with
+    NumPy (NumPy is not installed, the numbers are too large...).
+    """
+
+    invalid = get_invalid_numbers(schema, integer, values)
+    if invalid is None:
+        return None
+    if invalid.any():
+        return int(invalid.argmax())
+    return NONE
+
+
+def get_invalid_numbers(schema, integer, values):
+    """
+    Checks the type, multipleOf, minimum, maximum, exclusiveMinimum and exclusiveMaximum keywords of every item of an
+    array at once.
+    :param schema: IntegerSchema or NumberSchema object without enum nor anyOf, allOf, oneOf or not.
+    :param integer: True for an integer schema and False for a number schema.
+    :param values: List or one dimensional ndarray.
+    :return: ndarray of bools that are True for the invalid items, or None if the array can't be checked with NumPy.
+    """
+
+    numpy = get_numpy()
+    if numpy is None or not bounds_are_exact(schema):
+        return None
+    invalid = numpy.zeros(len(values), dtype=bool)
+    if is_ndarray(values):
+        kind = values.dtype.kind
+        if kind == "b" or (integer and kind == "f"):
+            # Booleans are not numbers and floats are not integers.
+            return ~invalid
+        if kind not in "iuf":
+            return None
+        array = values
+    else:
+        allowed = {int} if integer else {int, float}
+        kinds = set(map(type, values))
+        if not kinds <= allowed:
+            # Items of other types (bool is never allowed, even though it's an int) are invalid and are checked as 0.
+            invalid = numpy.fromiter((type(value) not in allowed for value in values), dtype=bool, count=len(values))
+            values = [value if type(value) in allowed else 0 for value in values]
+            kinds &= allowed
+        if len(kinds) > 1 and any(type(value) is int and abs(value) > EXACT_INTEGER for value in values):
+            # Ints and floats are converted to float64, which would round the ints that are too large to be exact.
+            return None
+        try:
+            array = numpy.array(values, dtype=numpy.int64 if kinds <= {int} else numpy.float64)
+        except OverflowError:
+            return None
+    if len(array) > 0 and (array.max() > EXACT_INTEGER or array.min() < -EXACT_INTEGER):
+        return None
+
+    if schema.multipleOf is not None:
+        quotients = array / schema.multipleOf
+        invalid |= (array != 0) & ((quotients != numpy.floor(quotients)) | ~numpy.isfinite(quotients))
+    if (schema.minimum is not None or schema.maximum is not None) and array.dtype.kind == "f":
+        # Every comparison with NaN is False, so `validate_minimum` and `validate_maximum` reject it.
+        invalid |= numpy.isnan(array)
+    if schema.minimum is not None:
+        invalid |= (array < schema.minimum) if not schema.exclusiveMinimum else (array <= schema.minimum)
+    if schema.maximum is not None:
+        invalid |= (array > schema.maximum) if not schema.exclusiveMaximum else (array >= schema.maximum)
+    return invalid
+
+
+def bounds_are_exact(schema):
+    """
+    :param schema: IntegerSchema or NumberSchema object.
+    :return: True if its numeric keywords are compared exactly once they are converted to NumPy numbers.
+    """
+
+    for bound in [schema.minimum, schema.maximum, schema.multipleOf]:
+        if isinstance(bound, int) and abs(bound) > EXACT_INTEGER:
+            return False
+    return True